@@ -12,59 +12,78 @@ Compatible con workflows JSON existentes (nombres idénticos).
 __version__ = "1.1.0"
 __author__ = "WJNode"
 
-# Importar nodos
-from .setget_nodes import (
-    SetNode, 
-    GetNode, 
-    SetNodeNamed,
-    ListCacheNode, 
-    ClearCacheNode,
-    ANY_TYPE
-)
-from .unet_loader_gguf import UnetLoaderGGUF, UnetLoaderGGUFAdvanced
-from .qwen_cache import QwenCache, get_cache, COMFY_TYPES
+import importlib
+import logging
+
+from .lazy_nodes import register_lazy_nodes
 
 # ============================================================================
 # REGISTRO DE NODOS
 # ============================================================================
 # IMPORTANTE: Los nombres de clase deben coincidir con el JSON original
 # para mantener compatibilidad con workflows existentes
+#
+# Los nodos se registran como proxies (lazy_nodes.py): el módulo de cada nodo
+# (torch, gguf, folder_paths...) se importa en su primer INPUT_TYPES o
+# ejecución, no al arrancar ComfyUI.
 
-NODE_CLASS_MAPPINGS = {
+# nodo -> (módulo, clase, nombre para mostrar en la UI de ComfyUI)
+_NODES = {
     # Nodos principales (compatibilidad con rgthree/JSON existente)
-    "SetNode": SetNode,
-    "GetNode": GetNode,
-    "UnetLoaderGGUF": UnetLoaderGGUF,
-    
+    "SetNode": (".setget_nodes", "SetNode", "📦 Set Node"),
+    "GetNode": (".setget_nodes", "GetNode", "📤 Get Node"),
+    "UnetLoaderGGUF": (".unet_loader_gguf", "UnetLoaderGGUF", "🧠 Unet Loader GGUF"),
+
     # Nodos adicionales
-    "SetNodeNamed": SetNodeNamed,
-    "UnetLoaderGGUFAdvanced": UnetLoaderGGUFAdvanced,
-    "ListCacheNode": ListCacheNode,
-    "ClearCacheNode": ClearCacheNode,
+    "SetNodeNamed": (".setget_nodes", "SetNodeNamed", "📦 Set Node (Named)"),
+    "UnetLoaderGGUFAdvanced": (".unet_loader_gguf", "UnetLoaderGGUFAdvanced", "🧠 Unet Loader GGUF+"),
+    "ListCacheNode": (".setget_nodes", "ListCacheNode", "📋 List Cache"),
+    "ClearCacheNode": (".setget_nodes", "ClearCacheNode", "🗑️ Clear Cache"),
 }
 
-# Nombres para mostrar en la UI de ComfyUI
-NODE_DISPLAY_NAME_MAPPINGS = {
-    "SetNode": "📦 Set Node",
-    "GetNode": "📤 Get Node",
-    "UnetLoaderGGUF": "🧠 Unet Loader GGUF",
-    "SetNodeNamed": "📦 Set Node (Named)",
-    "UnetLoaderGGUFAdvanced": "🧠 Unet Loader GGUF+",
-    "ListCacheNode": "📋 List Cache",
-    "ClearCacheNode": "🗑️ Clear Cache",
-}
+NODE_CLASS_MAPPINGS = {}
+NODE_DISPLAY_NAME_MAPPINGS = {}
+
+_missing = register_lazy_nodes(_NODES, NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS, __name__)
+if _missing:
+    logging.getLogger(__name__).warning("ComfyUI_WJSetGetPlus: nodes not registered: %s", ", ".join(_missing))
 
 # Sin archivos web adicionales
 WEB_DIRECTORY = None
 
+# Precarga de modelos al encolar prompts (no-op fuera de ComfyUI)
+from .prefetch import install as _install_prefetch
+_install_prefetch()
+
 # ============================================================================
-# MENSAJE DE CARGA
+# IMPORTS PEREZOSOS
 # ============================================================================
-print("=" * 60)
-print(f"✓ ComfyUI_WJSetGetPlus v{__version__} loaded")
-print(f"  Main: SetNode, GetNode, UnetLoaderGGUF")
-print(f"  Extra: SetNodeNamed, UnetLoaderGGUFAdvanced, ListCacheNode, ClearCacheNode")
-print("=" * 60)
+# ``from ComfyUI_WJSetGetPlus import get_cache`` sigue funcionando: los
+# nombres exportados se importan al pedirlos.
+
+_EXPORTS = {
+    "SetNode": ".setget_nodes",
+    "GetNode": ".setget_nodes",
+    "SetNodeNamed": ".setget_nodes",
+    "ListCacheNode": ".setget_nodes",
+    "ClearCacheNode": ".setget_nodes",
+    "ANY_TYPE": ".setget_nodes",
+    "UnetLoaderGGUF": ".unet_loader_gguf",
+    "UnetLoaderGGUFAdvanced": ".unet_loader_gguf",
+    "QwenCache": ".qwen_cache",
+    "get_cache": ".qwen_cache",
+    "COMFY_TYPES": ".qwen_cache",
+}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
 # ============================================================================
 # EXPORTS
@@ -0,0 +1,113 @@
+"""
+Registro perezoso de nodos
+
+ComfyUI importa todos los paquetes de custom nodes al arrancar y solo
+necesita ``NODE_CLASS_MAPPINGS``. Importar aquí los módulos de los nodos
+arrastra torch, gguf y folder_paths y alarga el arranque aunque el nodo no se
+use. En su lugar se registra un proxy por nodo: una clase vacía que importa
+el módulo real la primera vez que se consulta un atributo del nodo
+(``INPUT_TYPES``, ``RETURN_TYPES``...) o se instancia para ejecutarlo, y a
+partir de ahí delega en la clase real.
+
+Un módulo que no existe no rompe el import del paquete: sus nodos
+simplemente no se registran (``register_lazy_nodes`` devuelve la lista).
+
+Es la única implementación: el paquete raíz (``lazy_nodes.py`` del repo)
+carga este mismo archivo por ruta. No debe importar nada de este paquete.
+"""
+
+import importlib
+import importlib.util
+import threading
+from typing import Dict, List, Optional, Tuple
+
+_load_lock = threading.RLock()
+
+
+class LazyNodeMeta(type):
+    """Metaclase de los proxies: carga la clase real al primer uso."""
+
+    def _load(cls) -> type:
+        target = cls.__dict__["_target"]
+        if target is None:
+            with _load_lock:
+                target = cls.__dict__["_target"]
+                if target is None:
+                    module = importlib.import_module(cls._module, cls._package)
+                    target = getattr(module, cls._class_name)
+                    # Atributos que ComfyUI asignó al proxy (p.ej. RELATIVE_PYTHON_MODULE)
+                    for name, value in cls._assigned.items():
+                        setattr(target, name, value)
+                    type.__setattr__(cls, "_target", target)
+        return target
+
+    def __getattr__(cls, name: str):
+        # Solo se llama para atributos que el proxy no tiene
+        if name.startswith("__") and name.endswith("__"):
+            raise AttributeError(name)
+        return getattr(cls._load(), name)
+
+    def __setattr__(cls, name: str, value) -> None:
+        type.__setattr__(cls, name, value)
+        if not name.startswith("_"):
+            cls._assigned[name] = value
+            target = cls.__dict__["_target"]
+            if target is not None:
+                setattr(target, name, value)
+
+    def __call__(cls, *args, **kwargs):
+        return cls._load()(*args, **kwargs)
+
+    def __repr__(cls) -> str:
+        state = "loaded" if cls.__dict__["_target"] is not None else "lazy"
+        return f"<lazy node {cls._module}.{cls._class_name} ({state})>"
+
+
+def lazy_node(module: str, class_name: str, package: Optional[str] = None) -> type:
+    """Proxy de la clase ``class_name`` de ``module`` (relativo a ``package``)."""
+    return LazyNodeMeta(class_name, (), {
+        "__module__": package or module,
+        "_module": module,
+        "_package": package,
+        "_class_name": class_name,
+        "_target": None,
+        "_assigned": {},
+    })
+
+
+def is_loaded(node_class: type) -> bool:
+    """True si ``node_class`` no es un proxy o si ya cargó su clase real."""
+    return not isinstance(node_class, LazyNodeMeta) or node_class.__dict__["_target"] is not None
+
+
+def module_available(module: str, package: Optional[str] = None) -> bool:
+    """Comprueba que un módulo existe sin ejecutarlo (sí importa sus paquetes padre)."""
+    try:
+        return importlib.util.find_spec(importlib.util.resolve_name(module, package)) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def register_lazy_nodes(
+    nodes: Dict[str, Tuple[str, str, str]],
+    class_mappings: Dict[str, type],
+    display_mappings: Dict[str, str],
+    package: Optional[str] = None,
+) -> List[str]:
+    """
+    Registra proxies para ``nodes`` ({nodo: (módulo, clase, nombre visible)}).
+
+    Returns:
+        Nodos no registrados porque su módulo no existe
+    """
+    available: Dict[str, bool] = {}
+    missing = []
+    for node_name, (module, class_name, display_name) in nodes.items():
+        if module not in available:
+            available[module] = module_available(module, package)
+        if not available[module]:
+            missing.append(node_name)
+            continue
+        class_mappings[node_name] = lazy_node(module, class_name, package)
+        display_mappings[node_name] = display_name
+    return missing
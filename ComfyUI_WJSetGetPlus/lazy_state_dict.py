@@ -0,0 +1,282 @@
+"""
+LazySafetensorsDict - state_dict perezoso sobre un archivo safetensors
+
+``safetensors.torch.load_file`` lee todos los tensores al cargar. Este
+``Mapping`` solo lee la cabecera del archivo (claves, dtypes, shapes) y cada
+tensor se lee con ``safe_open`` la primera vez que se accede a él. Quien solo
+necesita un subconjunto de pesos, o vuelca capa a capa al dispositivo, paga
+solo por lo que toca.
+
+Opcionalmente guarda los últimos ``cache_size`` tensores leídos (LRU) para no
+releer los que se consultan varias veces seguidas.
+
+IMPORTANTE: no es un ``dict``. Código que necesite uno debe usar
+``materialize()`` (lee todo, como la carga clásica).
+
+``read_safetensors`` es la lectura completa en streaming: tensor a tensor,
+aplicando una conversión (dtype/dispositivo) a cada uno antes de leer el
+siguiente, de modo que el pico de memoria es el modelo final más un tensor.
+"""
+
+import json
+import struct
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .load_report import active_report
+
+# dtype de safetensors -> nombre del dtype de torch
+SAFETENSORS_DTYPES = {
+    "BOOL": "bool", "U8": "uint8", "I8": "int8",
+    "F8_E4M3": "float8_e4m3fn", "F8_E5M2": "float8_e5m2",
+    "I16": "int16", "F16": "float16", "BF16": "bfloat16",
+    "I32": "int32", "F32": "float32",
+    "I64": "int64", "F64": "float64",
+}
+
+
+def _read_header(f) -> Tuple[Dict[str, dict], int]:
+    raw = f.read(8)
+    if len(raw) != 8:
+        raise ValueError(f"[LazySafetensors] Not a safetensors file: {f.name}")
+    (header_len,) = struct.unpack("<Q", raw)
+    return json.loads(f.read(header_len)), 8 + header_len
+
+
+def read_safetensors_header(path: str) -> Tuple[Dict[str, dict], Dict[str, str]]:
+    """
+    Lee solo la cabecera JSON de un archivo safetensors.
+
+    Returns:
+        ({nombre: {"dtype", "shape", "data_offsets"}}, metadatos)
+    """
+    with open(path, "rb") as f:
+        header, _ = _read_header(f)
+    metadata = header.pop("__metadata__", None) or {}
+    return header, metadata
+
+
+def read_safetensors(path: str, transform: Optional[Callable[[Any], Any]] = None) -> Dict[str, Any]:
+    """
+    Lee un safetensors completo tensor a tensor, con lecturas normales en
+    lugar de mmap (las páginas del archivo no cuentan en la memoria del
+    proceso). Cada tensor pasa por ``transform`` (p.ej. cambio de dtype o
+    dispositivo) antes de leer el siguiente.
+
+    Con ``transform`` los bytes se leen en un único búfer reutilizado del
+    tamaño del tensor más grande: un búfer temporal por tensor fragmenta el
+    heap (glibc sube su umbral de mmap al liberar bloques grandes y los
+    siguientes quedan en la arena) y el pico acaba cerca del doble del modelo.
+    """
+    import torch
+
+    report = active_report()
+    state_dict = {}
+    with open(path, "rb") as f:
+        with report.phase("header"):
+            header, data_start = _read_header(f)
+        header.pop("__metadata__", None)
+        scratch = None
+        if transform is not None and header:
+            largest = max(end - start for start, end in (i["data_offsets"] for i in header.values()))
+            scratch = torch.empty(largest, dtype=torch.uint8)
+        # En orden de offset: lectura secuencial del archivo
+        for key, info in sorted(header.items(), key=lambda kv: kv[1]["data_offsets"][0]):
+            start, end = info["data_offsets"]
+            with report.phase("read", end - start):
+                # Sin transform el tensor leído es el definitivo
+                buffer = scratch[:end - start] if scratch is not None else torch.empty(end - start, dtype=torch.uint8)
+                f.seek(data_start + start)
+                if f.readinto(memoryview(buffer.numpy())) != end - start:
+                    raise ValueError(f"[LazySafetensors] Truncated tensor {key} in {path}")
+            with report.phase("deserialize"):
+                dtype = getattr(torch, SAFETENSORS_DTYPES[info["dtype"]])
+                tensor = buffer.view(dtype).reshape(info["shape"])
+            del buffer
+            if scratch is not None:
+                tensor = transform(tensor)
+                # transform sin cambios devuelve el mismo almacenamiento
+                if tensor.device.type == "cpu" and tensor.untyped_storage().data_ptr() == scratch.data_ptr():
+                    tensor = tensor.clone()
+            state_dict[key] = tensor
+            del tensor
+    return {key: state_dict[key] for key in header}
+
+
+class LazySafetensorsDict(Mapping):
+    """
+    state_dict de solo lectura que lee cada tensor al acceder a él.
+
+    Args:
+        path: Archivo .safetensors
+        device: Dispositivo donde ``safe_open`` deja cada tensor leído
+        cache_size: Tensores leídos que se conservan (LRU); 0 = ninguno
+        transform: Conversión aplicada a cada tensor al leerlo
+    """
+
+    def __init__(self, path: str, device: str = "cpu", cache_size: int = 0,
+                 transform: Optional[Callable[[Any], Any]] = None):
+        self.path = path
+        self.device = device
+        self.cache_size = max(0, int(cache_size))
+        self.transform = transform
+        with active_report().phase("header"):
+            self._header, self.metadata = read_safetensors_header(path)
+        self._keys: List[str] = list(self._header)
+        self._handle = None
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self.reads = 0
+
+    # ------------------------------------------------------------------
+    # Mapping
+    # ------------------------------------------------------------------
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._header:
+            raise KeyError(key)
+        if self.cache_size:
+            with self._lock:
+                tensor = self._cache.get(key)
+                if tensor is not None:
+                    self._cache.move_to_end(key)
+                    return tensor
+
+        tensor = self._open().get_tensor(key)
+        if self.transform is not None:
+            tensor = self.transform(tensor)
+        self.reads += 1
+
+        if self.cache_size:
+            with self._lock:
+                self._cache[key] = tensor
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return tensor
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._header
+
+    def __repr__(self) -> str:
+        return f"LazySafetensorsDict({self.path!r}, {len(self)} tensors, device={self.device!r})"
+
+    # ------------------------------------------------------------------
+    # Información de la cabecera (sin leer datos)
+    # ------------------------------------------------------------------
+    def shape(self, key: str) -> Tuple[int, ...]:
+        return tuple(self._header[key]["shape"])
+
+    def dtype(self, key: str) -> str:
+        """dtype de safetensors ("F16", "BF16", ...)."""
+        return self._header[key]["dtype"]
+
+    def nbytes(self, key: str = None) -> int:
+        """Bytes de un tensor, o de todos si ``key`` es None."""
+        if key is None:
+            return sum(self.nbytes(k) for k in self._keys)
+        start, end = self._header[key]["data_offsets"]
+        return end - start
+
+    def cached_bytes(self) -> int:
+        """Bytes de los tensores retenidos en el LRU."""
+        return sum(t.numel() * t.element_size() for t in self.loaded_tensors())
+
+    def loaded_tensors(self) -> List[Any]:
+        """Tensores ya leídos que este objeto mantiene vivos (los del LRU)."""
+        with self._lock:
+            return list(self._cache.values())
+
+    # ------------------------------------------------------------------
+    # Utilidades
+    # ------------------------------------------------------------------
+    def materialize(self, keys: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Lee los tensores indicados (o todos) a un dict normal."""
+        return {k: self[k] for k in (self._keys if keys is None else keys)}
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def close(self) -> None:
+        """Libera el archivo abierto; se reabre al siguiente acceso."""
+        with self._lock:
+            self._handle = None
+            self._cache.clear()
+
+    def _open(self):
+        handle = self._handle
+        if handle is None:
+            with self._lock:
+                if self._handle is None:
+                    from safetensors import safe_open
+                    self._handle = safe_open(self.path, framework="pt", device=str(self.device))
+                handle = self._handle
+        return handle
+
+    def __sizeof__(self) -> int:
+        # Para estimate_size: solo cuenta lo que está realmente en memoria
+        return object.__sizeof__(self) + self.cached_bytes()
+
+
+class ShardedLazyDict(Mapping):
+    """
+    Vista perezosa única sobre los shards de un checkpoint fragmentado.
+    Solo se leen las cabeceras; cada tensor se lee de su shard al accederlo.
+    """
+
+    def __init__(self, shard_paths: List[str], device: str = "cpu", cache_size: int = 0,
+                 transform: Optional[Callable[[Any], Any]] = None):
+        self.shards = [
+            LazySafetensorsDict(p, device=device, cache_size=cache_size, transform=transform)
+            for p in shard_paths
+        ]
+        self._owner: Dict[str, LazySafetensorsDict] = {}
+        for shard in self.shards:
+            for key in shard:
+                self._owner.setdefault(key, shard)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._owner[key][key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._owner)
+
+    def __len__(self) -> int:
+        return len(self._owner)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._owner
+
+    def __repr__(self) -> str:
+        return f"ShardedLazyDict({len(self.shards)} shards, {len(self)} tensors)"
+
+    def shape(self, key: str) -> Tuple[int, ...]:
+        return self._owner[key].shape(key)
+
+    def dtype(self, key: str) -> str:
+        return self._owner[key].dtype(key)
+
+    def nbytes(self, key: str = None) -> int:
+        if key is None:
+            return sum(shard.nbytes() for shard in self.shards)
+        return self._owner[key].nbytes(key)
+
+    def materialize(self, keys: Optional[List[str]] = None) -> Dict[str, Any]:
+        return {k: self[k] for k in (self._owner if keys is None else keys)}
+
+    def loaded_tensors(self) -> List[Any]:
+        return [t for shard in self.shards for t in shard.loaded_tensors()]
+
+    def close(self) -> None:
+        for shard in self.shards:
+            shard.close()
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + sum(shard.cached_bytes() for shard in self.shards)
@@ -0,0 +1,199 @@
+"""
+LoadReport - Tiempos por fase de la carga de un modelo
+
+Cada carga de UnetLoaderGGUF crea un informe y lo activa en su hilo; los
+cargadores anotan sus fases con ``active_report().phase(...)`` sin tener que
+pasar el informe por todas las firmas. Fases:
+
+    resolve      búsqueda de la ruta y huella de contenido
+    header       lectura de cabeceras / índices
+    read         lectura de datos del disco
+    deserialize  construcción de tensores (torch.load, GGUF...)
+    convert      cambio de dtype
+    move         copia al dispositivo
+
+Cada fase acumula segundos y bytes (MB/s). Con varios hilos (shards) los
+segundos de una fase son la suma de todos ellos y pueden superar el total.
+El informe termina en la salida ``info`` y en un registro de ``logging``
+(logger ``WJSetGetPlus.loader``) con el dict completo en ``load_report``.
+"""
+
+import json
+import logging
+import sys
+import threading
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PHASES = ("resolve", "header", "read", "deserialize", "convert", "move")
+
+logger = logging.getLogger("WJSetGetPlus.loader")
+
+_active = threading.local()
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Pico de memoria residente del proceso (None si no se puede medir)."""
+    if resource is None:
+        return None
+    # ru_maxrss: KB en Linux, bytes en macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def count_tensors(model: Any) -> Tuple[int, int]:
+    """(tensores, parámetros) de un state_dict (también perezoso) o modelo."""
+    if isinstance(model, Mapping):
+        shape_of = getattr(model, "shape", None)
+        tensors = params = 0
+        for key in model:
+            if callable(shape_of):
+                # Mapping perezoso: el shape sale de la cabecera, sin leer datos
+                numel = 1
+                for dim in shape_of(key):
+                    numel *= dim
+            else:
+                value = model[key]
+                if not hasattr(value, "numel"):
+                    continue
+                numel = value.numel()
+            tensors += 1
+            params += numel
+        return tensors, params
+    # ModelPatcher y similares
+    inner = getattr(model, "model", model)
+    parameters = getattr(inner, "parameters", None)
+    if callable(parameters):
+        try:
+            counts = [p.numel() for p in parameters()]
+            return len(counts), sum(counts)
+        except Exception:
+            pass
+    return 0, 0
+
+
+class LoadReport:
+    """Tiempos y bytes por fase de una carga."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.phases: Dict[str, list] = {phase: [0.0, 0] for phase in PHASES}
+        self.source = "disk"
+        self.notes = []
+        self.tensors = 0
+        self.params = 0
+        self.total_s = 0.0
+        self.peak_rss = None
+        self.loaded_by: Optional["LoadReport"] = None
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str, nbytes: int = 0) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start, nbytes)
+
+    def add(self, name: str, seconds: float, nbytes: int = 0) -> None:
+        with self._lock:
+            entry = self.phases[name]
+            entry[0] += seconds
+            entry[1] += nbytes
+
+    def note(self, text: str) -> None:
+        self.notes.append(text)
+
+    @contextmanager
+    def activate(self) -> Iterator["LoadReport"]:
+        """Hace de este el informe activo del hilo actual."""
+        previous = getattr(_active, "report", None)
+        _active.report = self
+        try:
+            yield self
+        finally:
+            _active.report = previous
+
+    def finish(self, model: Any = None) -> "LoadReport":
+        self.total_s = time.perf_counter() - self._start
+        if model is not None:
+            self.tensors, self.params = count_tensors(model)
+        self.peak_rss = peak_rss_bytes()
+        return self
+
+    def as_dict(self) -> Dict[str, Any]:
+        phases = {}
+        for name, (seconds, nbytes) in self.phases.items():
+            if seconds or nbytes:
+                phases[name] = {
+                    "seconds": round(seconds, 6),
+                    "bytes": nbytes,
+                    "mb_s": round(nbytes / seconds / 2**20, 1) if seconds and nbytes else None,
+                }
+        data = {
+            "model": self.name,
+            "source": self.source,
+            "total_seconds": round(self.total_s, 6),
+            "phases": phases,
+            "tensors": self.tensors,
+            "params": self.params,
+            "peak_rss_bytes": self.peak_rss,
+            "notes": list(self.notes),
+        }
+        if self.loaded_by is not None:
+            data["loaded_by"] = self.loaded_by.as_dict()
+        return data
+
+    def format(self) -> str:
+        """Texto para la salida ``info`` del nodo."""
+        lines = [f"Load ({self.source}): {self.total_s:.3f}s, {self.tensors} tensors, "
+                 f"{self.params / 1e6:.1f}M params"]
+        for name, (seconds, nbytes) in self.phases.items():
+            if not seconds and not nbytes:
+                continue
+            line = f"  {name:<11} {seconds:8.3f}s"
+            if nbytes:
+                line += f" {nbytes / 2**20:10.1f} MB"
+                if seconds:
+                    line += f" {nbytes / seconds / 2**20:9.0f} MB/s"
+            lines.append(line)
+        if self.peak_rss is not None:
+            lines.append(f"  peak RSS    {self.peak_rss / 2**20:.0f} MB (process)")
+        lines.extend(f"  note: {note}" for note in self.notes)
+        if self.loaded_by is not None:
+            lines.append("Original load:")
+            lines.extend("  " + line for line in self.loaded_by.format().splitlines())
+        return "\n".join(lines)
+
+    def log(self) -> None:
+        data = self.as_dict()
+        logger.info("unet load %s", json.dumps(data), extra={"load_report": data})
+
+
+class _NullReport(LoadReport):
+    """Informe que no anota nada (cargas sin informe activo)."""
+
+    def __init__(self):
+        super().__init__("")
+
+    def add(self, name: str, seconds: float, nbytes: int = 0) -> None:
+        pass
+
+    def note(self, text: str) -> None:
+        pass
+
+
+_NULL_REPORT = _NullReport()
+
+
+def active_report() -> LoadReport:
+    """Informe activo del hilo actual (uno que no anota si no hay ninguno)."""
+    return getattr(_active, "report", None) or _NULL_REPORT
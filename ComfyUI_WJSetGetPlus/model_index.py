@@ -0,0 +1,521 @@
+"""
+ModelIndex - Índice persistente e incremental de archivos de modelo
+Sustituye el os.walk completo de get_unet_files() en cada INPUT_TYPES.
+
+El índice guarda, por directorio, su mtime y los archivos de modelo que
+contiene (tamaño, mtime, formato). Al refrescar solo se relista un
+directorio si su mtime cambió (se añadió, borró o renombró algo dentro);
+el resto se reutiliza tal cual. El índice se guarda en disco entre sesiones.
+
+Los checkpoints fragmentados (``*.safetensors.index.json`` + N shards) se
+listan como una sola entrada: el índice JSON. Sus shards se siguen pudiendo
+resolver por nombre pero no aparecen en la lista.
+
+Cada archivo puede llevar además una huella de contenido (``fingerprint``):
+hash parcial del tamaño, la cabecera, bloques muestreados y el final del
+archivo. Se calcula al cargar el modelo y se guarda en el índice; permite
+encontrar posibles copias del mismo modelo con distinto nombre o carpeta.
+Como solo muestrea el archivo, la identidad se confirma con ``same_content``
+(mismo inode o hash completo, también guardado en el índice).
+
+Nota: modificar un archivo en su sitio no cambia el mtime del directorio,
+así que su tamaño/mtime pueden quedar desactualizados hasta un refresco
+completo (``refresh(full=True)``).
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import folder_paths
+    FOLDER_PATHS_AVAILABLE = True
+except ImportError:
+    FOLDER_PATHS_AVAILABLE = False
+
+# Extensiones y carpetas de ComfyUI donde buscar modelos
+MODEL_EXTENSIONS = (".gguf", ".safetensors", ".ckpt", ".pt", ".pth", ".bin")
+MODEL_FOLDERS = ("unet", "diffusion_models", "checkpoints")
+SHARD_INDEX_SUFFIX = ".safetensors.index.json"
+
+INDEX_VERSION = 2
+INDEX_FILENAME = "wjsetget_model_index.json"
+
+# Huella parcial: cabecera y final completos + bloques muestreados
+FINGERPRINT_HEAD = 64 * 1024
+FINGERPRINT_BLOCK = 4 * 1024
+FINGERPRINT_SAMPLES = 64
+# Bloque de lectura del hash completo
+CONTENT_HASH_CHUNK = 16 * 1024 * 1024
+
+
+def model_format(filename: str) -> str:
+    """Formato de un archivo según su extensión."""
+    if filename.lower().endswith(SHARD_INDEX_SUFFIX):
+        return "sharded"
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in (".ckpt", ".pt", ".pth"):
+        return "ckpt"
+    return ext.lstrip(".")
+
+
+def read_shard_index(index_path: str) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Lee un ``*.safetensors.index.json``.
+
+    Returns:
+        (weight_map {tensor: archivo de shard}, rutas completas de los shards
+        en orden y sin duplicados)
+    """
+    with open(index_path, "r", encoding="utf-8") as f:
+        weight_map = json.load(f).get("weight_map") or {}
+    base = os.path.dirname(index_path)
+    shards = [os.path.join(base, name) for name in sorted(set(weight_map.values()))]
+    return weight_map, shards
+
+
+def file_fingerprint(path: str) -> str:
+    """
+    Huella de contenido parcial (blake2b) de un archivo: tamaño, primeros y
+    últimos 64 KB y ``FINGERPRINT_SAMPLES`` bloques repartidos por el resto.
+    Lee ~400 KB sea cual sea el tamaño del archivo.
+
+    Es una huella, no un hash completo: dos archivos del mismo tamaño que
+    solo difieran fuera de las zonas muestreadas darían la misma.
+    """
+    size = os.path.getsize(path)
+    h = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, "rb") as f:
+        h.update(f.read(FINGERPRINT_HEAD))
+        span = size - 2 * FINGERPRINT_HEAD
+        if span > 0:
+            for i in range(FINGERPRINT_SAMPLES):
+                f.seek(FINGERPRINT_HEAD + span * i // FINGERPRINT_SAMPLES)
+                h.update(f.read(FINGERPRINT_BLOCK))
+        if size > FINGERPRINT_HEAD:
+            f.seek(max(FINGERPRINT_HEAD, size - FINGERPRINT_HEAD))
+            h.update(f.read(FINGERPRINT_HEAD))
+    return h.hexdigest()
+
+
+def file_content_hash(path: str) -> str:
+    """Hash completo (blake2b) del contenido de un archivo."""
+    h = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CONTENT_HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _default_index_path() -> str:
+    """Junto a los datos de usuario de ComfyUI, o junto a este módulo."""
+    base = None
+    if FOLDER_PATHS_AVAILABLE:
+        try:
+            base = folder_paths.get_user_directory()
+        except Exception:
+            base = None
+    if not base:
+        base = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base, INDEX_FILENAME)
+
+
+class ModelIndex:
+    """
+    Índice de modelos por carpeta base.
+
+    Estructura en memoria (y en el JSON):
+        roots[base_path][rel_dir] = {
+            "mtime": float,
+            "files": {nombre: [size, mtime, formato, fingerprint?, hash?]},
+            "dirs": [subdirectorios],
+            "hidden": [shards de un índice fragmentado],
+        }
+
+    Para un índice fragmentado, size es la suma de sus shards y mtime el
+    más reciente.
+    """
+
+    def __init__(self, index_path: str = None, folder_names: Tuple[str, ...] = MODEL_FOLDERS,
+                 min_interval: float = 2.0):
+        self.index_path = index_path or os.environ.get("WJ_MODEL_INDEX_PATH") or _default_index_path()
+        self.folder_names = tuple(folder_names)
+        # Refrescos más seguidos que esto reutilizan el índice sin tocar disco
+        self.min_interval = min_interval
+        self._lock = threading.RLock()
+        self._roots: Dict[str, Dict[str, dict]] = {}
+        self._loaded = False
+        self._last_refresh = 0.0
+        # rel_path -> ruta completa, con la prioridad de carpetas de ComfyUI
+        self._lookup: Dict[str, str] = {}
+        self._files: List[str] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_stop = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    def list_files(self) -> List[str]:
+        """Rutas relativas de todos los modelos, ordenadas y sin duplicados."""
+        self.refresh()
+        return list(self._files)
+
+    def find(self, rel_path: str) -> Optional[str]:
+        """
+        Ruta completa de un modelo. O(1) sobre el índice; si la entrada quedó
+        obsoleta (archivo borrado) o falta, se refresca una vez y se reintenta.
+        """
+        self.refresh()
+        path = self._lookup.get(rel_path)
+        if path is not None and os.path.exists(path):
+            return path
+        self.refresh(force=True)
+        return self._lookup.get(rel_path)
+
+    def file_info(self, full_path: str) -> Optional[Tuple[int, float, str]]:
+        """(size, mtime, formato) de un archivo indexado."""
+        info = self._file_entry(full_path)
+        return tuple(info[:3]) if info else None
+
+    def fingerprint(self, full_path: str) -> str:
+        """
+        Huella de contenido de un modelo (ver ``file_fingerprint``), guardada
+        en el índice mientras el tamaño y mtime del archivo no cambien. Para
+        un checkpoint fragmentado combina las huellas de sus shards.
+        Al calcular una huella nueva se avisa si otro archivo ya la tenía.
+        """
+        if model_format(full_path) == "sharded":
+            weight_map, shards = read_shard_index(full_path)
+            shard_fp = {os.path.basename(s): self.fingerprint(s) for s in shards}
+            h = hashlib.blake2b(digest_size=16)
+            for tensor, shard in sorted(weight_map.items()):
+                h.update(f"{tensor}\0{shard_fp[shard]}\0".encode())
+            fp = h.hexdigest()
+        else:
+            st = os.stat(full_path)
+            with self._lock:
+                info = self._file_entry(full_path)
+                if info and len(info) > 3 and info[0] == st.st_size and info[1] == st.st_mtime:
+                    return info[3]
+            fp = file_fingerprint(full_path)
+
+        with self._lock:
+            info = self._file_entry(full_path)
+            if info is None:
+                return fp
+            if model_format(full_path) != "sharded" and info[:2] != [st.st_size, st.st_mtime]:
+                # El archivo cambió: el hash completo guardado ya no vale
+                info[:] = info[:3] + [fp]
+                info[:2] = [st.st_size, st.st_mtime]
+            elif info[3:4] == [fp]:
+                return fp
+            else:
+                info[3:] = [fp]
+            self._save()
+            others = [p for p in self.duplicates(compute=False).get(fp, []) if p != full_path]
+        if others:
+            print(f"[ModelIndex] Possible duplicate model: {full_path} == {', '.join(others)}")
+        return fp
+
+    def content_hash(self, full_path: str) -> str:
+        """
+        Hash completo del contenido (lee el archivo entero), guardado en el
+        índice junto a la huella mientras el archivo no cambie. Para un
+        checkpoint fragmentado combina los hashes de sus shards.
+        """
+        if model_format(full_path) == "sharded":
+            weight_map, shards = read_shard_index(full_path)
+            shard_hash = {os.path.basename(s): self.content_hash(s) for s in shards}
+            h = hashlib.blake2b(digest_size=32)
+            for tensor, shard in sorted(weight_map.items()):
+                h.update(f"{tensor}\0{shard_hash[shard]}\0".encode())
+            return h.hexdigest()
+
+        # La huella deja al día tamaño y mtime de la entrada del índice
+        self.fingerprint(full_path)
+        with self._lock:
+            info = self._file_entry(full_path)
+            if info and len(info) > 4:
+                return info[4]
+        st = os.stat(full_path)
+        digest = file_content_hash(full_path)
+        with self._lock:
+            info = self._file_entry(full_path)
+            if info and len(info) > 3 and info[:2] == [st.st_size, st.st_mtime]:
+                info[4:] = [digest]
+                self._save()
+        return digest
+
+    def same_content(self, path_a: str, path_b: str) -> bool:
+        """
+        True si dos modelos tienen el mismo contenido: la misma ruta real o
+        el mismo inode (symlinks, hardlinks), o huella y hash completo
+        iguales. El hash completo solo se calcula si las huellas coinciden.
+        """
+        if os.path.realpath(path_a) == os.path.realpath(path_b):
+            return True
+        try:
+            st_a, st_b = os.stat(path_a), os.stat(path_b)
+            if (st_a.st_dev, st_a.st_ino) == (st_b.st_dev, st_b.st_ino):
+                return True
+            if self.fingerprint(path_a) != self.fingerprint(path_b):
+                return False
+            return self.content_hash(path_a) == self.content_hash(path_b)
+        except OSError:
+            return False
+
+    def duplicates(self, compute: bool = True) -> Dict[str, List[str]]:
+        """
+        {huella: [rutas completas]} de los modelos con la misma huella en
+        todas las carpetas base, incluidas las copias con el mismo nombre
+        relativo que ``find`` no devuelve. Son candidatos: confirmar con
+        ``same_content``. Con ``compute`` calcula las huellas que falten
+        (lee ~400 KB por archivo); si no, usa solo las ya guardadas.
+        """
+        if compute:
+            self.refresh()
+            for path in self._indexed_paths():
+                try:
+                    self.fingerprint(path)
+                except OSError:
+                    continue
+        groups: Dict[str, List[str]] = {}
+        with self._lock:
+            for path in self._indexed_paths():
+                info = self._file_entry(path)
+                if info and len(info) > 3:
+                    groups.setdefault(info[3], []).append(path)
+        return {fp: paths for fp, paths in groups.items() if len(paths) > 1}
+
+    def _indexed_paths(self) -> List[str]:
+        """Rutas completas de todos los modelos de todas las carpetas base."""
+        paths = []
+        with self._lock:
+            for base, dirs in self._roots.items():
+                for rel_dir, entry in dirs.items():
+                    hidden = set(entry.get("hidden", ()))
+                    for name in entry["files"]:
+                        if name not in hidden:
+                            paths.append(os.path.join(base, rel_dir, name))
+        return paths
+
+    # ------------------------------------------------------------------
+    # Refresco
+    # ------------------------------------------------------------------
+    def refresh(self, force: bool = False, full: bool = False) -> bool:
+        """
+        Refresca el índice de forma incremental.
+
+        Args:
+            force: Ignorar ``min_interval``.
+            full: Relistar todos los directorios aunque su mtime no cambie.
+
+        Returns:
+            True si algo cambió
+        """
+        if not FOLDER_PATHS_AVAILABLE:
+            return False
+        now = time.monotonic()
+        if not force and not full and self._loaded and now - self._last_refresh < self.min_interval:
+            return False
+
+        with self._lock:
+            if not self._loaded:
+                self._load()
+
+            changed = False
+            roots: Dict[str, Dict[str, dict]] = {}
+            for base in self._base_paths():
+                if base in roots:
+                    continue
+                old = {} if full else self._roots.get(base, {})
+                new: Dict[str, dict] = {}
+                if os.path.isdir(base):
+                    changed |= self._scan_dir(base, "", old, new)
+                roots[base] = new
+                changed |= set(old) != set(new)
+            changed |= set(roots) != set(self._roots)
+
+            self._roots = roots
+            if changed or not self._lookup:
+                self._rebuild_lookup()
+            if changed:
+                self._save()
+            self._last_refresh = time.monotonic()
+            return changed
+
+    def _base_paths(self) -> List[str]:
+        """Carpetas base en el orden de prioridad de ComfyUI."""
+        paths = []
+        for folder_name in self.folder_names:
+            try:
+                paths.extend(folder_paths.get_folder_paths(folder_name))
+            except Exception:
+                pass
+        return paths
+
+    def _scan_dir(self, base: str, rel_dir: str, old: Dict[str, dict], new: Dict[str, dict]) -> bool:
+        """Escanea un directorio (y sus subdirectorios). True si cambió algo."""
+        full_dir = os.path.join(base, rel_dir) if rel_dir else base
+        try:
+            mtime = os.stat(full_dir).st_mtime
+        except OSError:
+            return rel_dir in old
+
+        entry = old.get(rel_dir)
+        changed = False
+        if entry is None or entry["mtime"] != mtime:
+            entry = self._list_dir(full_dir, mtime, entry["files"] if entry else {})
+            changed = True
+        new[rel_dir] = entry
+
+        for sub in entry["dirs"]:
+            changed |= self._scan_dir(base, os.path.join(rel_dir, sub), old, new)
+        return changed
+
+    @staticmethod
+    def _list_dir(full_dir: str, mtime: float, old_files: Dict[str, list] = None) -> dict:
+        old_files = old_files or {}
+        files = {}
+        dirs = []
+        shard_indexes = []
+        try:
+            with os.scandir(full_dir) as it:
+                for item in it:
+                    try:
+                        if item.is_dir():
+                            # Como os.walk: no se desciende a enlaces simbólicos
+                            if not item.is_symlink():
+                                dirs.append(item.name)
+                        elif item.name.lower().endswith(MODEL_EXTENSIONS):
+                            st = item.stat()
+                            files[item.name] = [st.st_size, st.st_mtime, model_format(item.name)]
+                            # Conserva huella y hash si el archivo no cambió
+                            old = old_files.get(item.name)
+                            if old and len(old) > 3 and old[:2] == files[item.name][:2]:
+                                files[item.name].extend(old[3:5])
+                        elif item.name.lower().endswith(SHARD_INDEX_SUFFIX):
+                            shard_indexes.append(item.name)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+
+        # Checkpoints fragmentados: una entrada por índice, shards ocultos
+        hidden = set()
+        for name in shard_indexes:
+            try:
+                _, shards = read_shard_index(os.path.join(full_dir, name))
+            except (OSError, ValueError) as e:
+                print(f"[ModelIndex] Warning: invalid shard index {name}: {e}")
+                continue
+            names = [os.path.basename(path) for path in shards]
+            if not names or any(n not in files for n in names):
+                # Índice incompleto (shards en otra carpeta o faltan)
+                continue
+            files[name] = [
+                sum(files[n][0] for n in names),
+                max(files[n][1] for n in names),
+                model_format(name),
+            ]
+            hidden.update(names)
+        return {"mtime": mtime, "files": files, "dirs": sorted(dirs), "hidden": sorted(hidden)}
+
+    def _rebuild_lookup(self) -> None:
+        lookup: Dict[str, str] = {}
+        hidden = set()
+        for base, dirs in self._roots.items():
+            for rel_dir, entry in dirs.items():
+                for name in entry["files"]:
+                    rel_path = os.path.join(rel_dir, name) if rel_dir else name
+                    # Gana la primera carpeta en orden de prioridad
+                    lookup.setdefault(rel_path, os.path.join(base, rel_path))
+                for name in entry.get("hidden", ()):
+                    hidden.add(os.path.join(rel_dir, name) if rel_dir else name)
+        self._lookup = lookup
+        self._files = sorted(set(lookup) - hidden)
+
+    def _file_entry(self, full_path: str) -> Optional[list]:
+        """Lista [size, mtime, formato, ...] del índice para ``full_path``."""
+        base, rel = self._split(full_path)
+        if base is None:
+            return None
+        rel_dir, name = os.path.split(rel)
+        entry = self._roots.get(base, {}).get(rel_dir)
+        return entry["files"].get(name) if entry else None
+
+    def _split(self, full_path: str) -> Tuple[Optional[str], str]:
+        for base in self._roots:
+            try:
+                rel = os.path.relpath(full_path, base)
+            except ValueError:
+                continue
+            if not rel.startswith(os.pardir):
+                return base, rel
+        return None, full_path
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self._roots = data.get("roots", {})
+        except (OSError, ValueError):
+            self._roots = {}
+
+    def _save(self) -> None:
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "roots": self._roots}, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"[ModelIndex] Warning: could not save index: {e}")
+
+    # ------------------------------------------------------------------
+    # Refresco en vivo (polling)
+    # ------------------------------------------------------------------
+    def start_watcher(self, interval: float = 5.0) -> None:
+        """Refresca el índice en segundo plano cada ``interval`` segundos."""
+        with self._lock:
+            if self._watcher is not None and self._watcher.is_alive():
+                return
+            self._watcher_stop.clear()
+
+            def _poll():
+                while not self._watcher_stop.wait(interval):
+                    try:
+                        self.refresh(force=True)
+                    except Exception as e:
+                        print(f"[ModelIndex] Warning: refresh failed: {e}")
+
+            self._watcher = threading.Thread(target=_poll, name="ModelIndexWatcher", daemon=True)
+            self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        self._watcher_stop.set()
+
+
+# Instancia global
+_index: Optional[ModelIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_model_index() -> ModelIndex:
+    """Obtiene el índice de modelos (se crea la primera vez)."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = ModelIndex()
+                interval = float(os.environ.get("WJ_MODEL_INDEX_POLL", 0) or 0)
+                if interval > 0:
+                    _index.start_watcher(interval)
+    return _index
@@ -0,0 +1,247 @@
+"""
+LoadedModelStore - Caché en proceso de modelos ya cargados
+Compartido por UnetLoaderGGUF y UnetLoaderGGUFAdvanced.
+
+- Clave: (ruta real, tamaño, mtime, opciones de carga: dtype, dispositivo...)
+  Si el archivo cambia en disco, la clave cambia y se vuelve a cargar.
+  Cada entrada puede llevar una etiqueta (``tag``, p.ej. la huella de
+  contenido) para encontrar candidatos a compartir con ``find_tagged``; quien
+  llama confirma que el contenido es idéntico antes de reutilizarlos.
+- Expulsión LRU con presupuesto de bytes (``WJ_MODEL_CACHE_MAX_BYTES``,
+  por defecto 16G; 0 = sin límite).
+- Solo se retienen modelos en CPU: un modelo con tensores en GPU se entrega a
+  quien lo pidió (y a las peticiones que esperaban su carga) pero no se
+  guarda, porque esa VRAM quedaría fuera del alcance de la gestión de
+  memoria de ComfyUI. ``WJ_MODEL_CACHE_GPU=1`` retiene también los de GPU.
+  Por eso UnetLoaderGGUF carga en CPU a través del almacén los formatos que
+  acabarían en la GPU y copia al dispositivo en cada uso (``keep_gpu``).
+- Los state_dicts perezosos (``loaded_tensors()``) se miden por los tensores
+  que mantienen vivos en cada momento, no al cargarse (cuando no hay ninguno).
+- Carga "single-flight": peticiones concurrentes de la misma clave esperan a
+  una única carga en lugar de lanzar duplicados.
+
+IMPORTANTE: el mismo objeto se entrega a todos los que piden la misma clave.
+No modificar los state_dicts devueltos en sitio; crear uno nuevo.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from .model_index import SHARD_INDEX_SUFFIX, read_shard_index
+from .qwen_cache import block_device, estimate_size, parse_size, format_size
+
+
+def make_key(path: str, **options) -> tuple:
+    """
+    Clave de caché para un archivo y sus opciones de carga. Para un índice
+    fragmentado, el tamaño y mtime son los de todos sus shards.
+    """
+    real_path = os.path.realpath(path)
+    st = os.stat(real_path)
+    size, mtime_ns = st.st_size, st.st_mtime_ns
+    if real_path.lower().endswith(SHARD_INDEX_SUFFIX):
+        for shard in read_shard_index(real_path)[1]:
+            shard_st = os.stat(shard)
+            size += shard_st.st_size
+            mtime_ns = max(mtime_ns, shard_st.st_mtime_ns)
+    return (real_path, size, mtime_ns, tuple(sorted(options.items())))
+
+
+def _measure(value: Any) -> Tuple[int, bool]:
+    """(bytes, True si hay tensores fuera de la CPU) de un modelo cargado."""
+    loaded_tensors = getattr(value, "loaded_tensors", None)
+    size, blocks = estimate_size(loaded_tensors() if callable(loaded_tensors) else value)
+    return size, any(block_device(key) != "cpu" for key in blocks)
+
+
+class LoadedModelStore:
+    """Modelos cargados, LRU bajo presupuesto de bytes y carga single-flight."""
+
+    def __init__(self, max_bytes: Any = None, keep_gpu: bool = None):
+        if max_bytes is None:
+            max_bytes = os.environ.get("WJ_MODEL_CACHE_MAX_BYTES", "16G")
+        if keep_gpu is None:
+            keep_gpu = os.environ.get("WJ_MODEL_CACHE_GPU", "0") not in ("0", "false", "False")
+        self._max_bytes = parse_size(max_bytes)
+        self._keep_gpu = bool(keep_gpu)
+        self._lock = threading.Lock()
+        # clave -> {"value", "size", "hits", ...}; orden de acceso (LRU primero)
+        self._entries: "OrderedDict[Hashable, dict]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._total_bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "waits": 0, "evictions": 0, "not_retained": 0}
+
+    @property
+    def keep_gpu(self) -> bool:
+        """True si se retienen modelos con tensores en GPU."""
+        return self._keep_gpu
+
+    def configure(self, max_bytes: Any = None, keep_gpu: bool = None) -> None:
+        """Cambia el presupuesto de bytes (0 = sin límite) y si se retienen modelos en GPU."""
+        with self._lock:
+            if max_bytes is not None:
+                self._max_bytes = parse_size(max_bytes)
+            if keep_gpu is not None:
+                self._keep_gpu = bool(keep_gpu)
+            if not self._keep_gpu:
+                for key, entry in list(self._entries.items()):
+                    if entry["gpu"]:
+                        self._remove(key)
+            self._evict(protect=None)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], label: str = None,
+                    tag: Hashable = None) -> Any:
+        """
+        Devuelve el modelo de ``key``, cargándolo con ``loader()`` si falta.
+        Si otra petición ya lo está cargando, espera a su resultado.
+        ``label`` (p.ej. la ruta del archivo) se guarda para los mensajes y
+        ``tag`` para ``find_tagged``.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry["hits"] += 1
+                self._stats["hits"] += 1
+                value = entry["value"]
+                if entry["lazy"]:
+                    self._resize(key, entry)
+                    self._evict(protect=key)
+                return value
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+                self._stats["misses"] += 1
+            else:
+                self._stats["waits"] += 1
+
+        if not owner:
+            # Propaga la excepción si la carga original falló
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        size, on_gpu = _measure(value)
+        with self._lock:
+            self._inflight.pop(key, None)
+            if on_gpu and not self._keep_gpu:
+                self._stats["not_retained"] += 1
+            else:
+                self._entries[key] = {
+                    "value": value, "size": size, "hits": 0, "label": label, "tag": tag,
+                    "gpu": on_gpu, "lazy": callable(getattr(value, "loaded_tensors", None)),
+                }
+                self._total_bytes += size
+                self._evict(protect=key)
+        future.set_result(value)
+        return value
+
+    def inflight(self, key: Hashable) -> Optional[Future]:
+        """Future de una carga en curso, o None."""
+        with self._lock:
+            return self._inflight.get(key)
+
+    def label(self, key: Hashable) -> Optional[str]:
+        """``label`` con el que se cargó ``key`` (None si no está)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry["label"] if entry else None
+
+    def find_tagged(self, tag: Hashable) -> List[Tuple[Hashable, Optional[str]]]:
+        """[(clave, label)] de las entradas cargadas con ``tag``."""
+        with self._lock:
+            return [(key, entry["label"]) for key, entry in self._entries.items()
+                    if tag is not None and entry["tag"] == tag]
+
+    def contains(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def remove(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._remove(key)
+
+    def _remove(self, key: Hashable) -> bool:
+        """``remove`` con ``_lock`` ya adquirido."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._total_bytes -= entry["size"]
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry["lazy"]:
+                    self._resize(key, entry)
+            stats = dict(self._stats)
+            stats.update(
+                entries=len(self._entries),
+                bytes=self._total_bytes,
+                max_bytes=self._max_bytes,
+                keep_gpu=self._keep_gpu,
+                inflight=len(self._inflight),
+            )
+            return stats
+
+    def _resize(self, key: Hashable, entry: dict) -> None:
+        """
+        Vuelve a medir un state_dict perezoso (sus tensores leídos cambian con
+        el uso). Si ahora retiene tensores en GPU y no se permite, sale del
+        almacén.
+        """
+        size, on_gpu = _measure(entry["value"])
+        self._total_bytes += size - entry["size"]
+        entry["size"], entry["gpu"] = size, on_gpu
+        if on_gpu and not self._keep_gpu:
+            self._remove(key)
+            self._stats["not_retained"] += 1
+
+    def _evict(self, protect: Optional[Hashable]) -> None:
+        """Expulsa los menos usados recientemente hasta cumplir el presupuesto."""
+        if not self._max_bytes:
+            return
+        for key, entry in list(self._entries.items()):
+            if entry["lazy"]:
+                self._resize(key, entry)
+        for key in list(self._entries):
+            if self._total_bytes <= self._max_bytes:
+                return
+            if key == protect:
+                continue
+            entry = self._entries.pop(key)
+            self._total_bytes -= entry["size"]
+            self._stats["evictions"] += 1
+            name = entry["label"] or (key[0] if isinstance(key, tuple) else key)
+            print(f"[ModelStore] Evicted {os.path.basename(str(name))} ({format_size(entry['size'])})")
+
+
+# Instancia global
+_store: Optional[LoadedModelStore] = None
+_store_lock = threading.Lock()
+
+
+def get_model_store() -> LoadedModelStore:
+    """Obtiene el almacén de modelos cargados (se crea la primera vez)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = LoadedModelStore()
+    return _store
@@ -0,0 +1,264 @@
+"""
+ModelPrefetcher - Precarga en segundo plano de los modelos de un prompt
+
+Al encolar un prompt (handler on_prompt de PromptServer) se recorre el grafo
+en busca de nodos cargadores y sus ``unet_name``, y se adelanta en un pool de
+hilos la lectura de esos archivos mientras se ejecuta el prompt anterior:
+
+- Formatos que se leen enteros al cargar (safetensors, shards, pickles
+  antiguos...): se cargan en CPU hacia el almacén de modelos cargados
+  (model_store.py). El nodo recoge ese modelo y solo lo copia a su
+  dispositivo; si la carga sigue en curso la espera (single-flight).
+- Formatos que se mapean sin leer datos (safetensors perezoso, GGUF zero-copy,
+  checkpoints zip con mmap): se leen sus páginas a la caché del sistema, que
+  es lo que el nodo habría esperado al tocar los tensores.
+
+Nada se sube a la GPU desde aquí, así que la precarga no compite por VRAM con
+el prompt en ejecución.
+
+- ``WJ_PREFETCH=0`` lo desactiva.
+- ``WJ_PREFETCH_WORKERS`` hilos de precarga (por defecto 2).
+- ``WJ_PREFETCH_LOOKAHEAD`` prompts encolados que se precargan a la vez
+  (por defecto 1: solo el siguiente).
+- ``WJ_PREFETCH_MAX_BYTES`` bytes precargados sin recoger (por defecto 8G;
+  0 = sin límite). Los modelos que no caben se dejan para el nodo.
+
+Un prompt sale de la ventana cuando sus cargadores recogen sus modelos, o
+cuando se ejecuta un cargador de un prompt posterior (el anterior terminó o
+se canceló).
+
+Este módulo no importa torch: el cargador se importa en el primer prefetch.
+"""
+
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .qwen_cache import parse_size
+
+# class_type -> entradas que forman parte de la clave de carga
+LOADER_NODES = {
+    "UnetLoaderGGUF": (),
+    "UnetLoaderGGUFAdvanced": ("dtype", "force_cpu", "zero_copy", "lazy"),
+}
+
+# Bloque de lectura al traer páginas de un archivo
+READ_CHUNK = 16 * 1024 * 1024
+
+
+def loader_requests(prompt: Dict[str, Any]) -> List[Tuple[str, Tuple[Tuple[str, Any], ...]]]:
+    """
+    Cargas que pedirá un prompt: [(unet_name, ((opción, valor), ...))], sin
+    duplicados. Se ignoran entradas conectadas a otro nodo (no son literales).
+    """
+    requests = []
+    seen = set()
+    for node in (prompt or {}).values():
+        if not isinstance(node, dict):
+            continue
+        option_names = LOADER_NODES.get(node.get("class_type"))
+        if option_names is None:
+            continue
+        inputs = node.get("inputs") or {}
+        unet_name = inputs.get("unet_name")
+        if not isinstance(unet_name, str):
+            continue
+        options = tuple(
+            (name, inputs[name]) for name in option_names
+            if name in inputs and isinstance(inputs[name], (str, bool, int, float))
+        )
+        request = (unet_name, options)
+        if request not in seen:
+            seen.add(request)
+            requests.append(request)
+    return requests
+
+
+def read_pages(paths: List[str]) -> int:
+    """
+    Lee archivos enteros (descartando los datos) para dejar sus páginas en la
+    caché del sistema. La lectura libera el GIL. Devuelve los bytes leídos.
+    """
+    buffer = bytearray(READ_CHUNK)
+    view = memoryview(buffer)
+    total = 0
+    for path in paths:
+        if hasattr(os, "posix_fadvise"):
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            finally:
+                os.close(fd)
+        with open(path, "rb", buffering=0) as f:
+            while True:
+                n = f.readinto(view)
+                if not n:
+                    break
+                total += n
+    return total
+
+
+class ModelPrefetcher:
+    """Adelanta la lectura de los modelos de los próximos prompts encolados."""
+
+    def __init__(self, max_workers: int = None, lookahead: int = None, max_bytes: Any = None):
+        if max_workers is None:
+            max_workers = int(os.environ.get("WJ_PREFETCH_WORKERS", "2") or 2)
+        if lookahead is None:
+            lookahead = int(os.environ.get("WJ_PREFETCH_LOOKAHEAD", "1") or 1)
+        if max_bytes is None:
+            max_bytes = os.environ.get("WJ_PREFETCH_MAX_BYTES", "8G")
+        self.max_workers = max(1, max_workers)
+        self.lookahead = max(1, lookahead)
+        self.max_bytes = parse_size(max_bytes)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Prompts encolados, en orden: {"requests", "pending", "started", "bytes"}
+        self._jobs: "deque[dict]" = deque()
+        self._bytes = 0
+        self._stats = {"prompts": 0, "staged": 0, "paged_in": 0, "skipped": 0, "failed": 0}
+
+    def on_prompt(self, json_data: dict) -> dict:
+        """Handler de PromptServer: nunca falla ni modifica el prompt."""
+        try:
+            self.prefetch_prompt(json_data.get("prompt") or {})
+        except Exception as e:
+            print(f"[ModelPrefetcher] Warning: {e}")
+        return json_data
+
+    def prefetch_prompt(self, prompt: Dict[str, Any]) -> List[Future]:
+        """
+        Encola la precarga de los cargadores de ``prompt``. Devuelve los
+        Future de las precargas que empiezan ahora (ninguna si el prompt queda
+        fuera de la ventana ``lookahead``; empezará al avanzar la cola).
+        """
+        requests = loader_requests(prompt)
+        if not requests:
+            return []
+        with self._lock:
+            self._stats["prompts"] += 1
+            self._jobs.append({
+                "requests": requests,
+                "pending": {unet_name for unet_name, _ in requests},
+                "started": False,
+                "bytes": 0,
+            })
+            return self._advance()
+
+    def notify_load(self, unet_name: str) -> None:
+        """
+        Un nodo cargador va a cargar ``unet_name``: su prompt se está
+        ejecutando. Los prompts anteriores salen de la ventana y, si ya se
+        recogieron todos sus modelos, también el suyo.
+        """
+        with self._lock:
+            for i, job in enumerate(self._jobs):
+                if unet_name in job["pending"]:
+                    break
+            else:
+                return
+            for _ in range(i):
+                self._release(self._jobs.popleft())
+            job["pending"].discard(unet_name)
+            if not job["pending"]:
+                self._release(self._jobs.popleft())
+            self._advance()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(queued=len(self._jobs), bytes=self._bytes, max_bytes=self.max_bytes)
+            return stats
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._jobs.clear()
+            self._bytes = 0
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    # ------------------------------------------------------------------
+    # Internos (``_advance``, ``_release`` y ``_reserve`` con ``_lock``)
+    # ------------------------------------------------------------------
+    def _advance(self) -> List[Future]:
+        """Lanza los prompts de la ventana que aún no empezaron."""
+        futures = []
+        for job in list(self._jobs)[:self.lookahead]:
+            if job["started"]:
+                continue
+            job["started"] = True
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="ModelPrefetch")
+            for unet_name, options in job["requests"]:
+                futures.append(self._pool.submit(self._prefetch, job, unet_name, dict(options)))
+        return futures
+
+    def _release(self, job: dict) -> None:
+        self._bytes -= job["bytes"]
+        job["bytes"] = 0
+
+    def _reserve(self, job: dict, nbytes: int) -> bool:
+        """Reserva ``nbytes`` del presupuesto para un prompt aún en la ventana."""
+        with self._lock:
+            if not any(j is job for j in self._jobs):
+                return False
+            if self.max_bytes and self._bytes + nbytes > self.max_bytes:
+                self._stats["skipped"] += 1
+                return False
+            self._bytes += nbytes
+            job["bytes"] += nbytes
+            return True
+
+    def _prefetch(self, job: dict, unet_name: str, options: dict) -> Optional[str]:
+        from .unet_loader_gguf import UnetLoaderGGUF
+
+        try:
+            mode = UnetLoaderGGUF().prefetch_model(
+                unet_name, reserve=lambda nbytes: self._reserve(job, nbytes), **options
+            )
+        except Exception as e:
+            with self._lock:
+                self._stats["failed"] += 1
+            print(f"[ModelPrefetcher] Warning: could not prefetch {unet_name}: {e}")
+            raise
+        if mode is not None:
+            with self._lock:
+                self._stats[mode] += 1
+        return mode
+
+
+# Instancia global
+_prefetcher: Optional[ModelPrefetcher] = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher() -> ModelPrefetcher:
+    """Obtiene el prefetcher (se crea la primera vez)."""
+    global _prefetcher
+    if _prefetcher is None:
+        with _prefetcher_lock:
+            if _prefetcher is None:
+                _prefetcher = ModelPrefetcher()
+    return _prefetcher
+
+
+def notify_load(unet_name: str) -> None:
+    """Avisa al prefetcher (si existe) de que un nodo cargador se ejecuta."""
+    if _prefetcher is not None:
+        _prefetcher.notify_load(unet_name)
+
+
+def install() -> bool:
+    """Registra el handler on_prompt en PromptServer. True si se registró."""
+    if os.environ.get("WJ_PREFETCH", "1") in ("0", "false", "False"):
+        return False
+    try:
+        from server import PromptServer
+        PromptServer.instance.add_on_prompt_handler(get_prefetcher().on_prompt)
+    except (ImportError, AttributeError):
+        return False
+    return True
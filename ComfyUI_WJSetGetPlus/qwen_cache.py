@@ -3,9 +3,19 @@ QwenCache - Sistema de memoria global para ComfyUI
 Compatible con rgthree-comfy SetNode/GetNode
 """
 
+import os
+import re
+import sys
+import json
 import time
+import hashlib
+import uuid
+import atexit
+import tempfile
+import itertools
 import threading
-from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 # ============================================================================
 # TIPOS SOPORTADOS POR COMFYUI
@@ -17,10 +27,136 @@ COMFY_TYPES = [
     "SAMPLER", "SIGMAS", "NOISE", "GUIDER", "STRING", "INT", "FLOAT"
 ]
 
+# Ámbito compartido por todas las generaciones (prompts)
+GLOBAL_SCOPE = "global"
+# Ámbitos en los que puede escribir SetNode
+SET_NODE_SCOPES = (GLOBAL_SCOPE, "prompt")
+
+# Políticas de expulsión cuando se supera el presupuesto de memoria
+EVICTION_POLICIES = ("lru", "lfu")
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(value: Any) -> int:
+    """
+    Convierte un tamaño a bytes. Acepta enteros o strings como "512M", "8GB".
+    0 o vacío significa "sin límite".
+    """
+    if value is None:
+        return 0
+    if isinstance(value, (int, float)):
+        return max(0, int(value))
+    text = str(value).strip().upper().replace(" ", "")
+    if text.endswith("IB"):
+        text = text[:-2]
+    elif text.endswith("B"):
+        text = text[:-1]
+    if not text:
+        return 0
+    unit = text[-1] if text[-1] in _SIZE_UNITS else ""
+    number = text[:-1] if unit else text
+    return max(0, int(float(number) * _SIZE_UNITS[unit]))
+
+
+def format_size(nbytes: int) -> str:
+    """Bytes en formato legible: 1536 -> "1.5 KB"."""
+    size = float(nbytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024 or unit == "GB":
+            break
+        size /= 1024
+    return f"{int(size)} B" if unit == "B" else f"{size:.1f} {unit}"
+
+
+# ============================================================================
+# DETECCIÓN DE TIPO
+# ============================================================================
+# Detección por nombre de clase (subcadena, en este orden)
+_CLASS_MAPPINGS = (
+    ("ModelPatcher", "MODEL"),
+    ("CLIP", "CLIP"),
+    ("VAE", "VAE"),
+    ("ControlNet", "CONTROL_NET"),
+    ("T2IAdapter", "CONTROL_NET"),
+    ("StyleModel", "STYLE_MODEL"),
+    ("CLIPVisionModel", "CLIP_VISION"),
+)
+
+# type(value) -> (comprobaciones estructurales, tipo por defecto).
+# Se rellena bajo demanda; las escrituras concurrentes son inocuas.
+_TYPE_DISPATCH: Dict[type, Tuple[tuple, str]] = {}
+_TYPE_DISPATCH_MAX = 512
+
+
+def _check_dict(value: dict) -> Optional[str]:
+    # Detección por estructura de diccionario
+    if "samples" in value:
+        return "LATENT"
+    if "cond" in value:
+        return "CONDITIONING"
+    # Solo el primer valor, sin materializar la lista completa
+    if len(value) > 0 and isinstance(next(iter(value.values())), tuple):
+        return "CONDITIONING"
+    return None
+
+
+def _check_list(value: list) -> Optional[str]:
+    # Detección por lista de condiciones
+    if len(value) > 0:
+        first = value[0]
+        if isinstance(first, (list, tuple)) and len(first) >= 2:
+            return "CONDITIONING"
+    return None
+
+
+def _check_tensor(value: Any) -> Optional[str]:
+    # 4D con shape típico de imagen (B, C, H, W)
+    if value.dim() == 4:
+        if value.shape[1] in (1, 3, 4):  # Grayscale, RGB, RGBA
+            return "IMAGE"
+        return "LATENT"
+    # 3D podría ser máscara
+    if value.dim() == 3:
+        return "MASK"
+    return None
+
+
+def _build_dispatch(value_type: type) -> Tuple[tuple, str]:
+    """Calcula una vez por tipo qué comprobaciones aplicar y en qué orden."""
+    type_name = value_type.__name__
+    for class_name, comfy_type in _CLASS_MAPPINGS:
+        if class_name in type_name:
+            return (), comfy_type
+
+    checks = []
+    if issubclass(value_type, dict):
+        checks.append(_check_dict)
+    if issubclass(value_type, list):
+        checks.append(_check_list)
+    # Si torch no está importado, ningún tipo puede ser un tensor
+    torch = sys.modules.get("torch")
+    if torch is not None and issubclass(value_type, torch.Tensor):
+        checks.append(_check_tensor)
+
+    # Tipos primitivos
+    if issubclass(value_type, str):
+        fallback = "STRING"
+    elif issubclass(value_type, int):
+        fallback = "INT"
+    elif issubclass(value_type, float):
+        fallback = "FLOAT"
+    else:
+        fallback = "*"
+    return tuple(checks), fallback
+
 
 def detect_comfy_type(value: Any) -> str:
     """
     Detecta el tipo ComfyUI de un valor basándose en su estructura.
+
+    El análisis por tipo (nombre de clase, herencia) se memoiza por
+    ``type(value)``; por valor solo quedan comprobaciones O(1).
     
     Args:
         value: El valor a analizar
@@ -30,62 +166,176 @@ def detect_comfy_type(value: Any) -> str:
     """
     if value is None:
         return "*"
-    
-    type_name = type(value).__name__
-    module = type(value).__module__ if hasattr(type(value), '__module__') else ""
-    
-    # Detección por nombre de clase
-    class_mappings = {
-        "ModelPatcher": "MODEL",
-        "CLIP": "CLIP", 
-        "VAE": "VAE",
-        "ControlNet": "CONTROL_NET",
-        "T2IAdapter": "CONTROL_NET",
-        "StyleModel": "STYLE_MODEL",
-        "CLIPVisionModel": "CLIP_VISION",
-    }
-    
-    for class_name, comfy_type in class_mappings.items():
-        if class_name in type_name:
+
+    value_type = type(value)
+    dispatch = _TYPE_DISPATCH.get(value_type)
+    if dispatch is None:
+        dispatch = _build_dispatch(value_type)
+        if len(_TYPE_DISPATCH) >= _TYPE_DISPATCH_MAX:
+            _TYPE_DISPATCH.clear()
+        _TYPE_DISPATCH[value_type] = dispatch
+
+    checks, fallback = dispatch
+    for check in checks:
+        comfy_type = check(value)
+        if comfy_type is not None:
             return comfy_type
-    
-    # Detección por estructura de diccionario
-    if isinstance(value, dict):
-        if "samples" in value:
-            return "LATENT"
-        if "cond" in value or len(value) > 0 and isinstance(list(value.values())[0], tuple):
-            return "CONDITIONING"
-    
-    # Detección por lista de condiciones
-    if isinstance(value, list) and len(value) > 0:
-        first = value[0]
-        if isinstance(first, (list, tuple)) and len(first) >= 2:
-            return "CONDITIONING"
-    
-    # Detección por tensor
+    return fallback
+
+
+# ============================================================================
+# ESTIMACIÓN DE TAMAÑO
+# ============================================================================
+def block_device(key: tuple) -> str:
+    """Dispositivo de un bloque: ("tensor"|"model", device, ptr) o "cpu"."""
+    return key[1] if len(key) == 3 else "cpu"
+
+
+def _tensor_block(value: Any) -> Optional[Tuple[tuple, int]]:
+    """Bloque (clave, bytes) del storage de un tensor torch, o None."""
+    torch = sys.modules.get("torch")
+    if torch is None or not isinstance(value, torch.Tensor):
+        return None
+    try:
+        storage = value.untyped_storage()
+    except AttributeError:  # PyTorch < 2.0
+        storage = value.storage()._untyped()
+    nbytes = storage.nbytes()
+    ptr = storage.data_ptr()
+    # Tensores "meta" o vacíos no tienen puntero: identificarlos por id
+    key = ("tensor", str(value.device), ptr) if ptr else ("tensor", id(storage))
+    return key, nbytes
+
+
+def estimate_size(value: Any) -> Tuple[int, Dict[tuple, int]]:
+    """
+    Estima los bytes que ocupa un valor.
+
+    Recorre dicts/listas/tuplas y cuenta cada tensor por su storage, de modo
+    que vistas y tensores que comparten memoria se cuentan una sola vez.
+
+    Returns:
+        (bytes totales, {clave_de_bloque: bytes}) - las claves permiten
+        deduplicar storages compartidos entre varias entradas del caché.
+    """
+    blocks: Dict[tuple, int] = {}
+    seen = set()
+    stack = [value]
+
+    while stack:
+        obj = stack.pop()
+        if obj is None or id(obj) in seen:
+            continue
+        seen.add(id(obj))
+
+        tensor = _tensor_block(obj)
+        if tensor is not None:
+            blocks.setdefault(tensor[0], tensor[1])
+            continue
+
+        if isinstance(obj, dict):
+            stack.extend(obj.values())
+            continue
+        if isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+            continue
+        if isinstance(obj, (str, bytes, bytearray)):
+            blocks[("obj", id(obj))] = sys.getsizeof(obj)
+            continue
+
+        # Arrays numpy: contar el buffer base una sola vez
+        nbytes = getattr(obj, "nbytes", None)
+        if isinstance(nbytes, int) and hasattr(obj, "__array_interface__"):
+            base = obj
+            while getattr(base, "base", None) is not None:
+                base = base.base
+            blocks.setdefault(("array", id(base)), getattr(base, "nbytes", nbytes))
+            continue
+
+        # ModelPatcher (MODEL) y envoltorios con .patcher (CLIP, VAE)
+        patcher = obj if callable(getattr(obj, "model_size", None)) else getattr(obj, "patcher", None)
+        if patcher is not None and callable(getattr(patcher, "model_size", None)):
+            try:
+                inner = getattr(patcher, "model", patcher)
+                device = str(getattr(inner, "device", "cpu"))
+                blocks.setdefault(("model", device, id(inner)), int(patcher.model_size()))
+                continue
+            except Exception:
+                pass
+
+        blocks[("obj", id(obj))] = sys.getsizeof(obj)
+
+    return sum(blocks.values()), blocks
+
+
+# ============================================================================
+# NIVEL EN DISCO (SPILL)
+# ============================================================================
+# Tipos cuyo tensor puede escribirse a disco en lugar de expulsarse
+SPILLABLE_TYPES = ("IMAGE", "MASK", "LATENT")
+
+
+def _spillable_tensor(value: Any, dtype: str) -> Optional[Tuple[Any, Optional[dict]]]:
+    """
+    Devuelve (tensor, resto) si la entrada puede ir a disco.
+    Para LATENT el tensor es ``samples`` y ``resto`` el dict sin él.
+    """
+    torch = sys.modules.get("torch")
+    if torch is None or dtype not in SPILLABLE_TYPES:
+        return None
+    if dtype == "LATENT":
+        if isinstance(value, dict) and isinstance(value.get("samples"), torch.Tensor):
+            rest = {k: v for k, v in value.items() if k != "samples"}
+            return value["samples"], rest
+        return None
+    if isinstance(value, torch.Tensor):
+        return value, None
+    return None
+
+
+def _write_spill(path: str, tensor: Any) -> dict:
+    """Escribe un tensor como .npy y devuelve los metadatos para releerlo."""
+    import numpy as np
+    import torch
+
+    data = tensor.detach().to("cpu").contiguous()
+    torch_dtype = str(data.dtype).replace("torch.", "")
+    # numpy no tiene bfloat16: se guardan los bits como int16
+    if data.dtype == torch.bfloat16:
+        data = data.view(torch.int16)
+    np.save(path, data.numpy(), allow_pickle=False)
+    return {
+        "path": path,
+        "dtype": torch_dtype,
+        "device": str(tensor.device),
+        "nbytes": data.numel() * data.element_size(),
+    }
+
+
+def _read_spill(meta: dict) -> Any:
+    """
+    Relee un tensor escrito con ``_write_spill`` mediante mmap, sin copiar.
+    El mapeo es copy-on-write: modificar el tensor no altera el archivo.
+    """
+    import numpy as np
+    import torch
+
+    array = np.load(meta["path"], mmap_mode="c", allow_pickle=False)
+    tensor = torch.from_numpy(array)
+    if meta["dtype"] == "bfloat16":
+        tensor = tensor.view(torch.bfloat16)
+    if meta["device"] != "cpu":
+        tensor = tensor.to(meta["device"])
+    return tensor
+
+
+def _remove_file(path: Optional[str]) -> None:
+    if not path:
+        return
     try:
-        import torch
-        if isinstance(value, torch.Tensor):
-            # 4D con shape típico de imagen (B, C, H, W)
-            if value.dim() == 4:
-                if value.shape[1] in (1, 3, 4):  # Grayscale, RGB, RGBA
-                    return "IMAGE"
-                return "LATENT"
-            # 3D podría ser máscara
-            if value.dim() == 3:
-                return "MASK"
-    except ImportError:
+        os.remove(path)
+    except OSError:
         pass
-    
-    # Tipos primitivos
-    if isinstance(value, str):
-        return "STRING"
-    if isinstance(value, int):
-        return "INT"
-    if isinstance(value, float):
-        return "FLOAT"
-    
-    return "*"
 
 
 # ============================================================================
@@ -94,6 +344,32 @@ def detect_comfy_type(value: Any) -> str:
 class QwenCache:
     """
     Singleton thread-safe para almacenar variables entre nodos.
+
+    Las lecturas no toman ningún lock: buscan directamente en el dict (las
+    operaciones de dict son atómicas en CPython) y registran el acceso con un
+    reloj lógico. Solo las escrituras se serializan con ``_data_lock``. Como
+    las escrituras sustituyen entradas completas, un lector nunca ve una
+    entrada a medio construir. ``set_many``/``get_many``/``pop_many``/
+    ``snapshot`` operan sobre varias entradas de forma atómica.
+
+    Cada entrada vive en un ámbito (scope): el de la generación (prompt) que
+    la creó, o el ámbito ``global``. Las lecturas buscan primero en el ámbito
+    pedido y después en el global. Las entradas de una generación se liberan
+    en bloque cuando la generación termina; las globales pueden caducar con
+    un TTL (``QWEN_CACHE_GLOBAL_TTL`` en segundos).
+
+    Con un presupuesto de memoria (``max_bytes``) expulsa entradas según la
+    política ``lru`` o ``lfu``. Las entradas fijadas con ``pin`` nunca se
+    expulsan. El presupuesto inicial se lee de ``QWEN_CACHE_MAX_BYTES``
+    (p.ej. "16G"); 0 significa sin límite.
+
+    Si se registran los lectores de una generación (``track_readers``), cada
+    entrada escrita por esa generación (en su ámbito o en el global) se
+    libera en cuanto su último GetNode la consume.
+
+    Si hay un directorio de spill (``QWEN_CACHE_SPILL_DIR``), los tensores
+    grandes IMAGE/MASK/LATENT se escriben a disco en vez de expulsarse y se
+    releen de forma transparente (mmap, sin copia) en ``get``.
     """
     _instance: Optional['QwenCache'] = None
     _lock = threading.Lock()
@@ -110,75 +386,870 @@ class QwenCache:
         if not QwenCache._initialized:
             with QwenCache._lock:
                 if not QwenCache._initialized:
-                    self._data: Dict[str, dict] = {}
+                    # Clave (scope, nombre) -> entrada. Solo los escritores toman el lock
+                    self._data: Dict[Tuple[str, str], dict] = {}
                     self._data_lock = threading.RLock()
+                    # Reloj lógico de accesos (LRU): next() es atómico en CPython
+                    self._clock = itertools.count()
+                    # Nombres por ámbito, para liberar una generación en bloque
+                    self._scopes: Dict[str, set] = {}
+                    # Generaciones vivas: scope -> objeto prompt (orden de inicio)
+                    self._generations: "OrderedDict[str, Any]" = OrderedDict()
+                    self._generation_ids: Dict[int, str] = {}
+                    self._generation_counter = 0
+                    self._max_generations = max(
+                        1, int(os.environ.get("QWEN_CACHE_MAX_GENERATIONS", 1))
+                    )
+                    self._global_ttl = float(os.environ.get("QWEN_CACHE_GLOBAL_TTL", 0))
+                    # Ámbito de SetNode: "global" (sobrevive entre ejecuciones,
+                    # como siempre) o "prompt" (se libera con la generación)
+                    scope = os.environ.get("QWEN_CACHE_SETNODE_SCOPE", GLOBAL_SCOPE).lower()
+                    self._set_node_scope = scope if scope in SET_NODE_SCOPES else GLOBAL_SCOPE
+                    # Lectores pendientes por generación: scope -> {nombre: n}
+                    self._readers: Dict[str, Dict[str, int]] = {}
+                    self._release_on_last_read = os.environ.get(
+                        "QWEN_CACHE_RELEASE_ON_LAST_READ", "1"
+                    ) not in ("0", "false", "False")
+                    # Bloques de memoria compartidos: clave -> [bytes, refcount, tipo]
+                    self._blocks: Dict[tuple, list] = {}
+                    self._total_bytes = 0
+                    self._pinned = set()
+                    self._max_bytes = parse_size(os.environ.get("QWEN_CACHE_MAX_BYTES", 0))
+                    policy = os.environ.get("QWEN_CACHE_POLICY", "lru").lower()
+                    self._policy = policy if policy in EVICTION_POLICIES else "lru"
+                    # Nivel en disco
+                    self._spill_dir = os.environ.get("QWEN_CACHE_SPILL_DIR", "")
+                    self._spill_min_bytes = parse_size(
+                        os.environ.get("QWEN_CACHE_SPILL_MIN_BYTES", "1M")
+                    )
+                    self._spill_stats = {
+                        "writes": 0,
+                        "bytes_written": 0,
+                        "hits": 0,
+                        "misses": 0,
+                        "read_seconds": 0.0,
+                        "max_read_seconds": 0.0,
+                    }
+                    # Contadores de métricas de escritura (con ``_data_lock``)
+                    self._counters = dict.fromkeys(
+                        ("sets", "evictions", "releases", "expirations", "generations"), 0
+                    )
+                    # "gets"/"misses": uno por hilo lector, sumados en stats(),
+                    # para que las lecturas no escriban en un objeto compartido
+                    self._local = threading.local()
+                    self._read_counts: List[list] = []
+                    self._metrics_file = os.environ.get("QWEN_CACHE_METRICS_FILE", "")
+                    atexit.register(self._cleanup_spill)
                     QwenCache._initialized = True
 
-    def set(self, name: str, value: Any, dtype: str = None) -> str:
+    # ------------------------------------------------------------------
+    # Configuración
+    # ------------------------------------------------------------------
+    def configure(self, max_bytes: Any = None, policy: str = None,
+                  spill_dir: str = None, spill_min_bytes: Any = None,
+                  max_generations: int = None, global_ttl: float = None,
+                  release_on_last_read: bool = None,
+                  set_node_scope: str = None) -> None:
+        """
+        Ajusta el presupuesto de memoria, la política de expulsión, el
+        nivel en disco y la caducidad de ámbitos.
+
+        Args:
+            max_bytes: Bytes (int) o string ("8G"). 0 = sin límite.
+            policy: "lru" o "lfu"
+            spill_dir: Directorio de spill. "" desactiva el nivel en disco;
+                "temp" usa el directorio temporal del sistema.
+            spill_min_bytes: Tamaño mínimo de un tensor para ir a disco.
+            max_generations: Generaciones (prompts) vivas a la vez. Al empezar
+                una nueva se liberan las más antiguas.
+            global_ttl: Segundos de vida de las entradas globales. 0 = sin TTL.
+            release_on_last_read: Liberar cada entrada del prompt tras su
+                último lector (ver ``track_readers``).
+            set_node_scope: Ámbito en el que escribe SetNode: "global" o
+                "prompt".
+        """
+        if policy is not None and policy not in EVICTION_POLICIES:
+            raise ValueError(f"[QwenCache] Unknown policy: {policy} (use {EVICTION_POLICIES})")
+        if set_node_scope is not None and set_node_scope not in SET_NODE_SCOPES:
+            raise ValueError(
+                f"[QwenCache] Unknown SetNode scope: {set_node_scope} (use {SET_NODE_SCOPES})"
+            )
+
+        with self._data_lock:
+            if max_bytes is not None:
+                self._max_bytes = parse_size(max_bytes)
+            if policy is not None:
+                self._policy = policy
+            if spill_dir is not None:
+                if spill_dir == "temp":
+                    spill_dir = os.path.join(tempfile.gettempdir(), "qwen_cache_spill")
+                self._spill_dir = spill_dir
+            if spill_min_bytes is not None:
+                self._spill_min_bytes = parse_size(spill_min_bytes)
+            if max_generations is not None:
+                self._max_generations = max(1, int(max_generations))
+                self._trim_generations()
+            if global_ttl is not None:
+                self._global_ttl = max(0.0, float(global_ttl))
+                self._expire_globals()
+            if release_on_last_read is not None:
+                self._release_on_last_read = bool(release_on_last_read)
+            if set_node_scope is not None:
+                self._set_node_scope = set_node_scope
+            self._evict()
+
+    def pin(self, name: str) -> None:
+        """Fija un nombre para que nunca sea expulsado (aunque aún no exista)."""
+        with self._data_lock:
+            self._pinned.add(name)
+
+    def unpin(self, name: str) -> None:
+        """Permite de nuevo la expulsión de un nombre."""
+        with self._data_lock:
+            self._pinned.discard(name)
+            self._evict()
+
+    def is_pinned(self, name: str) -> bool:
+        with self._data_lock:
+            return name in self._pinned
+
+    def usage(self) -> Dict[str, Any]:
+        """Uso de memoria actual del caché."""
+        with self._data_lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._total_bytes,
+                "max_bytes": self._max_bytes,
+                "policy": self._policy,
+                "pinned": sorted(self._pinned),
+                "spilled": sum(1 for e in self._data.values() if "spill" in e),
+                "generations": list(self._generations),
+            }
+
+    def spill_stats(self) -> Dict[str, Any]:
+        """
+        Estadísticas del nivel en disco: escrituras, aciertos (lecturas
+        servidas desde disco), fallos (archivo perdido) y latencia de lectura.
+        """
+        with self._data_lock:
+            stats = dict(self._spill_stats)
+            stats["dir"] = self._spill_dir
+            stats["entries"] = sum(1 for e in self._data.values() if "spill" in e)
+            stats["disk_bytes"] = sum(
+                e["spill"]["nbytes"] for e in self._data.values() if "spill" in e
+            )
+        reads = stats["hits"]
+        stats["avg_read_seconds"] = stats["read_seconds"] / reads if reads else 0.0
+        return stats
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+    def stats(self) -> Dict[str, Any]:
+        """
+        Contadores (sets, gets, misses, evictions, releases, expirations,
+        generations) y medidores: entradas y bytes totales, y bytes por tipo
+        y por dispositivo. Los bytes en disco aparecen con dispositivo "disk".
+        """
+        with self._data_lock:
+            by_type: Dict[str, int] = {}
+            by_device: Dict[str, int] = {}
+            by_type_device: Dict[Tuple[str, str], int] = {}
+            for key, (nbytes, _, dtype) in self._blocks.items():
+                device = block_device(key)
+                by_type[dtype] = by_type.get(dtype, 0) + nbytes
+                by_device[device] = by_device.get(device, 0) + nbytes
+                by_type_device[(dtype, device)] = by_type_device.get((dtype, device), 0) + nbytes
+            for entry in self._data.values():
+                if "spill" in entry:
+                    nbytes, dtype = entry["spill"]["nbytes"], entry["type"]
+                    by_device["disk"] = by_device.get("disk", 0) + nbytes
+                    by_type_device[(dtype, "disk")] = by_type_device.get((dtype, "disk"), 0) + nbytes
+            return {
+                "counters": dict(
+                    self._counters,
+                    gets=sum(counts[0] for counts in self._read_counts),
+                    misses=sum(counts[1] for counts in self._read_counts),
+                ),
+                "entries": len(self._data),
+                "bytes": self._total_bytes,
+                "max_bytes": self._max_bytes,
+                "bytes_by_type": by_type,
+                "bytes_by_device": by_device,
+                "bytes_by_type_device": by_type_device,
+                "spill": self.spill_stats(),
+            }
+
+    def entries_info(self, scope: str = None) -> List[Dict[str, Any]]:
+        """
+        Detalle por entrada: nombre, ámbito, tipo, bytes, edad, último
+        acceso, número de accesos, si está fijada y nivel (memory/disk).
+        """
+        now = time.time()
+        with self._data_lock:
+            if scope is not None:
+                items = [(key, self._data[key]) for _, key in self._visible(scope)]
+            else:
+                items = list(self._data.items())
+            return [
+                {
+                    "name": key[1],
+                    "scope": key[0],
+                    "type": entry["type"],
+                    "bytes": entry["spill"]["nbytes"] if "spill" in entry else entry["size"],
+                    "age": now - entry["time"],
+                    "last_access": entry["last_access"],
+                    "idle": now - entry["last_access"],
+                    "hits": entry["hits"],
+                    "pinned": key[1] in self._pinned,
+                    "tier": "disk" if "spill" in entry else "memory",
+                }
+                for key, entry in items
+            ]
+
+    def prometheus_text(self, per_entry: bool = True) -> str:
+        """Métricas en formato de texto de Prometheus."""
+        stats = self.stats()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP qwen_cache_{name} {help_text}")
+            lines.append(f"# TYPE qwen_cache_{name} {kind}")
+            for labels, value in samples:
+                label_str = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+                lines.append(f"qwen_cache_{name}{{{label_str}}} {value}" if label_str
+                             else f"qwen_cache_{name} {value}")
+
+        for counter, value in stats["counters"].items():
+            metric(f"{counter}_total", "counter", f"Total {counter}.", [({}, value)])
+        metric("entries", "gauge", "Entries in the cache.", [({}, stats["entries"])])
+        metric("bytes", "gauge", "Bytes held in memory.", [({}, stats["bytes"])])
+        metric("max_bytes", "gauge", "Memory budget (0 = unlimited).", [({}, stats["max_bytes"])])
+        metric("type_bytes", "gauge", "Bytes by ComfyUI type and device.", [
+            ({"type": dtype, "device": device}, nbytes)
+            for (dtype, device), nbytes in sorted(stats["bytes_by_type_device"].items())
+        ])
+        spill = stats["spill"]
+        metric("spill_writes_total", "counter", "Entries written to disk.", [({}, spill["writes"])])
+        metric("spill_hits_total", "counter", "Reads served from disk.", [({}, spill["hits"])])
+        metric("spill_misses_total", "counter", "Unreadable spill files.", [({}, spill["misses"])])
+        metric("spill_read_seconds_total", "counter", "Time spent reading from disk.",
+               [({}, f"{spill['read_seconds']:.6f}")])
+
+        if per_entry:
+            entries = self.entries_info()
+            metric("entry_bytes", "gauge", "Bytes per entry.", [
+                ({"name": e["name"], "scope": e["scope"], "type": e["type"], "tier": e["tier"]}, e["bytes"])
+                for e in entries
+            ])
+            metric("entry_age_seconds", "gauge", "Seconds since the entry was set.", [
+                ({"name": e["name"], "scope": e["scope"]}, f"{e['age']:.3f}") for e in entries
+            ])
+            metric("entry_idle_seconds", "gauge", "Seconds since the last read.", [
+                ({"name": e["name"], "scope": e["scope"]}, f"{e['idle']:.3f}") for e in entries
+            ])
+            metric("entry_hits", "gauge", "Reads per entry.", [
+                ({"name": e["name"], "scope": e["scope"]}, e["hits"]) for e in entries
+            ])
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str = None, per_entry: bool = True) -> Optional[str]:
+        """
+        Escribe las métricas en ``path`` (o ``QWEN_CACHE_METRICS_FILE``) de
+        forma atómica, para que un scraper nunca lea un archivo a medias.
+
+        Returns:
+            La ruta escrita, o None si no hay ruta configurada
+        """
+        path = path or self._metrics_file
+        if not path:
+            return None
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text(per_entry))
+        os.replace(tmp_path, path)
+        return path
+
+    # ------------------------------------------------------------------
+    # Generaciones (un ámbito por prompt)
+    # ------------------------------------------------------------------
+    def begin_generation(self, prompt: Any) -> str:
+        """
+        Devuelve el ámbito de la generación a la que pertenece ``prompt``
+        (el grafo que ComfyUI pasa como input oculto PROMPT), creándola si es
+        nueva. Todos los nodos de una misma ejecución reciben el mismo objeto.
+
+        Al crear una generación se liberan las más antiguas si se supera
+        ``max_generations`` y se purgan las entradas globales caducadas.
+        """
+        if prompt is None:
+            return GLOBAL_SCOPE
+
+        # Camino rápido sin lock: la generación ya existe
+        scope = self._generation_ids.get(id(prompt))
+        if scope is not None and self._generations.get(scope) is prompt:
+            return scope
+
+        with self._data_lock:
+            scope = self._generation_ids.get(id(prompt))
+            if scope is not None and self._generations.get(scope) is prompt:
+                return scope
+
+            scope = self._new_generation_id(prompt)
+            # Se guarda una referencia al prompt para que su id() no se reutilice
+            self._generations[scope] = prompt
+            self._generation_ids[id(prompt)] = scope
+            self._trim_generations()
+            self._expire_globals()
+        # Volcado de métricas una vez por prompt, si hay archivo configurado
+        if self._metrics_file:
+            try:
+                self.write_prometheus()
+            except OSError as e:
+                print(f"[QwenCache] Warning: could not write metrics: {e}")
+        return scope
+
+    def end_generation(self, scope: str) -> int:
+        """Libera en bloque todas las entradas de una generación."""
+        if scope == GLOBAL_SCOPE:
+            return 0
+        with self._data_lock:
+            prompt = self._generations.pop(scope, None)
+            if prompt is not None:
+                self._counters["generations"] += 1
+                if self._generation_ids.get(id(prompt)) == scope:
+                    del self._generation_ids[id(prompt)]
+            self._readers.pop(scope, None)
+            names = self._scopes.pop(scope, set())
+            for name in list(names):
+                self._drop((scope, name))
+        if names:
+            print(f"[QwenCache] Generation '{scope}' ended, released {len(names)} variable(s)")
+        return len(names)
+
+    def set_node_scope(self, prompt: Any) -> str:
+        """
+        Ámbito en el que SetNode guarda sus variables: el global por defecto,
+        para que un GetNode de una ejecución posterior siga viéndolas, o el
+        de la generación de ``prompt`` con ``set_node_scope="prompt"``.
+        """
+        scope = self.begin_generation(prompt)
+        return scope if self._set_node_scope == "prompt" else GLOBAL_SCOPE
+
+    def tracks_readers(self, scope: str) -> bool:
+        """True si ya se registraron los lectores de esta generación."""
+        return scope in self._readers
+
+    def track_readers(self, scope: str, counts: Dict[str, int]) -> None:
+        """
+        Registra cuántos GetNode leerán cada nombre en una generación.
+        Solo la primera llamada por generación tiene efecto.
+        """
+        if scope == GLOBAL_SCOPE:
+            return
+        with self._data_lock:
+            if scope in self._generations and scope not in self._readers:
+                self._readers[scope] = dict(counts)
+
+    def consume(self, name: str, scope: str) -> bool:
+        """
+        Anota que un lector de ``name`` terminó. Tras el último lector se
+        elimina la entrada que ve ``scope`` si la escribió esta misma
+        generación: la del prompt o una global escrita por su SetNode. Las
+        globales de ejecuciones anteriores y las fijadas se conservan.
+
+        Returns:
+            True si la entrada se liberó
+        """
+        pending = self._readers.get(scope)
+        if pending is None or name not in pending:
+            return False
+        with self._data_lock:
+            pending = self._readers.get(scope)
+            if pending is None or name not in pending:
+                return False
+            pending[name] -= 1
+            if pending[name] > 0:
+                return False
+            del pending[name]
+            if not self._release_on_last_read or name in self._pinned:
+                return False
+            key, entry = self._lookup(name, scope)
+            if entry is None or (key[0] != scope and entry.get("generation") != scope):
+                return False
+            released = self._drop(key)
+            if released:
+                self._counters["releases"] += 1
+        if released:
+            print(f"[QwenCache] '{name}' released after its last reader")
+        return released
+
+    def _new_generation_id(self, prompt: Any) -> str:
+        """
+        Id de la generación que ejecuta ``prompt``. ``last_prompt_id`` del
+        servidor es el último prompt *encolado*, no el que se ejecuta, así
+        que se usa el contexto de ejecución de ComfyUI si existe y, si no, un
+        hash del grafo. Dos prompts idénticos vivos a la vez se distinguen
+        con un sufijo.
+        """
+        prompt_id = None
+        context_module = sys.modules.get("comfy_execution.utils")
+        get_context = getattr(context_module, "get_executing_context", None)
+        if get_context is not None:
+            prompt_id = getattr(get_context(), "prompt_id", None)
+        if not prompt_id:
+            try:
+                digest = json.dumps(prompt, sort_keys=True, default=str).encode("utf-8")
+            except (TypeError, ValueError):
+                digest = repr(id(prompt)).encode("ascii")
+            prompt_id = "prompt-" + hashlib.sha1(digest).hexdigest()[:12]
+        scope = str(prompt_id)
+        while scope in self._generations:
+            self._generation_counter += 1
+            scope = f"{prompt_id}-{self._generation_counter}"
+        return scope
+
+    def _trim_generations(self) -> None:
+        while len(self._generations) > self._max_generations:
+            oldest = next(iter(self._generations))
+            self.end_generation(oldest)
+
+    def _expire_globals(self) -> None:
+        if not self._global_ttl:
+            return
+        deadline = time.time() - self._global_ttl
+        for name in list(self._scopes.get(GLOBAL_SCOPE, ())):
+            if self._data[(GLOBAL_SCOPE, name)]["time"] < deadline:
+                self._drop((GLOBAL_SCOPE, name))
+                self._counters["expirations"] += 1
+
+    # ------------------------------------------------------------------
+    # Operaciones
+    # ------------------------------------------------------------------
+    def set(self, name: str, value: Any, dtype: str = None, scope: str = None,
+            generation: str = None) -> str:
         """
         Almacena un valor. Detecta el tipo automáticamente si no se proporciona.
-        
+
+        Args:
+            scope: Ámbito de la entrada (ver ``begin_generation``). Por
+                defecto ``global``.
+            generation: Generación que escribe la entrada (por defecto
+                ``scope``). Una entrada global escrita por una generación se
+                libera tras su último lector en ella (ver ``consume``).
+
         Returns:
             El tipo detectado/asignado
         """
-        if dtype is None or dtype == "*":
-            dtype = detect_comfy_type(value)
-        
+        return self.set_many({name: value}, scope=scope, dtypes={name: dtype},
+                             generation=generation)[name]
+
+    def set_many(self, values: Dict[str, Any], scope: str = None,
+                 dtypes: Dict[str, str] = None, generation: str = None) -> Dict[str, str]:
+        """
+        Almacena varios valores de forma atómica (un solo paso por el lock).
+
+        Args:
+            values: {nombre: valor}
+            dtypes: Tipos opcionales por nombre; el resto se detecta.
+            generation: Generación que las escribe (ver ``set``).
+
+        Returns:
+            {nombre: tipo detectado/asignado}
+        """
+        dtypes = dtypes or {}
+        scope = scope or GLOBAL_SCOPE
+        generation = generation or scope
+        now = time.time()
+
+        # Detectar tipos y estimar tamaños fuera del lock
+        prepared = []
+        for name, value in values.items():
+            dtype = dtypes.get(name)
+            if dtype is None or dtype == "*":
+                dtype = detect_comfy_type(value)
+            size, blocks = estimate_size(value)
+            prepared.append((name, value, dtype, size, blocks))
+
         with self._data_lock:
-            self._data[name] = {
-                "value": value,
-                "type": dtype,
-                "time": time.time()
-            }
-        return dtype
+            self._counters["sets"] += len(prepared)
+            for name, value, dtype, size, blocks in prepared:
+                key = (scope, name)
+                for block, nbytes in blocks.items():
+                    self._acquire_block(block, nbytes, dtype)
+                self._scopes.setdefault(scope, set()).add(name)
+                # Sustituir en una sola asignación: un lector concurrente ve
+                # el valor anterior o el nuevo, nunca la clave ausente
+                old = self._data.get(key)
+                self._data[key] = {
+                    "value": value,
+                    "type": dtype,
+                    "time": now,
+                    "size": size,
+                    "blocks": tuple(blocks),
+                    "hits": 0,
+                    "tick": next(self._clock),
+                    "last_access": now,
+                    "generation": generation,
+                }
+                if old is not None:
+                    self._release_entry(old)
+            self._evict(protect={(scope, p[0]) for p in prepared})
+        return {p[0]: p[2] for p in prepared}
 
-    def get(self, name: str) -> Optional[Any]:
+    def get(self, name: str, scope: str = None) -> Optional[Any]:
         """Recupera un valor por nombre."""
+        return self.get_with_type(name, scope)[0]
+
+    def get_with_type(self, name: str, scope: str = None) -> Tuple[Optional[Any], str]:
+        """Recupera valor y tipo. Las entradas en disco se releen vía mmap."""
+        try:
+            return self.get_or_raise(name, scope)
+        except KeyError:
+            return None, "*"
+
+    def get_or_raise(self, name: str, scope: str = None) -> Tuple[Any, str]:
+        """
+        Recupera valor y tipo con una sola búsqueda y sin lock.
+
+        Raises:
+            KeyError: si la variable no existe (o su archivo de spill se perdió)
+        """
+        key, entry = self._lookup(name, scope)
+        if entry is None:
+            self._thread_counts()[1] += 1
+            raise KeyError(name)
+        self._touch(entry)
+        spill = entry.get("spill")
+        if spill is None:
+            return entry["value"], entry["type"]
+        value = self._load_spilled(key, spill)
+        if value is None:
+            self._thread_counts()[1] += 1
+            raise KeyError(name)
+        return value, entry["type"]
+
+    def get_many(self, names: Iterable[str], scope: str = None) -> Dict[str, Any]:
+        """
+        Recupera varios valores vistos en un mismo instante (las escrituras
+        concurrentes se aplican enteras antes o después). Omite los que faltan.
+        """
         with self._data_lock:
-            entry = self._data.get(name)
-            return entry["value"] if entry else None
+            found = [(name,) + self._lookup(name, scope) for name in names]
+        self._thread_counts()[1] += sum(1 for item in found if item[2] is None)
+        return self._materialize(
+            (name, key, entry) for name, key, entry in found if entry is not None
+        )
 
-    def get_with_type(self, name: str) -> Tuple[Optional[Any], str]:
-        """Recupera valor y tipo."""
+    def pop_many(self, names: Iterable[str], scope: str = None) -> Dict[str, Any]:
+        """Extrae y elimina varios valores de forma atómica. Omite los que faltan."""
+        scope = scope or GLOBAL_SCOPE
         with self._data_lock:
-            entry = self._data.get(name)
-            if entry:
-                return entry["value"], entry["type"]
-            return None, "*"
+            found = []
+            for name in names:
+                key = (scope, name)
+                entry = self._data.get(key)
+                if entry is None:
+                    continue
+                # Releer las entradas en disco antes de borrar su archivo
+                if "spill" in entry:
+                    value = self._load_spilled(key, entry["spill"])
+                    if value is None:
+                        continue
+                    entry = dict(entry, value=value, spill=None)
+                found.append((name, key, entry))
+                self._drop(key)
+        return {name: entry["value"] for name, key, entry in found}
 
-    def get_type(self, name: str) -> str:
-        """Obtiene el tipo de un valor."""
+    def snapshot(self, scope: str = None) -> Dict[str, Any]:
+        """
+        Copia superficial y consistente de las variables visibles desde
+        ``scope`` (o de todas, con nombres "scope/nombre" si no se indica).
+        """
         with self._data_lock:
-            entry = self._data.get(name)
-            return entry["type"] if entry else "*"
+            self._expire_globals()
+            if scope is not None:
+                found = [(name, key, self._data[key]) for name, key in self._visible(scope)]
+            else:
+                found = [(_label(key), key, entry) for key, entry in self._data.items()]
+        return self._materialize(found)
+
+    def get_type(self, name: str, scope: str = None) -> str:
+        """Obtiene el tipo de un valor."""
+        entry = self._lookup(name, scope)[1]
+        return entry["type"] if entry else "*"
 
-    def exists(self, name: str) -> bool:
+    def exists(self, name: str, scope: str = None) -> bool:
         """Verifica si existe un valor."""
-        with self._data_lock:
-            return name in self._data
+        return self._lookup(name, scope)[1] is not None
 
-    def list_all(self) -> Dict[str, str]:
-        """Lista todas las variables con sus tipos."""
+    def list_all(self, scope: str = None) -> Dict[str, str]:
+        """
+        Lista las variables con sus tipos. Con ``scope``, solo las visibles
+        desde ese ámbito; sin él, todas (las no globales como "scope/nombre").
+        """
         with self._data_lock:
-            return {k: v["type"] for k, v in self._data.items()}
+            self._expire_globals()
+            if scope is not None:
+                return {name: self._data[key]["type"] for name, key in self._visible(scope)}
+            return {_label(key): v["type"] for key, v in self._data.items()}
 
-    def list_names(self) -> list:
+    def list_names(self, scope: str = None) -> list:
         """Lista nombres de variables."""
-        with self._data_lock:
-            return list(self._data.keys())
+        return list(self.list_all(scope))
 
-    def remove(self, name: str) -> bool:
+    def remove(self, name: str, scope: str = None) -> bool:
         """Elimina una variable."""
         with self._data_lock:
-            if name in self._data:
-                del self._data[name]
-                return True
-            return False
+            return self._drop((scope or GLOBAL_SCOPE, name))
 
     def clear(self) -> None:
-        """Limpia toda la caché."""
+        """Limpia toda la caché (los nombres fijados siguen fijados)."""
         with self._data_lock:
+            self._cleanup_spill()
             self._data.clear()
+            self._scopes.clear()
+            self._readers.clear()
+            self._blocks.clear()
+            self._total_bytes = 0
+
+    # ------------------------------------------------------------------
+    # Internos de lectura (sin lock)
+    # ------------------------------------------------------------------
+    def _lookup(self, name: str, scope: Optional[str]) -> Tuple[Optional[tuple], Optional[dict]]:
+        """
+        (clave, entrada) visible para ``name`` desde ``scope``: primero local,
+        luego global. Las globales caducadas cuentan como ausentes; se
+        eliminan en la siguiente purga (``_expire_globals``).
+        """
+        if scope and scope != GLOBAL_SCOPE:
+            key = (scope, name)
+            entry = self._data.get(key)
+            if entry is not None:
+                return key, entry
+        key = (GLOBAL_SCOPE, name)
+        entry = self._data.get(key)
+        if entry is None:
+            return None, None
+        if self._global_ttl and time.time() - entry["time"] > self._global_ttl:
+            return None, None
+        return key, entry
+
+    def _thread_counts(self) -> list:
+        """[gets, misses] del hilo actual (se registra la primera vez)."""
+        try:
+            return self._local.counts
+        except AttributeError:
+            counts = self._local.counts = [0, 0]
+            with self._data_lock:
+                self._read_counts.append(counts)
+            return counts
+
+    def _touch(self, entry: dict) -> None:
+        """
+        Registra un acceso. O(1) y sin lock: una carrera entre lectores solo
+        puede perder algún incremento de ``hits`` de una misma entrada, lo que
+        no afecta a la corrección (solo a la precisión de LFU).
+        """
+        self._thread_counts()[0] += 1
+        entry["hits"] += 1
+        entry["tick"] = next(self._clock)
+        entry["last_access"] = time.time()
+
+    def _materialize(self, found: Iterable[tuple]) -> Dict[str, Any]:
+        """{nombre: valor} de pares (nombre, clave, entrada), releyendo de disco."""
+        result = {}
+        for name, key, entry in found:
+            self._touch(entry)
+            spill = entry.get("spill")
+            value = entry["value"] if spill is None else self._load_spilled(key, spill)
+            if value is not None:
+                result[name] = value
+        return result
+
+    # ------------------------------------------------------------------
+    # Internos de escritura (llamar con _data_lock adquirido)
+    # ------------------------------------------------------------------
+    def _visible(self, scope: str):
+        """Pares (nombre, clave) visibles desde un ámbito."""
+        names = set(self._scopes.get(scope, ()))
+        names.update(self._scopes.get(GLOBAL_SCOPE, ()))
+        for name in names:
+            key = self._lookup(name, scope)[0]
+            if key is not None:
+                yield name, key
+
+    def _acquire_block(self, key: tuple, nbytes: int, dtype: str) -> None:
+        block = self._blocks.get(key)
+        if block is None:
+            # Un bloque compartido se atribuye al tipo de quien lo añadió primero
+            self._blocks[key] = [nbytes, 1, dtype]
+            self._total_bytes += nbytes
+        else:
+            block[1] += 1
+
+    def _release_blocks(self, keys: Iterable[tuple]) -> None:
+        for key in keys:
+            block = self._blocks.get(key)
+            if block is None:
+                continue
+            block[1] -= 1
+            if block[1] <= 0:
+                del self._blocks[key]
+                self._total_bytes -= block[0]
+
+    def _freed_bytes(self, entry: dict) -> int:
+        """Bytes que se liberarían al soltar ``entry`` (sus bloques no compartidos)."""
+        freed = 0
+        for key in entry["blocks"]:
+            block = self._blocks.get(key)
+            if block is not None and block[1] <= 1:
+                freed += block[0]
+        return freed
+
+    def _drop(self, key: Tuple[str, str]) -> bool:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return False
+        names = self._scopes.get(key[0])
+        if names is not None:
+            names.discard(key[1])
+            if not names:
+                del self._scopes[key[0]]
+        self._release_entry(entry)
+        return True
+
+    def _release_entry(self, entry: dict) -> None:
+        """Libera la memoria contabilizada y el archivo de spill de una entrada."""
+        self._release_blocks(entry["blocks"])
+        if entry.get("spill"):
+            _remove_file(entry["spill"]["path"])
+
+    def _eviction_order(self, protect: set) -> List[tuple]:
+        """Candidatas a expulsión, de la primera a la última según la política."""
+        # Las entradas ya en disco no ocupan memoria: no son candidatas
+        candidates = [
+            (k, e) for k, e in self._data.items()
+            if k not in protect and k[1] not in self._pinned and "spill" not in e
+        ]
+        if self._policy == "lfu":
+            # Menos accesos primero; a igualdad, el menos reciente
+            candidates.sort(key=lambda item: (item[1]["hits"], item[1]["tick"]))
+        else:
+            candidates.sort(key=lambda item: item[1]["tick"])
+        return [k for k, _ in candidates]
+
+    def _evict(self, protect: Optional[set] = None) -> None:
+        """Expulsa entradas hasta volver a estar dentro del presupuesto."""
+        if not self._max_bytes or self._total_bytes <= self._max_bytes:
+            return
+        protect = protect or set()
+        # Orden calculado una vez por pasada; O(n log n) solo cuando se expulsa
+        for victim in self._eviction_order(protect) + list(protect):
+            if self._total_bytes <= self._max_bytes:
+                return
+            if not self._freed_bytes(self._data[victim]):
+                # Todo su almacenamiento lo comparten otras entradas: quitarla
+                # (o pasarla a disco) no liberaría memoria
+                continue
+            if self._spill(victim):
+                continue
+            if victim in protect:
+                # Las entradas recién escritas solo pueden ir a disco
+                continue
+            before = self._total_bytes
+            self._drop(victim)
+            self._counters["evictions"] += 1
+            print(f"[QwenCache] Evicted '{_label(victim)}' "
+                  f"({before - self._total_bytes} bytes freed, {self._policy})")
+        if self._total_bytes > self._max_bytes:
+            print(
+                f"[QwenCache] Warning: over budget "
+                f"({self._total_bytes} > {self._max_bytes} bytes), "
+                f"nothing left to evict"
+            )
+
+    def _spill(self, key: Tuple[str, str]) -> bool:
+        """Intenta pasar una entrada a disco. True si se liberó su memoria."""
+        entry = self._data.get(key)
+        if not self._spill_dir or entry is None or "spill" in entry:
+            return False
+        found = _spillable_tensor(entry["value"], entry["type"])
+        if found is None:
+            return False
+        tensor, rest = found
+        if tensor.numel() * tensor.element_size() < self._spill_min_bytes:
+            return False
+
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", _label(key))[:64]
+        path = os.path.join(self._spill_dir, f"{safe_name}-{uuid.uuid4().hex[:8]}.npy")
+        try:
+            os.makedirs(self._spill_dir, exist_ok=True)
+            meta = _write_spill(path, tensor)
+        except Exception as e:
+            _remove_file(path)
+            print(f"[QwenCache] Warning: could not spill '{_label(key)}': {e}")
+            return False
+
+        # La memoria pasa a ser solo la del resto del dict (LATENT)
+        self._release_blocks(entry["blocks"])
+        size, blocks = estimate_size(rest)
+        for block, nbytes in blocks.items():
+            self._acquire_block(block, nbytes, entry["type"])
+        meta["rest"] = rest
+        # Entrada nueva en vez de modificarla: los lectores sin lock ven una
+        # versión completa (la anterior o esta), nunca una mezcla
+        self._data[key] = dict(entry, value=None, spill=meta, size=size, blocks=tuple(blocks))
+
+        self._spill_stats["writes"] += 1
+        self._spill_stats["bytes_written"] += meta["nbytes"]
+        print(f"[QwenCache] Spilled '{_label(key)}' to disk ({meta['nbytes']} bytes)")
+        return True
+
+    def _load_spilled(self, key: Tuple[str, str], meta: dict) -> Optional[Any]:
+        """Relee una entrada en disco. Si el archivo falta, la elimina."""
+        start = time.perf_counter()
+        try:
+            tensor = _read_spill(meta)
+        except Exception as e:
+            with self._data_lock:
+                self._spill_stats["misses"] += 1
+                entry = self._data.get(key)
+                if entry is not None and entry.get("spill") is meta:
+                    self._drop(key)
+            print(f"[QwenCache] Warning: spilled '{_label(key)}' unreadable, dropped: {e}")
+            return None
+        elapsed = time.perf_counter() - start
+
+        with self._data_lock:
+            stats = self._spill_stats
+            stats["hits"] += 1
+            stats["read_seconds"] += elapsed
+            stats["max_read_seconds"] = max(stats["max_read_seconds"], elapsed)
+
+        if meta["rest"] is None:
+            return tensor
+        value = dict(meta["rest"])
+        value["samples"] = tensor
+        return value
+
+    def _cleanup_spill(self) -> None:
+        """Borra los archivos de spill de todas las entradas."""
+        with self._data_lock:
+            for entry in self._data.values():
+                if "spill" in entry:
+                    _remove_file(entry["spill"]["path"])
+
+
+def _escape_label(value: Any) -> str:
+    """Escapa un valor de etiqueta Prometheus."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label(key: Tuple[str, str]) -> str:
+    """Nombre legible de una clave: "nombre" o "scope/nombre"."""
+    scope, name = key
+    return name if scope == GLOBAL_SCOPE else f"{scope}/{name}"
 
 
 # Instancia global
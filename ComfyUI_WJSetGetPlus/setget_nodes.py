@@ -6,7 +6,10 @@ NOTA: Esta versión incluye inputs/outputs para todos los tipos comunes
 para garantizar compatibilidad con workflows JSON existentes.
 """
 
-from .qwen_cache import QwenCache, get_cache, COMFY_TYPES
+import threading
+from collections import OrderedDict
+
+from .qwen_cache import QwenCache, get_cache, format_size, COMFY_TYPES, GLOBAL_SCOPE
 
 
 # ============================================================================
@@ -32,6 +35,116 @@ class AnyType(str):
 ANY_TYPE = AnyType("*")
 
 
+# ============================================================================
+# ÍNDICE DEL WORKFLOW - Resolución de nombres O(1) por nodo
+# ============================================================================
+# Marca de "el workflow no aporta nombre" (se conserva el valor previo)
+_NO_NAME = object()
+
+# Índices recientes, por identidad del objeto workflow
+_INDEX_CACHE_SIZE = 8
+_index_cache: "OrderedDict[int, _WorkflowIndex]" = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def _set_name_from_node(node):
+    """Nombre según las reglas de SetNode: título "Set_X" / "_X", luego widget."""
+    var_name = _NO_NAME
+    try:
+        title = node.get("title", "")
+        # Extraer nombre del título: "Set_NOMBRE" → "NOMBRE"
+        if title.startswith("Set_"):
+            var_name = title[4:]
+        elif "_" in title:
+            var_name = title.split("_", 1)[1]
+        # También revisar widgets_values
+        wv = node.get("widgets_values", [])
+        if wv and isinstance(wv[0], str):
+            var_name = wv[0]
+    except Exception:
+        pass
+    return var_name
+
+
+def _get_name_from_node(node):
+    """Nombre según las reglas de GetNode: widget, luego título "Get_X"."""
+    var_name = _NO_NAME
+    try:
+        # widgets_values contiene el nombre
+        wv = node.get("widgets_values", [])
+        if wv and isinstance(wv[0], str):
+            var_name = wv[0]
+        # También del título: "Get_NOMBRE" → "NOMBRE"
+        title = node.get("title", "")
+        if title.startswith("Get_"):
+            var_name = title[4:]
+    except Exception:
+        pass
+    return var_name
+
+
+class _WorkflowIndex:
+    """
+    Índice id → (título, widgets_values, nombre resuelto) de un workflow.
+    Se construye una vez por prompt; cada consulta posterior es O(1).
+    """
+    __slots__ = ("workflow", "nodes", "_set_names", "_get_names")
+
+    def __init__(self, workflow):
+        self.workflow = workflow
+        self.nodes = {}
+        self._set_names = {}
+        self._get_names = {}
+        try:
+            for node in workflow.get("nodes", []):
+                # Como el escaneo lineal: gana el primer nodo con ese id
+                self.nodes.setdefault(str(node.get("id")), node)
+        except Exception:
+            # El escaneo lineal se detenía en el primer nodo inválido
+            pass
+
+    def set_name(self, unique_id):
+        key = str(unique_id)
+        name = self._set_names.get(key)
+        if name is None:
+            node = self.nodes.get(key)
+            name = _NO_NAME if node is None else _set_name_from_node(node)
+            self._set_names[key] = name
+        return name
+
+    def get_name(self, unique_id):
+        key = str(unique_id)
+        name = self._get_names.get(key)
+        if name is None:
+            node = self.nodes.get(key)
+            name = _NO_NAME if node is None else _get_name_from_node(node)
+            self._get_names[key] = name
+        return name
+
+
+def _workflow_index(extra_pnginfo):
+    """Índice del workflow de ``extra_pnginfo``, memoizado por identidad."""
+    try:
+        workflow = extra_pnginfo.get("workflow", {})
+    except Exception:
+        return None
+
+    key = id(workflow)
+    with _index_lock:
+        index = _index_cache.get(key)
+        # El índice guarda el workflow, así que su id() no puede reutilizarse
+        if index is not None and index.workflow is workflow:
+            _index_cache.move_to_end(key)
+            return index
+
+    index = _WorkflowIndex(workflow)
+    with _index_lock:
+        _index_cache[key] = index
+        while len(_index_cache) > _INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
+
+
 # ============================================================================
 # SetNode - Almacena valores con nombre
 # ============================================================================
@@ -125,8 +238,11 @@ class SetNode:
         # Obtener nombre de la variable desde el prompt
         var_name = self._get_var_name(unique_id, prompt, extra_pnginfo, input_type)
         
-        # Almacenar en caché
-        detected_type = cache.set(var_name, value, input_type)
+        # Almacenar en caché: en el ámbito global (como siempre, visible en
+        # ejecuciones posteriores) o en el del prompt si así se configuró
+        generation = _begin_generation(cache, prompt, extra_pnginfo)
+        scope = cache.set_node_scope(prompt)
+        detected_type = cache.set(var_name, value, input_type, scope=scope, generation=generation)
         print(f"[SetNode] ✓ '{var_name}' stored (type: {detected_type})")
         
         return (value,)
@@ -149,23 +265,11 @@ class SetNode:
         
         # Intentar obtener desde extra_pnginfo (título del nodo)
         if extra_pnginfo is not None and var_name == fallback:
-            try:
-                workflow = extra_pnginfo.get("workflow", {})
-                for node in workflow.get("nodes", []):
-                    if str(node.get("id")) == str(unique_id):
-                        title = node.get("title", "")
-                        # Extraer nombre del título: "Set_NOMBRE" → "NOMBRE"
-                        if title.startswith("Set_"):
-                            var_name = title[4:]
-                        elif "_" in title:
-                            var_name = title.split("_", 1)[1]
-                        # También revisar widgets_values
-                        wv = node.get("widgets_values", [])
-                        if wv and isinstance(wv[0], str):
-                            var_name = wv[0]
-                        break
-            except:
-                pass
+            index = _workflow_index(extra_pnginfo)
+            if index is not None:
+                name = index.set_name(unique_id)
+                if name is not _NO_NAME:
+                    var_name = name
         
         return var_name
 
@@ -224,18 +328,26 @@ class GetNode:
         # Intentar obtener nombre desde widgets_values o título
         actual_name = self._get_var_name(name, unique_id, prompt, extra_pnginfo)
         
-        if not cache.exists(actual_name):
-            available = cache.list_names()
+        # Busca en el ámbito de este prompt y, si no está, en el global.
+        # Las entradas en disco se releen aquí; si su archivo se perdió,
+        # el caché las elimina y se trata como "no encontrada"
+        scope = _begin_generation(cache, prompt, extra_pnginfo)
+        try:
+            value, dtype = cache.get_or_raise(actual_name, scope)
+        except KeyError:
+            available = cache.list_names(scope)
             available_str = ", ".join(available) if available else "(none)"
             raise ValueError(
                 f"[GetNode] ✗ Variable '{actual_name}' not found!\n"
                 f"Available: {available_str}\n"
                 f"Tip: Make sure SetNode runs BEFORE GetNode in the graph."
-            )
+            ) from None
         
-        value, dtype = cache.get_with_type(actual_name)
         print(f"[GetNode] ✓ '{actual_name}' retrieved (type: {dtype})")
         
+        # Si era el último lector, el caché suelta su referencia
+        cache.consume(actual_name, scope)
+        
         return (value,)
     
     def _get_var_name(self, default_name, unique_id, prompt, extra_pnginfo):
@@ -244,21 +356,11 @@ class GetNode:
         
         # Primero intentar desde extra_pnginfo (widgets_values del nodo)
         if extra_pnginfo is not None:
-            try:
-                workflow = extra_pnginfo.get("workflow", {})
-                for node in workflow.get("nodes", []):
-                    if str(node.get("id")) == str(unique_id):
-                        # widgets_values contiene el nombre
-                        wv = node.get("widgets_values", [])
-                        if wv and isinstance(wv[0], str):
-                            var_name = wv[0]
-                        # También del título: "Get_NOMBRE" → "NOMBRE"
-                        title = node.get("title", "")
-                        if title.startswith("Get_"):
-                            var_name = title[4:]
-                        break
-            except:
-                pass
+            index = _workflow_index(extra_pnginfo)
+            if index is not None:
+                name = index.get_name(unique_id)
+                if name is not _NO_NAME:
+                    var_name = name
         
         # Fallback a prompt
         if var_name == default_name and prompt is not None and unique_id is not None:
@@ -273,11 +375,46 @@ class GetNode:
         return var_name
 
 
+# ============================================================================
+# Análisis del grafo: lectores por variable
+# ============================================================================
+def _count_readers(prompt, extra_pnginfo):
+    """Cuenta cuántos GetNode del prompt leen cada nombre de variable."""
+    counts = {}
+    resolver = GetNode()
+    for node_id, node_info in prompt.items():
+        if not isinstance(node_info, dict) or node_info.get("class_type") != "GetNode":
+            continue
+        inputs = node_info.get("inputs", {})
+        default = inputs.get("name", "my_variable") if isinstance(inputs, dict) else "my_variable"
+        if not isinstance(default, str):
+            default = "my_variable"
+        name = resolver._get_var_name(default, node_id, prompt, extra_pnginfo)
+        counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+def _begin_generation(cache, prompt, extra_pnginfo):
+    """
+    Ámbito de la generación actual. La primera vez que se ve un prompt se
+    analiza el grafo una sola vez para registrar sus lectores.
+    """
+    scope = cache.begin_generation(prompt)
+    if isinstance(prompt, dict) and scope != GLOBAL_SCOPE and not cache.tracks_readers(scope):
+        cache.track_readers(scope, _count_readers(prompt, extra_pnginfo))
+    return scope
+
+
 # ============================================================================
 # Versiones alternativas con widget explícito
 # ============================================================================
 class SetNodeNamed:
-    """SetNode con widget explícito para el nombre."""
+    """
+    SetNode con widget explícito para el nombre.
+    scope="global" (por defecto, como SetNode) guarda la variable fuera del
+    ámbito del prompt, de modo que sobrevive a ejecuciones posteriores
+    (sujeta al TTL global); scope="prompt" la libera con su generación.
+    """
     
     @classmethod
     def INPUT_TYPES(cls):
@@ -286,6 +423,13 @@ class SetNodeNamed:
                 "value": (ANY_TYPE, {}),
                 "name": ("STRING", {"default": "my_variable"}),
             },
+            "optional": {
+                "scope": (["global", "prompt"], {"default": "global"}),
+            },
+            "hidden": {
+                "prompt": "PROMPT",
+                "extra_pnginfo": "EXTRA_PNGINFO",
+            },
         }
 
     RETURN_TYPES = (ANY_TYPE,)
@@ -294,9 +438,11 @@ class SetNodeNamed:
     FUNCTION = "set_value"
     CATEGORY = "utils"
 
-    def set_value(self, value, name):
+    def set_value(self, value, name, scope="global", prompt=None, extra_pnginfo=None):
         cache = get_cache()
-        detected_type = cache.set(name, value)
+        generation = _begin_generation(cache, prompt, extra_pnginfo)
+        target = generation if scope == "prompt" else GLOBAL_SCOPE
+        detected_type = cache.set(name, value, scope=target, generation=generation)
         print(f"[SetNode] ✓ '{name}' stored (type: {detected_type})")
         return (value,)
 
@@ -305,7 +451,11 @@ class SetNodeNamed:
 # Nodos de utilidad
 # ============================================================================
 class ListCacheNode:
-    """Muestra todas las variables en caché (para debug)."""
+    """
+    Muestra todas las variables en caché (para debug) y las métricas.
+    Con ``detailed`` añade tamaño, edad y accesos por entrada; con
+    ``metrics_file`` vuelca las métricas en formato Prometheus a ese archivo.
+    """
     
     @classmethod
     def INPUT_TYPES(cls):
@@ -313,28 +463,61 @@ class ListCacheNode:
             "required": {},
             "optional": {
                 "trigger": (ANY_TYPE, {}),
+                "detailed": ("BOOLEAN", {"default": False}),
+                "metrics_file": ("STRING", {"default": ""}),
             }
         }
 
-    RETURN_TYPES = ("STRING",)
-    RETURN_NAMES = ("info",)
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("info", "metrics")
     FUNCTION = "list_cache"
     CATEGORY = "utils"
 
-    def list_cache(self, trigger=None):
+    def list_cache(self, trigger=None, detailed=False, metrics_file=""):
         cache = get_cache()
         items = cache.list_all()
         
         if not items:
             info = "[Cache] Empty"
-        else:
+        elif not detailed:
             lines = [f"[Cache] {len(items)} variable(s):"]
             for name, dtype in items.items():
                 lines.append(f"  • {name}: {dtype}")
             info = "\n".join(lines)
+        else:
+            lines = [f"[Cache] {len(items)} variable(s):"]
+            for e in cache.entries_info():
+                label = e["name"] if e["scope"] == GLOBAL_SCOPE else f"{e['scope']}/{e['name']}"
+                flags = " 📌" if e["pinned"] else ""
+                flags += " 💾" if e["tier"] == "disk" else ""
+                lines.append(
+                    f"  • {label}: {e['type']}, {format_size(e['bytes'])}, "
+                    f"age {e['age']:.0f}s, idle {e['idle']:.0f}s, {e['hits']} read(s){flags}"
+                )
+            info = "\n".join(lines)
+        
+        # Resumen de memoria y contadores
+        stats = cache.stats()
+        budget = format_size(stats["max_bytes"]) if stats["max_bytes"] else "unlimited"
+        counters = stats["counters"]
+        info += (
+            f"\n[Cache] Memory: {format_size(stats['bytes'])} / {budget}"
+            f" | sets {counters['sets']}, gets {counters['gets']}, misses {counters['misses']},"
+            f" evictions {counters['evictions']}, releases {counters['releases']}"
+        )
+        if detailed:
+            for device, nbytes in sorted(stats["bytes_by_device"].items()):
+                info += f"\n  {device}: {format_size(nbytes)}"
+        
+        metrics = cache.prometheus_text()
+        if metrics_file:
+            try:
+                cache.write_prometheus(metrics_file)
+            except OSError as e:
+                print(f"[Cache] Warning: could not write metrics: {e}")
         
         print(info)
-        return (info,)
+        return (info, metrics)
 
 
 class ClearCacheNode:
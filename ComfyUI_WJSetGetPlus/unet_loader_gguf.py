@@ -6,9 +6,22 @@ IMPORTANTE: Para modelos .gguf, requiere ComfyUI-GGUF instalado:
   git clone https://github.com/city96/ComfyUI-GGUF custom_nodes/ComfyUI-GGUF
 """
 
+import importlib.util
 import os
+import pickle
+import time
 import torch
-from typing import Tuple, Any, List, Optional
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Any, Dict, List, Optional
+
+from .lazy_state_dict import LazySafetensorsDict, ShardedLazyDict, read_safetensors
+from .load_report import LoadReport, active_report
+from .model_index import get_model_index, model_format, read_shard_index
+from .model_store import get_model_store, make_key
+from .prefetch import notify_load, read_pages
+from .qwen_cache import format_size
 
 # Importar folder_paths de ComfyUI
 try:
@@ -34,38 +47,80 @@ except ImportError:
     except ImportError:
         GGUF_BACKEND = None
 
+# Backend gguf-py: envolver el memmap del lector sin copiar (ver _load_gguf)
+GGUF_ZERO_COPY = os.environ.get("WJ_GGUF_ZERO_COPY", "1") not in ("0", "false", "False")
+
+# safetensors: state_dict perezoso (ver lazy_state_dict.py, opcional) y tamaño de su LRU
+SAFETENSORS_LAZY = os.environ.get("WJ_SAFETENSORS_LAZY", "0") not in ("0", "false", "False")
+SAFETENSORS_LRU = int(os.environ.get("WJ_SAFETENSORS_LRU", "0") or 0)
+
+# Hilos para leer los shards de un checkpoint fragmentado
+SHARD_WORKERS = int(os.environ.get("WJ_SHARD_WORKERS", "4") or 4)
+
+# Compartir una carga entre copias/alias de un mismo archivo (huella de contenido)
+MODEL_DEDUP = os.environ.get("WJ_MODEL_DEDUP", "1") not in ("0", "false", "False")
+
+# .ckpt/.pt/.pth/.bin: torch.load(mmap=True, weights_only=True) si el formato lo permite
+TORCH_MMAP = os.environ.get("WJ_TORCH_MMAP", "1") not in ("0", "false", "False")
+
+DTYPE_MAP = {
+    "float32": torch.float32,
+    "float16": torch.float16,
+    "bfloat16": torch.bfloat16,
+}
+
+
+def _default_device() -> str:
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _tensor_converter(dtype: str = "auto", device: str = None):
+    """
+    Conversión por tensor que aplican los cargadores al leer cada uno:
+    dtype (solo tensores de punto flotante) y dispositivo. Si el dtype nuevo
+    es más pequeño se convierte antes de mover (se copian menos bytes); si
+    es más grande, después. Cada paso se anota en el informe de carga activo.
+    """
+    target = DTYPE_MAP.get(dtype)
+    target_size = torch.empty((), dtype=target).element_size() if target is not None else 0
+    target_device = torch.device(device) if device is not None else None
+
+    def convert(value):
+        if not isinstance(value, torch.Tensor):
+            return value
+        report = active_report()
+        needs_cast = target is not None and value.is_floating_point() and value.dtype != target
+        cast_first = needs_cast and target_size <= value.element_size()
+        if cast_first:
+            with report.phase("convert", value.numel() * value.element_size()):
+                value = value.to(target)
+        if target_device is not None and value.device.type != target_device.type:
+            with report.phase("move", value.numel() * value.element_size()):
+                value = value.to(target_device)
+        if needs_cast and not cast_first:
+            with report.phase("convert", value.numel() * value.element_size()):
+                value = value.to(target)
+        return value
+
+    return convert
+
+
+# Informe de la carga que produjo cada entrada del almacén de modelos
+_load_reports: "OrderedDict[tuple, LoadReport]" = OrderedDict()
+_LOAD_REPORTS_MAX = 32
+
 
 def get_unet_files() -> List[str]:
     """
     Obtiene lista de archivos de modelo UNET disponibles.
-    Busca en las carpetas estándar de ComfyUI.
+    Busca en las carpetas estándar de ComfyUI, a través del índice
+    persistente (solo se relistan los directorios que cambiaron).
     """
     if not FOLDER_PATHS_AVAILABLE:
         return ["(folder_paths not available)"]
     
-    files = []
-    extensions = (".gguf", ".safetensors", ".ckpt", ".pt", ".pth", ".bin")
-    
-    # Carpetas donde buscar
-    folder_names = ["unet", "diffusion_models", "checkpoints"]
-    
-    for folder_name in folder_names:
-        try:
-            paths = folder_paths.get_folder_paths(folder_name)
-            for base_path in paths:
-                if not os.path.exists(base_path):
-                    continue
-                for root, dirs, filenames in os.walk(base_path):
-                    for filename in filenames:
-                        if filename.lower().endswith(extensions):
-                            # Ruta relativa al folder base
-                            rel_path = os.path.relpath(os.path.join(root, filename), base_path)
-                            if rel_path not in files:
-                                files.append(rel_path)
-        except:
-            pass
-    
-    return sorted(set(files)) if files else ["none"]
+    files = get_model_index().list_files()
+    return files if files else ["none"]
 
 
 class UnetLoaderGGUF:
@@ -107,6 +162,116 @@ class UnetLoaderGGUF:
         Returns:
             Tuple con el modelo cargado (ModelPatcher o state_dict)
         """
+        notify_load(unet_name)
+        return (self.load_model(unet_name),)
+
+    def load_model(self, unet_name: str, dtype: str = "auto", force_cpu: bool = False,
+                   zero_copy: bool = None, lazy: bool = None) -> Any:
+        """
+        Carga (o reutiliza) un modelo con las opciones dadas. Punto de entrada
+        común de ambos nodos y del prefetch (prefetch.py): las mismas opciones
+        dan la misma clave en el almacén de modelos.
+        
+        El almacén solo retiene modelos en CPU (ver model_store.py), así que
+        los formatos que el cargador dejaría en la GPU se cargan en CPU a
+        través del almacén y se copian al dispositivo en cada uso: el
+        siguiente prompt (o el prefetch, que usa la misma clave) reutiliza la
+        copia en CPU en lugar de volver a leer el archivo.
+        
+        El informe por fases de la carga queda en ``self.last_report`` y se
+        registra en el logger ``WJSetGetPlus.loader``.
+        """
+        report = LoadReport(unet_name)
+        with report.activate():
+            with report.phase("resolve"):
+                model_path = self._resolve_model(unet_name)
+            zero_copy = GGUF_ZERO_COPY if zero_copy is None else zero_copy
+            lazy = SAFETENSORS_LAZY if lazy is None else lazy
+            device = "cpu" if force_cpu else _default_device()
+            options = dict(dtype=dtype, device=device, zero_copy=zero_copy, lazy=lazy)
+            
+            via_cpu = (device != "cpu" and not get_model_store().keep_gpu
+                       and self._loads_to_device(model_path, lazy))
+            if via_cpu:
+                options["device"] = "cpu"
+            
+            # Reutiliza el modelo si ya está cargado (o espera a la carga en curso)
+            model = self._load_cached(
+                model_path,
+                lambda: self._load_file(model_path, zero_copy, dtype=dtype,
+                                        force_cpu=via_cpu or force_cpu, lazy=lazy),
+                **options,
+            )
+            if via_cpu:
+                model = self._to_device(model, device)
+        # Tras la copia al dispositivo, el total la incluye
+        if via_cpu or not report.total_s:
+            report.finish(model)
+        self.last_report = report
+        report.log()
+        return model
+
+    def prefetch_model(self, unet_name: str, reserve=None, dtype: str = "auto",
+                       force_cpu: bool = False, zero_copy: bool = None,
+                       lazy: bool = None) -> Optional[str]:
+        """
+        Adelanta la lectura de un modelo sin tocar la GPU (ver prefetch.py).
+        ``reserve(nbytes)`` decide si cabe en el presupuesto de precarga.
+        
+        Returns:
+            "staged" si se cargó en CPU en el almacén de modelos, "paged_in"
+            si solo se leyeron sus páginas (formatos mapeados), None si no
+            cabía en el presupuesto
+        """
+        model_path = self._resolve_model(unet_name)
+        zero_copy = GGUF_ZERO_COPY if zero_copy is None else zero_copy
+        lazy = SAFETENSORS_LAZY if lazy is None else lazy
+        if model_format(model_path) == "sharded":
+            paths = read_shard_index(model_path)[1]
+        else:
+            paths = [model_path]
+        if reserve is not None and not reserve(sum(os.path.getsize(p) for p in paths)):
+            return None
+        if self._reads_on_load(model_path, zero_copy, lazy):
+            self.load_model(unet_name, dtype=dtype, force_cpu=True, zero_copy=zero_copy, lazy=lazy)
+            return "staged"
+        read_pages(paths)
+        return "paged_in"
+
+    @classmethod
+    def _reads_on_load(cls, model_path: str, zero_copy: bool, lazy: bool) -> bool:
+        """True si cargar el archivo lee sus datos (no solo los mapea)."""
+        fmt = model_format(model_path)
+        if fmt in ("sharded", "safetensors"):
+            return not lazy
+        if fmt == "gguf":
+            return GGUF_BACKEND == "gguf-py" and not zero_copy
+        if fmt in ("ckpt", "bin"):
+            return not (TORCH_MMAP and cls._is_zip(model_path))
+        return False
+
+    @staticmethod
+    def _loads_to_device(model_path: str, lazy: bool) -> bool:
+        """True si el cargador deja los tensores en el dispositivo pedido."""
+        fmt = model_format(model_path)
+        if fmt in ("sharded", "safetensors"):
+            return not lazy
+        return fmt in ("ckpt", "bin")
+
+    @staticmethod
+    def _to_device(model: Any, device: str) -> Any:
+        """
+        Copia tensor a tensor a ``device`` un modelo del almacén (en CPU). El
+        original queda en el almacén para los siguientes usos.
+        """
+        active_report().note("cached on CPU, copied to the device on use")
+        if not isinstance(model, Mapping):
+            return model
+        convert = _tensor_converter(device=device)
+        return {key: convert(value) for key, value in model.items()}
+
+    def _resolve_model(self, unet_name: str) -> str:
+        """Ruta completa del modelo o FileNotFoundError."""
         # Encontrar la ruta completa
         model_path = self._find_model(unet_name)
         
@@ -115,53 +280,125 @@ class UnetLoaderGGUF:
                 f"[UnetLoaderGGUF] Model not found: {unet_name}\n"
                 f"Place it in: ComfyUI/models/unet/ or ComfyUI/models/diffusion_models/"
             )
+        return model_path
+
+    def _load_cached(self, model_path: str, loader, **options) -> Any:
+        """
+        Carga a través del almacén compartido de modelos. La clave es la ruta
+        real, tamaño y mtime del archivo más las ``options`` de carga.
+
+        Con ``WJ_MODEL_DEDUP`` la huella de contenido busca modelos ya
+        cargados que puedan ser copias de este (otro nombre o carpeta); solo
+        se comparten si ``same_content`` confirma que son idénticos (mismo
+        inode o hash completo). La huella sola nunca basta: dos modelos de la
+        misma arquitectura pueden diferir solo fuera de las zonas muestreadas.
+        """
+        store = get_model_store()
+        report = active_report()
+        key = make_key(model_path, **options)
+        content_id = None
+        if MODEL_DEDUP and not store.contains(key) and store.inflight(key) is None:
+            index = get_model_index()
+            try:
+                with report.phase("resolve"):
+                    content_id = index.fingerprint(model_path)
+                    for other_key, other_path in store.find_tagged(content_id):
+                        if other_key[3] == key[3] and index.same_content(model_path, other_path):
+                            key = other_key
+                            break
+            except OSError as e:
+                print(f"[UnetLoaderGGUF] Warning: could not fingerprint {os.path.basename(model_path)}: {e}")
+        if store.contains(key):
+            report.source = "cache"
+            loaded_as = store.label(key)
+            if loaded_as and os.path.realpath(loaded_as) != os.path.realpath(model_path):
+                print(f"[UnetLoaderGGUF] ✓ {os.path.basename(model_path)} is identical to loaded "
+                      f"{loaded_as}, sharing it")
+            else:
+                print(f"[UnetLoaderGGUF] ✓ Reusing loaded model: {os.path.basename(model_path)}")
+        elif store.inflight(key) is not None:
+            report.source = "in-flight"
+            print(f"[UnetLoaderGGUF] Waiting for in-flight load: {os.path.basename(model_path)}")
         
+        loaded = []
+        
+        def _load():
+            model = loader()
+            report.source = "disk"
+            report.finish(model)
+            print(f"[UnetLoaderGGUF] Load time: {report.total_s:.2f}s")
+            _load_reports[key] = report
+            while len(_load_reports) > _LOAD_REPORTS_MAX:
+                _load_reports.popitem(last=False)
+            loaded.append(True)
+            return model
+        
+        model = store.get_or_load(key, _load, label=model_path, tag=content_id)
+        if not loaded:
+            if report.source == "disk":
+                # Otra petición empezó la carga justo antes que esta
+                report.source = "in-flight"
+            report.loaded_by = _load_reports.get(key)
+        return model
+
+    def _load_file(self, model_path: str, zero_copy: bool = None,
+                   dtype: str = "auto", force_cpu: bool = False, lazy: bool = None) -> Any:
+        """
+        Lee y deserializa un archivo de modelo según su extensión.
+        
+        ``dtype`` y ``force_cpu`` se aplican durante la lectura, tensor a
+        tensor, en lugar de convertir el modelo entero después: el pico de
+        memoria se queda cerca del tamaño final y cada tensor cruza de
+        dispositivo una sola vez. ``lazy`` (safetensors) ver ``_load_safetensors``.
+        """
         ext = os.path.splitext(model_path)[1].lower()
         print(f"[UnetLoaderGGUF] Loading: {os.path.basename(model_path)}")
+        device = "cpu" if force_cpu else _default_device()
         
         # Cargar según extensión
-        if ext == ".gguf":
-            model = self._load_gguf(model_path)
+        if model_format(model_path) == "sharded":
+            model = self._load_sharded(model_path, lazy=lazy, dtype=dtype, device=device)
+        elif ext == ".gguf":
+            model = self._load_gguf(model_path, GGUF_ZERO_COPY if zero_copy is None else zero_copy,
+                                    dtype=dtype)
         elif ext == ".safetensors":
-            model = self._load_safetensors(model_path)
+            model = self._load_safetensors(model_path, lazy=lazy, dtype=dtype, device=device)
         elif ext in (".ckpt", ".pt", ".pth"):
-            model = self._load_checkpoint(model_path)
+            model = self._load_checkpoint(model_path, dtype=dtype, device=device)
         elif ext == ".bin":
-            model = self._load_bin(model_path)
+            model = self._load_bin(model_path, dtype=dtype, device=device)
         else:
             raise ValueError(f"[UnetLoaderGGUF] Unsupported format: {ext}")
         
         print(f"[UnetLoaderGGUF] ✓ Model loaded successfully")
-        return (model,)
+        return model
 
     def _find_model(self, filename: str) -> Optional[str]:
-        """Busca el modelo en las carpetas de ComfyUI."""
-        if not FOLDER_PATHS_AVAILABLE:
-            # Fallback: asumir ruta directa
-            if os.path.exists(filename):
-                return filename
-            return None
-        
-        folder_names = ["unet", "diffusion_models", "checkpoints"]
+        """Busca el modelo en las carpetas de ComfyUI (consulta O(1) al índice)."""
+        if FOLDER_PATHS_AVAILABLE:
+            full_path = get_model_index().find(filename)
+            if full_path is not None:
+                return full_path
         
-        for folder_name in folder_names:
-            try:
-                paths = folder_paths.get_folder_paths(folder_name)
-                for base_path in paths:
-                    full_path = os.path.join(base_path, filename)
-                    if os.path.exists(full_path):
-                        return full_path
-            except:
-                pass
-        
-        # Último intento: ruta absoluta
+        # Último intento / sin ComfyUI: ruta directa
         if os.path.exists(filename):
             return filename
         
         return None
 
-    def _load_gguf(self, path: str) -> Any:
-        """Carga un modelo GGUF usando ComfyUI-GGUF."""
+    def _load_gguf(self, path: str, zero_copy: bool = True, dtype: str = "auto") -> Any:
+        """
+        Carga un modelo GGUF usando ComfyUI-GGUF.
+        
+        Con el backend gguf-py y ``zero_copy`` (por defecto), los tensores son
+        vistas directas del archivo mapeado en memoria: la carga no lee datos
+        y las páginas se traen del disco solo al tocar cada tensor. El mapeo
+        es copy-on-write (modo "c"): modificar un tensor en sitio copia solo
+        las páginas afectadas a memoria privada y nunca altera el archivo.
+        Con ``zero_copy=False`` se copia todo a memoria anónima (comportamiento
+        anterior). ``dtype`` se aplica a los tensores de punto flotante al
+        envolverlos (los cuantizados no se tocan).
+        """
         if not GGUF_AVAILABLE:
             raise ImportError(
                 "[UnetLoaderGGUF] GGUF support requires ComfyUI-GGUF!\n"
@@ -171,43 +408,183 @@ class UnetLoaderGGUF:
                 "  pip install gguf"
             )
         
+        report = active_report()
         if GGUF_BACKEND == "city96":
             # Usar el cargador oficial de city96
-            sd = load_gguf_sd(path)
-            model = GGUFModelPatcher.from_state_dict(sd)
+            with report.phase("deserialize", os.path.getsize(path)):
+                sd = load_gguf_sd(path)
+                model = GGUFModelPatcher.from_state_dict(sd)
             return model
         else:
             # Fallback: cargar como state_dict raw
             import gguf as gguf_lib
-            reader = gguf_lib.GGUFReader(path)
+            convert = _tensor_converter(dtype)
             state_dict = {}
+            if zero_copy:
+                # Los arrays mantienen vivo el memmap mientras haya tensores
+                with report.phase("header"):
+                    reader = gguf_lib.GGUFReader(path, mode="c")
+                report.note("zero-copy: data is paged in from the file on access")
+                for tensor in reader.tensors:
+                    with report.phase("deserialize"):
+                        value = torch.from_numpy(tensor.data)
+                    state_dict[tensor.name] = convert(value)
+                return state_dict
+            with report.phase("header"):
+                reader = gguf_lib.GGUFReader(path)
             for tensor in reader.tensors:
-                state_dict[tensor.name] = torch.from_numpy(tensor.data.copy())
+                with report.phase("read", tensor.data.nbytes):
+                    data = tensor.data.copy()
+                with report.phase("deserialize"):
+                    value = torch.from_numpy(data)
+                state_dict[tensor.name] = convert(value)
             return state_dict
 
-    def _load_safetensors(self, path: str) -> dict:
-        """Carga un modelo safetensors."""
-        try:
-            from safetensors.torch import load_file
-        except ImportError:
-            raise ImportError(
-                "[UnetLoaderGGUF] safetensors not installed!\n"
-                "Run: pip install safetensors"
-            )
+    def _load_safetensors(self, path: str, lazy: bool = None,
+                          dtype: str = "auto", device: str = None) -> Mapping:
+        """
+        Carga un modelo safetensors.
         
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        state_dict = load_file(path, device=device)
+        Por defecto se lee todo en streaming a un ``dict``, convirtiendo cada
+        tensor antes de leer el siguiente. Con ``lazy`` (opcional, por defecto
+        ``WJ_SAFETENSORS_LAZY``) devuelve un LazySafetensorsDict de solo
+        lectura: solo se lee la cabecera y cada tensor se lee (y se
+        convierte/sube al dispositivo) en cada acceso, salvo los que retenga
+        su LRU (``WJ_SAFETENSORS_LRU``).
+        """
+        device = device or _default_device()
+        convert = _tensor_converter(dtype, device)
+        if SAFETENSORS_LAZY if lazy is None else lazy:
+            # LazySafetensorsDict importa safe_open en el primer acceso: avisar ya
+            if importlib.util.find_spec("safetensors") is None:
+                raise ImportError(
+                    "[UnetLoaderGGUF] safetensors not installed!\n"
+                    "Run: pip install safetensors"
+                )
+            state_dict = LazySafetensorsDict(path, cache_size=SAFETENSORS_LRU, transform=convert)
+            active_report().note("lazy: tensors are read on access")
+            print(f"[UnetLoaderGGUF] Mapped {len(state_dict)} tensors from safetensors (lazy)")
+            return state_dict
+        state_dict = read_safetensors(path, transform=convert)
         print(f"[UnetLoaderGGUF] Loaded {len(state_dict)} tensors from safetensors")
         return state_dict
 
-    def _load_checkpoint(self, path: str) -> dict:
-        """Carga un checkpoint PyTorch."""
-        device = "cuda" if torch.cuda.is_available() else "cpu"
+    def _load_sharded(self, index_path: str, lazy: bool = None,
+                      dtype: str = "auto", device: str = None) -> Mapping:
+        """
+        Carga un checkpoint fragmentado (``*.safetensors.index.json``).
         
-        # Cargar con weights_only=False para compatibilidad
-        data = torch.load(path, map_location=device, weights_only=False)
+        En modo perezoso devuelve una vista única sobre los shards (solo lee
+        cabeceras). Si no, lee los shards en paralelo (safetensors libera el
+        GIL durante la lectura) y los une en un solo state_dict.
+        """
+        report = active_report()
+        with report.phase("header"):
+            _, shards = read_shard_index(index_path)
+        if not shards:
+            raise ValueError(f"[UnetLoaderGGUF] Empty shard index: {os.path.basename(index_path)}")
+        missing = [s for s in shards if not os.path.exists(s)]
+        if missing:
+            raise FileNotFoundError(
+                f"[UnetLoaderGGUF] Missing shards: {', '.join(os.path.basename(s) for s in missing)}"
+            )
         
-        # Extraer state_dict si está envuelto
+        device = device or _default_device()
+        convert = _tensor_converter(dtype, device)
+        if SAFETENSORS_LAZY if lazy is None else lazy:
+            state_dict = ShardedLazyDict(shards, cache_size=SAFETENSORS_LRU, transform=convert)
+            report.note("lazy: tensors are read on access")
+            print(f"[UnetLoaderGGUF] Mapped {len(state_dict)} tensors from {len(shards)} shards (lazy)")
+            return state_dict
+        
+        def _load_shard(shard: str):
+            start = time.perf_counter()
+            with report.activate():
+                return read_safetensors(shard, transform=convert), time.perf_counter() - start
+        
+        state_dict = {}
+        total_bytes = 0
+        start = time.perf_counter()
+        workers = max(1, min(SHARD_WORKERS, len(shards)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ShardLoader") as pool:
+            for shard, (shard_sd, elapsed) in zip(shards, pool.map(_load_shard, shards)):
+                state_dict.update(shard_sd)
+                size = os.path.getsize(shard)
+                total_bytes += size
+                print(f"[UnetLoaderGGUF]   {os.path.basename(shard)}: {format_size(size)} "
+                      f"in {elapsed:.2f}s ({size / max(elapsed, 1e-9) / 2**20:.0f} MB/s)")
+        elapsed = time.perf_counter() - start
+        print(f"[UnetLoaderGGUF] Loaded {len(state_dict)} tensors from {len(shards)} shards "
+              f"({format_size(total_bytes)} in {elapsed:.2f}s, {workers} threads, "
+              f"{total_bytes / max(elapsed, 1e-9) / 2**20:.0f} MB/s)")
+        return state_dict
+
+    @staticmethod
+    def _convert_in_place(state_dict: Any, dtype: str, device: str) -> Any:
+        """
+        Convierte un state_dict tensor a tensor, soltando cada original.
+        Recorre dicts, listas y tuplas anidados (checkpoints con varios
+        sub-state_dicts); un tensor compartido se convierte una sola vez y
+        sigue compartido.
+        """
+        convert = _tensor_converter(dtype, device)
+        # id -> convertido. Los originales estaban todos vivos a la vez tras
+        # la carga, así que su id no se repite aunque se liberen por el camino
+        converted: Dict[int, Any] = {}
+
+        def walk(value):
+            if isinstance(value, torch.Tensor):
+                if id(value) not in converted:
+                    converted[id(value)] = convert(value)
+                return converted[id(value)]
+            if isinstance(value, dict):
+                for key in list(value):
+                    value[key] = walk(value[key])
+            elif isinstance(value, list):
+                for i, item in enumerate(value):
+                    value[i] = walk(item)
+            elif isinstance(value, tuple) and not hasattr(value, "_fields"):
+                return tuple(walk(item) for item in value)
+            return value
+
+        return walk(state_dict)
+
+    @staticmethod
+    def _torch_load(path: str) -> Any:
+        """
+        torch.load a CPU. Vía rápida: archivos en formato zip (torch >= 1.6)
+        se mapean en memoria con ``mmap=True, weights_only=True``; los tensores
+        quedan respaldados por el archivo (copy-on-write) y solo se leen al
+        usarse. Pickles antiguos o con objetos arbitrarios caen a la carga
+        clásica con ``weights_only=False``.
+        """
+        report = active_report()
+        if TORCH_MMAP and UnetLoaderGGUF._is_zip(path):
+            try:
+                with report.phase("deserialize"):
+                    data = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+                report.note("mmap: tensor data is read from the file on access")
+                return data
+            except (RuntimeError, TypeError, AttributeError, pickle.UnpicklingError) as e:
+                print(f"[UnetLoaderGGUF] mmap load not possible ({type(e).__name__}), "
+                      f"falling back to full torch.load")
+        
+        # weights_only=False para compatibilidad (pickles antiguos, PyTorch < 2.2)
+        with report.phase("deserialize", os.path.getsize(path)):
+            return torch.load(path, map_location="cpu", weights_only=False)
+
+    @staticmethod
+    def _is_zip(path: str) -> bool:
+        """True para checkpoints en formato zip (``torch.save`` desde 1.6)."""
+        with open(path, "rb") as f:
+            return f.read(4) == b"PK\x03\x04"
+
+    def _load_checkpoint(self, path: str, dtype: str = "auto", device: str = None) -> dict:
+        """Carga un checkpoint PyTorch."""
+        device = device or _default_device()
+        data = self._torch_load(path)
+        
+        # Extraer state_dict si está envuelto (sin tocar los datos de los tensores)
         if isinstance(data, dict):
             if "state_dict" in data:
                 data = data["state_dict"]
@@ -216,14 +593,15 @@ class UnetLoaderGGUF:
             elif "unet" in data:
                 data = data["unet"]
         
+        data = self._convert_in_place(data, dtype, device)
         print(f"[UnetLoaderGGUF] Loaded checkpoint")
         return data
 
-    def _load_bin(self, path: str) -> dict:
+    def _load_bin(self, path: str, dtype: str = "auto", device: str = None) -> dict:
         """Carga un archivo .bin (formato HuggingFace)."""
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        # weights_only=False para compatibilidad con PyTorch < 2.2
-        state_dict = torch.load(path, map_location=device, weights_only=False)
+        device = device or _default_device()
+        state_dict = self._torch_load(path)
+        state_dict = self._convert_in_place(state_dict, dtype, device)
         print(f"[UnetLoaderGGUF] Loaded .bin with {len(state_dict)} tensors")
         return state_dict
 
@@ -244,6 +622,14 @@ class UnetLoaderGGUFAdvanced(UnetLoaderGGUF):
             "optional": {
                 "dtype": (["auto", "float32", "float16", "bfloat16"], {"default": "auto"}),
                 "force_cpu": ("BOOLEAN", {"default": False}),
+                "zero_copy": ("BOOLEAN", {
+                    "default": True,
+                    "tooltip": "GGUF (gguf-py): mapear el archivo sin copiarlo a RAM"
+                }),
+                "lazy": ("BOOLEAN", {
+                    "default": False,
+                    "tooltip": "safetensors: leer cada tensor al accederlo (Mapping de solo lectura)"
+                }),
             }
         }
 
@@ -253,32 +639,16 @@ class UnetLoaderGGUFAdvanced(UnetLoaderGGUF):
     CATEGORY = "loaders"
 
     def load_unet_advanced(self, unet_name: str, dtype: str = "auto", 
-                           force_cpu: bool = False) -> Tuple[Any, str]:
-        """Carga con opciones avanzadas."""
-        # Cargar modelo base
-        model_tuple = self.load_unet(unet_name)
-        model = model_tuple[0]
-        
-        # Aplicar dtype si es state_dict
-        if dtype != "auto" and isinstance(model, dict):
-            dtype_map = {
-                "float32": torch.float32,
-                "float16": torch.float16,
-                "bfloat16": torch.bfloat16
-            }
-            target_dtype = dtype_map.get(dtype)
-            if target_dtype:
-                model = {
-                    k: v.to(target_dtype) if hasattr(v, 'to') and v.is_floating_point() else v
-                    for k, v in model.items()
-                }
-        
-        # Mover a CPU si se requiere
-        if force_cpu and isinstance(model, dict):
-            model = {k: v.cpu() if hasattr(v, 'cpu') else v for k, v in model.items()}
+                           force_cpu: bool = False, zero_copy: bool = True,
+                           lazy: bool = False) -> Tuple[Any, str]:
+        """Carga con opciones avanzadas (dtype y dispositivo se aplican al leer)."""
+        # Con las opciones por defecto comparte entrada en caché con UnetLoaderGGUF
+        notify_load(unet_name)
+        model = self.load_model(unet_name, dtype=dtype, force_cpu=force_cpu, zero_copy=zero_copy,
+                                lazy=lazy)
         
-        # Info
-        device = "cpu" if force_cpu else ("cuda" if torch.cuda.is_available() else "cpu")
-        info = f"Model: {unet_name}, Device: {device}, Dtype: {dtype}"
+        # Info + informe de la carga por fases
+        device = "cpu" if force_cpu else _default_device()
+        info = f"Model: {unet_name}, Device: {device}, Dtype: {dtype}\n{self.last_report.format()}"
         
         return (model, info)
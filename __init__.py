@@ -1,38 +1,35 @@
 # Root initializer for COMFYUI_PROMPTMODELS
 # This file allows ComfyUI / ComfyDeploy to detect all submodules under this repo
-
-# Import existing Utility nodes
-from .get_last_frame import (
-    NODE_CLASS_MAPPINGS as GET_LAST_FRAME_CLASS_MAPPINGS,
-    NODE_DISPLAY_NAME_MAPPINGS as GET_LAST_FRAME_NAME_MAPPINGS,
-)
-
-# Import Prompt-related nodes
-from .nodes.prompt_model_loader import PromptModelLoader
-from .nodes.prompt_refiner import PromptRefiner
-from .nodes.prompt_info import PromptInfo
+#
+# Nodes are registered as lazy proxies (see lazy_nodes.py): their modules are
+# imported on first INPUT_TYPES or execution, not at ComfyUI startup. A node
+# whose module is missing is simply not registered.
+
+import logging
+
+from .get_last_frame import NODES as _FRAME_NODES
+from .lazy_nodes import register_lazy_nodes
+
+# node -> (module, class, display name)
+_NODES = {
+    # Utility nodes
+    **{
+        name: (f".get_last_frame.{module}", name, display)
+        for name, (module, display) in _FRAME_NODES.items()
+    },
+    # Prompt-related nodes
+    "PromptModelLoader": (".nodes.prompt_model_loader", "PromptModelLoader", "🧠 Prompt Model Loader"),
+    "PromptRefiner": (".nodes.prompt_refiner", "PromptRefiner", "✨ Prompt Refiner"),
+    "PromptInfo": (".nodes.prompt_info", "PromptInfo", "ℹ️ Prompt Info"),
+}
 
 # Base node registry
 NODE_CLASS_MAPPINGS = {}
 NODE_DISPLAY_NAME_MAPPINGS = {}
 
-# Merge Utility nodes
-NODE_CLASS_MAPPINGS.update(GET_LAST_FRAME_CLASS_MAPPINGS)
-NODE_DISPLAY_NAME_MAPPINGS.update(GET_LAST_FRAME_NAME_MAPPINGS)
-
-# Register Prompt Models
-NODE_CLASS_MAPPINGS.update({
-    "PromptModelLoader": PromptModelLoader,
-    "PromptRefiner": PromptRefiner,
-    "PromptInfo": PromptInfo,
-})
-
-NODE_DISPLAY_NAME_MAPPINGS.update({
-    "PromptModelLoader": "🧠 Prompt Model Loader",
-    "PromptRefiner": "✨ Prompt Refiner",
-    "PromptInfo": "ℹ️ Prompt Info",
-})
+_missing = register_lazy_nodes(_NODES, NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS, __name__)
+if _missing:
+    logging.getLogger(__name__).warning("COMFYUI_PROMPTMODELS: nodes not registered (module missing): %s",
+                                        ", ".join(_missing))
 
 __all__ = ["NODE_CLASS_MAPPINGS", "NODE_DISPLAY_NAME_MAPPINGS"]
-
-print("[COMFYUI_PROMPTMODELS] ✅ Nodes registered: PromptModelLoader, PromptRefiner, PromptInfo, GetLastFrame, GetFrameByIndex")
@@ -0,0 +1,9 @@
+"""
+Benchmarks de COMFYUI_PROMPTMODELS.
+
+Ejecutar desde la raíz del repo. Suite completa con resultados en JSON:
+    python -m benchmarks [--quick] [--compare anterior.json]
+
+O un benchmark suelto, p.ej.:
+    python -m benchmarks.bench_var_name
+"""
@@ -0,0 +1,141 @@
+"""
+Runner de la suite de benchmarks.
+
+Ejecuta los benchmarks de rutas calientes (caché, nombres, detección de tipos,
+escaneo de modelos, cargadores, selección y retención de frames, import en
+frío) en CPU, con un ``folder_paths`` simulado, y guarda los resultados en JSON
+para comparar entre ejecuciones.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks                       # suite completa
+    python -m benchmarks --quick               # tamaños reducidos
+    python -m benchmarks --only cache,scan     # subconjunto
+    python -m benchmarks --compare benchmarks/results/anterior.json
+
+Los benchmarks que miden memoria por proceso (bench_safetensors_lazy,
+bench_convert_peak, bench_checkpoint_mmap, bench_frame_sequence) y
+bench_prefetch se ejecutan aparte con ``python -m benchmarks.<nombre>``.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import sys
+import time
+import traceback
+
+from benchmarks import folder_paths_stub
+
+# Antes de importar ComfyUI_WJSetGetPlus (desde cualquier benchmark)
+folder_paths_stub.install()
+
+# nombre corto -> módulo
+SUITE = {
+    "var_name": "benchmarks.bench_var_name",
+    "cache": "benchmarks.bench_cache_threads",
+    "detect_type": "benchmarks.bench_detect_type",
+    "scan": "benchmarks.bench_model_scan",
+    "loaders": "benchmarks.bench_loaders",
+    "frames": "benchmarks.bench_frame_select",
+    "retention": "benchmarks.bench_frame_retention",
+    "import": "benchmarks.bench_import_time",
+}
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+# Cambio relativo a partir del cual se marca una regresión en --compare
+REGRESSION_THRESHOLD = 0.10
+
+
+def _meta(quick: bool) -> dict:
+    meta = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "quick": quick,
+    }
+    try:
+        import torch
+        meta["torch"] = torch.__version__
+    except ImportError:
+        pass
+    return meta
+
+
+def run_suite(names: list, quick: bool) -> dict:
+    report = {"meta": _meta(quick), "benchmarks": {}}
+    for name in names:
+        print(f"[bench] {name} ...", flush=True)
+        start = time.perf_counter()
+        try:
+            result = importlib.import_module(SUITE[name]).run(quick=quick)
+        except Exception as e:
+            traceback.print_exc()
+            result = {"error": f"{type(e).__name__}: {e}"}
+            # Las comprobaciones de los benchmarks (assert) hacen fallar la suite
+            result["check_failed"] = isinstance(e, AssertionError)
+        result["seconds"] = time.perf_counter() - start
+        report["benchmarks"][name] = result
+        for metric, value in result.get("results", {}).items():
+            print(f"  {metric:<40} {value:>14.2f} {result['unit']}")
+    return report
+
+
+def compare(old: dict, new: dict) -> int:
+    """Imprime la comparación y devuelve el número de regresiones."""
+    regressions = 0
+    print(f"\n{'metric':<52} {'old':>12} {'new':>12} {'change':>9}")
+    for name, result in new["benchmarks"].items():
+        previous = old.get("benchmarks", {}).get(name, {}).get("results", {})
+        higher_is_better = result.get("higher_is_better", False)
+        for metric, value in result.get("results", {}).items():
+            before = previous.get(metric)
+            if not before:
+                continue
+            change = (value - before) / before
+            worse = -change if higher_is_better else change
+            flag = "  REGRESSION" if worse > REGRESSION_THRESHOLD else ""
+            regressions += bool(flag)
+            print(f"{name + '/' + metric:<52} {before:>12.2f} {value:>12.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks de ComfyUI_WJSetGetPlus")
+    parser.add_argument("--quick", action="store_true", help="tamaños reducidos")
+    parser.add_argument("--only", help=f"lista separada por comas de: {', '.join(SUITE)}")
+    parser.add_argument("--output", help="JSON de salida (por defecto benchmarks/results/<fecha>.json)")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior")
+    args = parser.parse_args()
+
+    names = list(SUITE) if not args.only else [n.strip() for n in args.only.split(",")]
+    unknown = [n for n in names if n not in SUITE]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    report = run_suite(names, args.quick)
+
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[bench] Results saved to {output}")
+
+    failed = [name for name, result in report["benchmarks"].items() if result.get("check_failed")]
+    if failed:
+        print(f"[bench] Checks failed: {', '.join(failed)}")
+        sys.exit(1)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(json.load(f), report)
+        if regressions:
+            print(f"[bench] {regressions} regression(s) over {REGRESSION_THRESHOLD:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark: QwenCache bajo carga concurrente.
+
+Coste de ``set``/``get_or_raise`` en un solo hilo y throughput con varios
+hilos: varios hilos hacen lecturas (``get_or_raise``) y una fracción de escrituras
+(``set``) sobre un conjunto fijo de claves. Se mide el throughput total para
+1..N hilos.
+
+Las lecturas no toman lock ni escriben en objetos compartidos por todos los
+hilos (los contadores de gets/misses son por hilo), solo en su entrada.
+Con GIL (CPython normal) los hilos Python se turnan, así que lo máximo que
+se puede mostrar es que el throughput se mantiene plano: main() comprueba
+que con N hilos no cae por debajo de MIN_SCALING veces el de un hilo (falla
+con AssertionError si no). Solo un intérprete sin GIL (3.13t) y varios
+núcleos pueden mostrar escalado real.
+
+Uso:
+    python -m benchmarks.bench_cache_threads
+"""
+
+import random
+import sys
+import threading
+import time
+
+from ComfyUI_WJSetGetPlus.qwen_cache import QwenCache
+
+THREADS = (1, 2, 4, 8)
+KEYS = 256
+WRITE_RATIO = 0.05
+DURATION = 1.0
+OPS = 100_000
+# Throughput mínimo con N hilos respecto a 1 hilo (con GIL: plano, con margen
+# para el cambio de hilo y el ruido)
+MIN_SCALING = 0.85
+
+
+def worker(cache: QwenCache, scope: str, stop: threading.Event, counts: list, idx: int):
+    rng = random.Random(idx)
+    names = [f"var_{i}" for i in range(KEYS)]
+    ops = 0
+    while not stop.is_set():
+        for _ in range(1000):
+            name = rng.choice(names)
+            if rng.random() < WRITE_RATIO:
+                cache.set(name, idx, "INT", scope=scope)
+            else:
+                cache.get_or_raise(name, scope)
+        ops += 1000
+    counts[idx] = ops
+
+
+def bench(n_threads: int) -> float:
+    """Operaciones por segundo con ``n_threads`` hilos."""
+    cache = QwenCache()
+    cache.clear()
+    scope = cache.begin_generation({"bench": n_threads})
+    cache.set_many({f"var_{i}": i for i in range(KEYS)}, scope=scope)
+
+    stop = threading.Event()
+    counts = [0] * n_threads
+    threads = [
+        threading.Thread(target=worker, args=(cache, scope, stop, counts, i))
+        for i in range(n_threads)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(DURATION)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    cache.end_generation(scope)
+    return sum(counts) / elapsed
+
+
+def bench_single(ops: int = OPS) -> dict:
+    """Operaciones por segundo de ``set`` y de ``get_or_raise`` en un hilo."""
+    cache = QwenCache()
+    cache.clear()
+    scope = cache.begin_generation({"bench": "single"})
+    names = [f"var_{i % KEYS}" for i in range(ops)]
+
+    start = time.perf_counter()
+    for i, name in enumerate(names):
+        cache.set(name, i, "INT", scope=scope)
+    set_ops = ops / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for name in names:
+        cache.get_or_raise(name, scope)
+    get_ops = ops / (time.perf_counter() - start)
+
+    cache.end_generation(scope)
+    return {"set": set_ops, "get": get_ops}
+
+
+def run(quick: bool = False) -> dict:
+    """Resultados para el runner de la suite (``python -m benchmarks``)."""
+    single = bench_single(OPS // 10 if quick else OPS)
+    results = {f"single_{op}": value for op, value in single.items()}
+    for n in THREADS[:3] if quick else THREADS:
+        results[f"mixed_threads={n}"] = bench(n)
+    return {"unit": "ops/s", "higher_is_better": True, "results": results}
+
+
+def main():
+    for op, value in bench_single().items():
+        print(f"{'1 thread ' + op:>14} {value:>14,.0f} ops/s")
+    print(f"{'threads':>8} {'ops/s':>14} {'x 1 thread':>10}")
+    results = {}
+    for n in THREADS:
+        results[n] = bench(n)
+        print(f"{n:>8} {results[n]:>14,.0f} {results[n] / results[THREADS[0]]:>10.2f}")
+    worst = min(results.values()) / results[THREADS[0]]
+    assert worst >= MIN_SCALING, (
+        f"throughput with more threads fell to {worst:.2f}x of 1 thread (< {MIN_SCALING})"
+    )
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"OK: >= {MIN_SCALING}x of 1 thread at every thread count "
+          f"({'GIL enabled: flat is the ceiling' if gil else 'free-threaded'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: carga de un checkpoint .ckpt grande, torch.load clásico vs mmap.
+
+Genera un checkpoint sintético (``{"state_dict": {...}}``, formato zip de
+torch.save) y, en un subproceso por modo, mide tiempo de carga y pico de RSS
+(VmHWM del hijo, ver peak_memory.py; incluye las páginas mapeadas tocadas):
+
+- legacy: torch.load(map_location="cpu", weights_only=False)
+- mmap: UnetLoaderGGUF._load_checkpoint (mmap=True, weights_only=True)
+- mmap+touch: igual, leyendo después todos los tensores una vez
+
+Uso:
+    python -m benchmarks.bench_checkpoint_mmap [--gb 2]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import peak_memory
+
+MODES = ("legacy", "mmap", "mmap+touch")
+
+
+def make_file(path: str, gb: float) -> None:
+    import torch
+
+    tensor_mb = 64
+    count = max(1, int(gb * 1024 / tensor_mb))
+    numel = tensor_mb * 1024 * 1024 // 2
+    state_dict = {f"model.blocks.{i}.weight": torch.ones(numel, dtype=torch.float16) for i in range(count)}
+    torch.save({"state_dict": state_dict, "global_step": 1000}, path)
+
+
+def run_child(mode: str, path: str) -> dict:
+    import torch
+    from ComfyUI_WJSetGetPlus.unet_loader_gguf import UnetLoaderGGUF
+
+    base_rss = peak_memory.reset()
+    start = time.perf_counter()
+    if mode == "legacy":
+        state_dict = torch.load(path, map_location="cpu", weights_only=False)["state_dict"]
+    else:
+        state_dict = UnetLoaderGGUF()._load_checkpoint(path, device="cpu")
+    load_s = time.perf_counter() - start
+    if mode == "mmap+touch":
+        for tensor in state_dict.values():
+            tensor.sum()
+    return {
+        "mode": mode,
+        "load_ms": load_s * 1000,
+        "total_ms": (time.perf_counter() - start) * 1000,
+        "peak_rss_mb": peak_memory.peak_mb() - base_rss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--gb", type=float, default=2.0)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(*args.child)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.ckpt")
+        make_file(path, args.gb)
+        print(f"checkpoint: {os.path.getsize(path) / 2**30:.2f} GB")
+        print(f"{'mode':>12} {'load ms':>10} {'total ms':>10} {'peak MB':>10}")
+        for mode in MODES:
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_checkpoint_mmap", "--child", mode, path],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"{mode:>12} {r['load_ms']:>10.1f} {r['total_ms']:>10.1f} {r['peak_rss_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark: pico de RSS al cargar un safetensors float32 convirtiendo a float16
+en CPU (UnetLoaderGGUFAdvanced con dtype=float16, force_cpu).
+
+- legacy: load_file + dict convertido + dict en CPU (como antes)
+- streaming: _load_file con dtype/dispositivo aplicados tensor a tensor
+
+Cada modo corre en un subproceso y mide su propio pico (VmHWM, ver
+peak_memory.py). Comprueba que el pico de streaming queda cerca del tamaño
+final del modelo (falla con AssertionError si no).
+
+Uso:
+    python -m benchmarks.bench_convert_peak [--tensors 32] [--mb 16]
+"""
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import peak_memory
+
+# Margen sobre el tamaño final: un tensor en vuelo + ruido del allocator
+PEAK_SLACK = 1.15
+PEAK_SLACK_MB = 48
+
+
+def make_file(path: str, tensors: int, mb: float) -> None:
+    import torch
+    from safetensors.torch import save_file
+
+    numel = int(mb * 1024 * 1024) // 4
+    save_file({f"blocks.{i}.weight": torch.randn(numel) for i in range(tensors)}, path)
+
+
+def run_child(mode: str, path: str) -> dict:
+    import torch
+    from ComfyUI_WJSetGetPlus.unet_loader_gguf import UnetLoaderGGUF
+
+    gc.collect()
+    base_rss = peak_memory.reset()
+    start = time.perf_counter()
+    if mode == "legacy":
+        from safetensors.torch import load_file
+        model = load_file(path, device="cpu")
+        model = {k: v.to(torch.float16) for k, v in model.items()}
+        model = {k: v.cpu() for k, v in model.items()}
+    else:
+        model = UnetLoaderGGUF()._load_safetensors(path, lazy=False, dtype="float16", device="cpu")
+    elapsed = time.perf_counter() - start
+    final_mb = sum(t.numel() * t.element_size() for t in model.values()) / (1024 * 1024)
+    return {
+        "mode": mode,
+        "load_ms": elapsed * 1000,
+        "final_mb": final_mb,
+        "peak_rss_mb": peak_memory.peak_mb() - base_rss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--tensors", type=int, default=32)
+    parser.add_argument("--mb", type=float, default=16.0, help="MB por tensor (float32)")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(*args.child)))
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.safetensors")
+        make_file(path, args.tensors, args.mb)
+        print(f"file: {args.tensors} tensors, {os.path.getsize(path) / (1024 * 1024):.0f} MB float32")
+        print(f"{'mode':>10} {'load ms':>10} {'final MB':>10} {'peak MB':>10}")
+        for mode in ("legacy", "streaming"):
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_convert_peak", "--child", mode, path],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = results[mode] = json.loads(out.strip().splitlines()[-1])
+            print(f"{mode:>10} {result['load_ms']:>10.1f} {result['final_mb']:>10.1f} {result['peak_rss_mb']:>10.1f}")
+
+    streaming = results["streaming"]
+    limit = streaming["final_mb"] * PEAK_SLACK + PEAK_SLACK_MB
+    assert streaming["peak_rss_mb"] <= limit, (
+        f"streaming peak {streaming['peak_rss_mb']:.0f} MB > {limit:.0f} MB"
+    )
+    print(f"OK: streaming peak within {limit:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: detect_comfy_type sobre todos los COMFY_TYPES.
+
+Construye un valor representativo por tipo (clases con el nombre que usa
+ComfyUI, dicts/listas con la estructura esperada, tensores con el shape
+típico) y mide el coste por llamada. Los tipos que no se detectan por
+estructura (p.ej. SAMPLER, NOISE) se miden igual: devuelven "*".
+
+Uso:
+    python -m benchmarks.bench_detect_type
+"""
+
+import time
+
+import torch
+
+from ComfyUI_WJSetGetPlus.qwen_cache import COMFY_TYPES, detect_comfy_type
+
+CALLS = 100_000
+
+
+def _instance(class_name: str):
+    return type(class_name, (), {})()
+
+
+def sample_values() -> dict:
+    """Un valor de ejemplo por cada tipo de COMFY_TYPES."""
+    conditioning = [[torch.zeros(1, 77, 8), {"pooled_output": torch.zeros(1, 8)}]]
+    return {
+        "MODEL": _instance("ModelPatcher"),
+        "CLIP": _instance("CLIP"),
+        "VAE": _instance("VAE"),
+        "LATENT": {"samples": torch.zeros(1, 4, 8, 8)},
+        "IMAGE": torch.zeros(1, 3, 8, 8),
+        "MASK": torch.zeros(1, 8, 8),
+        "CONDITIONING": conditioning,
+        "CONTROL_NET": _instance("ControlNet"),
+        "STYLE_MODEL": _instance("StyleModel"),
+        "GLIGEN": _instance("Gligen"),
+        "UPSCALE_MODEL": _instance("ImageModelDescriptor"),
+        "CLIP_VISION": _instance("ClipVisionModel"),
+        "CLIP_VISION_OUTPUT": _instance("Output"),
+        "SAMPLER": _instance("KSAMPLER"),
+        "SIGMAS": torch.linspace(1, 0, 20),
+        "NOISE": _instance("Noise_RandomNoise"),
+        "GUIDER": _instance("CFGGuider"),
+        "STRING": "prompt",
+        "INT": 42,
+        "FLOAT": 0.5,
+    }
+
+
+def run(quick: bool = False) -> dict:
+    """Resultados para el runner de la suite (``python -m benchmarks``)."""
+    values = sample_values()
+    calls = CALLS // 10 if quick else CALLS
+    results = {}
+    for comfy_type in COMFY_TYPES:
+        value = values[comfy_type]
+        start = time.perf_counter()
+        for _ in range(calls):
+            detect_comfy_type(value)
+        results[comfy_type] = (time.perf_counter() - start) / calls * 1e9
+    return {"unit": "ns/call", "higher_is_better": False, "results": results}
+
+
+def main():
+    values = sample_values()
+    assert set(values) == set(COMFY_TYPES)
+    print(f"{'type':>20} {'detected':>14} {'ns/call':>10}")
+    for comfy_type in COMFY_TYPES:
+        value = values[comfy_type]
+        detected = detect_comfy_type(value)
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            detect_comfy_type(value)
+        ns = (time.perf_counter() - start) / CALLS * 1e9
+        print(f"{comfy_type:>20} {detected:>14} {ns:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
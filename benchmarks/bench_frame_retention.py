@@ -0,0 +1,83 @@
+"""
+Benchmark: memoria retenida por GetLastFrame / GetFrameByIndex según la
+política de retención (auto / view / compact).
+
+Para cada modo se selecciona un frame de un clip, se suelta la referencia al
+clip y se mide cuánto almacenamiento sigue vivo a través del frame devuelto.
+Comprueba que con auto y compact (clip grande) el almacenamiento del clip se
+libera y solo queda el frame (falla con AssertionError si no), y que auto no
+copia en casos baratos.
+
+Uso:
+    python -m benchmarks.bench_frame_retention
+"""
+
+import gc
+
+import torch
+
+from get_last_frame.get_last_frame import GetFrameByIndex, GetLastFrame
+
+# (frames, lado): clip grande (~190 MB) y clip pequeño (~0.2 MB)
+LARGE = (240, 512)
+QUICK_LARGE = (60, 512)
+SMALL = (4, 64)
+MODES = ("view", "auto", "compact")
+
+
+def retained_mb(node: str, mode: str, clip) -> float:
+    """MB que siguen vivos a través del frame devuelto una vez soltado el clip."""
+    n, size = clip
+    frames = torch.rand(n, size, size, 3)
+    if node == "last":
+        (frame,) = GetLastFrame().get_last_frame(frames=frames, retention=mode)
+    else:
+        (frame,) = GetFrameByIndex().get_frame_by_index(frames, n // 2, retention=mode)
+    del frames
+    gc.collect()
+    return frame.untyped_storage().nbytes() / (1024 * 1024)
+
+
+def frame_mb(clip) -> float:
+    _, size = clip
+    return size * size * 3 * 4 / (1024 * 1024)
+
+
+def run(quick: bool = False) -> dict:
+    """
+    Resultados para el runner de la suite (``python -m benchmarks``). Falla
+    con AssertionError si auto/compact no liberan el almacenamiento del clip.
+    """
+    large = QUICK_LARGE if quick else LARGE
+    results = {}
+    for node in ("last", "index"):
+        for mode in MODES:
+            results[f"{node}/large/{mode}"] = retained_mb(node, mode, large)
+            results[f"{node}/small/{mode}"] = retained_mb(node, mode, SMALL)
+    check(results, large)
+    return {"unit": "MB", "higher_is_better": False, "results": results}
+
+
+def check(results: dict, large) -> None:
+    for node in ("last", "index"):
+        # Clip grande: auto y compact retienen solo el frame
+        for mode in ("auto", "compact"):
+            retained = results[f"{node}/large/{mode}"]
+            assert retained <= frame_mb(large) * 1.01, (
+                f"{node}/{mode}: retains {retained:.1f} MB, frame is {frame_mb(large):.1f} MB"
+            )
+        # view retiene el clip entero; auto no copia un clip pequeño
+        assert results[f"{node}/large/view"] > frame_mb(large) * 2
+        assert results[f"{node}/small/auto"] == results[f"{node}/small/view"]
+
+
+def main():
+    results = run()["results"]
+    print(f"{'case':>20} {'retained MB':>12}")
+    for name, value in results.items():
+        print(f"{name:>20} {value:>12.2f}")
+    print("OK: source storage released with auto/compact")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: selección de frames con GetFramesByIndices sobre vídeos largos.
+
+Mide el coste (ms) de varias especificaciones sobre clips de hasta 10k frames
+pequeños (el coste que interesa es el de resolver y reunir índices, no el de
+copiar píxeles), y el de FrameRingBuffer en régimen estable (escribir un
+tramo y leer los últimos frames como vista).
+
+Uso:
+    python -m benchmarks.bench_frame_select
+"""
+
+import time
+
+import torch
+
+from get_last_frame.frame_ring_buffer import FrameRingBuffer
+from get_last_frame.get_last_frame import select_frames
+
+LENGTHS = (100, 1000, 10000)
+QUICK_LENGTHS = (100, 1000)
+SPECS = ("last 16", "every 10", "0, 5, 17, -1, 900:1000", "::-1")
+REPEATS = 20
+RING_CAPACITY = 16
+RING_CHUNKS = (1, 8, 64)
+
+
+def bench(n_frames: int, spec: str) -> float:
+    """Milisegundos por selección (mejor de ``REPEATS``)."""
+    frames = torch.zeros(n_frames, 8, 8, 3)
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        select_frames(frames, spec)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench_ring(chunk: int, size: int = 64) -> float:
+    """Milisegundos por push + recent en régimen estable (mejor de ``REPEATS``)."""
+    buffer = FrameRingBuffer(RING_CAPACITY)
+    frames = torch.rand(chunk, size, size, 3)
+    buffer.push(frames)
+    storage = buffer.data.data_ptr()
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        buffer.push(frames)
+        buffer.recent(RING_CAPACITY)
+        best = min(best, time.perf_counter() - start)
+    # Sin reservas nuevas: el tensor del buffer es siempre el mismo
+    assert buffer.data.data_ptr() == storage
+    return best * 1000
+
+
+def run(quick: bool = False) -> dict:
+    """Resultados para el runner de la suite (``python -m benchmarks``)."""
+    results = {}
+    for n in QUICK_LENGTHS if quick else LENGTHS:
+        for spec in SPECS:
+            results[f"frames={n}/{spec}"] = bench(n, spec)
+    for chunk in RING_CHUNKS:
+        results[f"ring/push={chunk}"] = bench_ring(chunk)
+    return {"unit": "ms", "higher_is_better": False, "results": results}
+
+
+def main():
+    print(f"{'frames':>8} " + " ".join(f"{s:>24}" for s in SPECS))
+    for n in LENGTHS:
+        print(f"{n:>8} " + " ".join(f"{bench(n, s):>24.3f}" for s in SPECS))
+    print(f"\nring buffer (capacity {RING_CAPACITY}), ms per push + recent")
+    for chunk in RING_CHUNKS:
+        print(f"{chunk:>8} {bench_ring(chunk):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: pico de RSS al sacar el último frame de un clip largo.
+
+- image: el clip entero cargado como IMAGE y GetLastFrame
+- sequence: el clip como FRAME_SEQUENCE (.npy mapeado) y GetLastFrame
+
+Cada modo corre en un subproceso y mide su propio pico (VmHWM, ver
+peak_memory.py; incluye las páginas mapeadas del .npy). Comprueba que el pico de sequence no
+depende de la longitud del clip (falla con AssertionError si no).
+
+Uso:
+    python -m benchmarks.bench_frame_sequence [--frames 512] [--size 256]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import peak_memory
+
+# Margen sobre el frame leído: ruido del allocator e imports
+PEAK_SLACK_MB = 32
+
+
+def make_file(path: str, frames: int, size: int) -> None:
+    import numpy as np
+
+    array = np.lib.format.open_memmap(path, mode="w+", dtype="float16", shape=(frames, size, size, 3))
+    rng = np.random.default_rng(0)
+    for i in range(frames):
+        array[i] = rng.random((size, size, 3), dtype=np.float32)
+    array.flush()
+
+
+def run_child(mode: str, path: str) -> dict:
+    import numpy as np
+    import torch
+    from get_last_frame.frame_sequence import FrameSequence
+    from get_last_frame.get_last_frame import GetLastFrame
+
+    base_rss = peak_memory.reset()
+    start = time.perf_counter()
+    if mode == "image":
+        frames = torch.from_numpy(np.load(path)).float()
+        (frame,) = GetLastFrame().get_last_frame(frames=frames)
+    else:
+        (frame,) = GetLastFrame().get_last_frame(frames=None, sequence=FrameSequence(path))
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "ms": elapsed * 1000,
+        "frame_mb": frame.numel() * frame.element_size() / (1024 * 1024),
+        "peak_rss_mb": peak_memory.peak_mb() - base_rss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--frames", type=int, default=512)
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(*args.child)))
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "clip.npy")
+        make_file(path, args.frames, args.size)
+        print(f"clip: {args.frames} frames {args.size}x{args.size}, "
+              f"{os.path.getsize(path) / (1024 * 1024):.0f} MB float16")
+        print(f"{'mode':>10} {'ms':>10} {'frame MB':>10} {'peak MB':>10}")
+        for mode in ("image", "sequence"):
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_frame_sequence", "--child", mode, path],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = results[mode] = json.loads(out.strip().splitlines()[-1])
+            print(f"{mode:>10} {result['ms']:>10.1f} {result['frame_mb']:>10.2f} {result['peak_rss_mb']:>10.1f}")
+
+    sequence = results["sequence"]
+    limit = sequence["frame_mb"] * 2 + PEAK_SLACK_MB
+    assert sequence["peak_rss_mb"] <= limit, (
+        f"sequence peak {sequence['peak_rss_mb']:.0f} MB > {limit:.0f} MB"
+    )
+    print(f"OK: sequence peak within {limit:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
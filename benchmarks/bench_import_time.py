@@ -0,0 +1,97 @@
+"""
+Benchmark: tiempo de import en frío de los paquetes de nodos.
+
+Cada medida corre en un subproceso nuevo (sin módulos en caché):
+
+- import: importar el paquete, como hace ComfyUI al arrancar
+- first_use: import + INPUT_TYPES de todos los nodos (carga los módulos
+  reales; requiere torch)
+
+Comprueba que el import no carga torch, numpy, gguf ni folder_paths (falla con
+AssertionError si lo hace).
+
+Uso:
+    python -m benchmarks.bench_import_time
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("torch", "numpy", "gguf", "folder_paths")
+REPEATS = 5
+QUICK_REPEATS = 2
+
+_CHILD = """
+import importlib, json, sys, time
+sys.path.insert(0, {path!r})
+start = time.perf_counter()
+module = importlib.import_module({package!r})
+import_s = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+first_use_s = None
+if {first_use!r}:
+    for node in module.NODE_CLASS_MAPPINGS.values():
+        node.INPUT_TYPES()
+    first_use_s = time.perf_counter() - start
+print(json.dumps({{"import_s": import_s, "first_use_s": first_use_s, "heavy": heavy}}))
+"""
+
+
+def packages() -> dict:
+    """nombre -> (directorio para sys.path, paquete a importar)."""
+    found = {
+        "wjsetgetplus": (REPO, "ComfyUI_WJSetGetPlus"),
+        "get_last_frame": (REPO, "get_last_frame"),
+    }
+    # El repo entero es un paquete de custom nodes (se importa por su carpeta)
+    root_name = os.path.basename(REPO)
+    if root_name.isidentifier():
+        found["root"] = (os.path.dirname(REPO), root_name)
+    return found
+
+
+def measure(path: str, package: str, first_use: bool = False) -> dict:
+    code = _CHILD.format(path=path, package=package, heavy=HEAVY_MODULES, first_use=first_use)
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True,
+                         text=True, cwd=path).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def bench(path: str, package: str, repeats: int, first_use: bool = False) -> float:
+    """Milisegundos (mejor de ``repeats``) hasta el import o el primer uso."""
+    key = "first_use_s" if first_use else "import_s"
+    return min(measure(path, package, first_use)[key] for _ in range(repeats)) * 1000
+
+
+def run(quick: bool = False) -> dict:
+    """Resultados para el runner de la suite (``python -m benchmarks``)."""
+    repeats = QUICK_REPEATS if quick else REPEATS
+    results = {}
+    for name, (path, package) in packages().items():
+        results[f"{name}/import"] = bench(path, package, repeats)
+        try:
+            results[f"{name}/first_use"] = bench(path, package, repeats, first_use=True)
+        except subprocess.CalledProcessError:
+            pass  # sin torch no se pueden cargar los nodos
+    return {"unit": "ms", "higher_is_better": False, "results": results}
+
+
+def main():
+    print(f"{'package':>16} {'import ms':>10} {'first use ms':>13}  heavy modules after import")
+    for name, (path, package) in packages().items():
+        result = measure(path, package)
+        import_ms = bench(path, package, REPEATS)
+        try:
+            first_use = f"{bench(path, package, REPEATS, first_use=True):>13.1f}"
+        except subprocess.CalledProcessError:
+            first_use = f"{'n/a':>13}"
+        print(f"{name:>16} {import_ms:>10.1f} {first_use}  {', '.join(result['heavy']) or '-'}")
+        assert not result["heavy"], f"{package} imports {result['heavy']} at import time"
+    print("OK: no heavy modules imported at package import")
+
+
+if __name__ == "__main__":
+    main()
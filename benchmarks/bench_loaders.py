@@ -0,0 +1,119 @@
+"""
+Benchmark: cargadores de UnetLoaderGGUF sobre archivos sintéticos (CPU).
+
+Para cada formato genera un archivo de ``--mb`` MB y mide el tiempo de
+``_load_file`` (sin pasar por el almacén de modelos) y el de cargar y leer
+todos los tensores una vez, en MB/s:
+
+- safetensors (eager y lazy), safetensors a float16
+- ckpt zip con mmap y ckpt pickle clásico
+- gguf (solo si el paquete ``gguf`` está instalado; si no, se omite)
+
+Uso:
+    python -m benchmarks.bench_loaders [--mb 256]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks import folder_paths_stub
+
+folder_paths_stub.install()
+
+import torch  # noqa: E402
+
+from ComfyUI_WJSetGetPlus import unet_loader_gguf  # noqa: E402
+from ComfyUI_WJSetGetPlus.unet_loader_gguf import UnetLoaderGGUF  # noqa: E402
+
+TENSORS = 16
+QUICK_MB = 32
+DEFAULT_MB = 256
+
+
+def _state_dict(mb: float) -> dict:
+    numel = int(mb * 1024 * 1024) // 4 // TENSORS
+    return {f"blocks.{i}.weight": torch.randn(numel) for i in range(TENSORS)}
+
+
+def make_files(tmp: str, mb: float) -> dict:
+    """{caso: (ruta, opciones de _load_file, ajustes de módulo)}"""
+    from safetensors.torch import save_file
+
+    state_dict = _state_dict(mb)
+    files = {}
+
+    path = os.path.join(tmp, "model.safetensors")
+    save_file(state_dict, path)
+    files["safetensors_eager"] = (path, {}, {"SAFETENSORS_LAZY": False})
+    files["safetensors_lazy"] = (path, {}, {"SAFETENSORS_LAZY": True})
+    files["safetensors_to_fp16"] = (path, {"dtype": "float16", "force_cpu": True}, {"SAFETENSORS_LAZY": False})
+
+    path = os.path.join(tmp, "model.ckpt")
+    torch.save({"state_dict": state_dict}, path)
+    files["ckpt_mmap"] = (path, {}, {"TORCH_MMAP": True})
+
+    path = os.path.join(tmp, "model_legacy.ckpt")
+    torch.save({"state_dict": state_dict}, path, _use_new_zipfile_serialization=False)
+    files["ckpt_legacy"] = (path, {}, {"TORCH_MMAP": True})
+
+    try:
+        import gguf
+    except ImportError:
+        gguf = None
+    if gguf is not None and unet_loader_gguf.GGUF_BACKEND == "gguf-py":
+        path = os.path.join(tmp, "model.gguf")
+        writer = gguf.GGUFWriter(path, "bench")
+        for name, tensor in state_dict.items():
+            writer.add_tensor(name, tensor.numpy())
+        writer.write_header_to_file()
+        writer.write_kv_data_to_file()
+        writer.write_tensors_to_file()
+        writer.close()
+        files["gguf_zero_copy"] = (path, {"zero_copy": True}, {})
+        files["gguf_copy"] = (path, {"zero_copy": False}, {})
+    return files
+
+
+def bench(path: str, options: dict, settings: dict) -> dict:
+    saved = {name: getattr(unet_loader_gguf, name) for name in settings}
+    for name, value in settings.items():
+        setattr(unet_loader_gguf, name, value)
+    try:
+        loader = UnetLoaderGGUF()
+        start = time.perf_counter()
+        model = loader._load_file(path, **options)
+        load_s = time.perf_counter() - start
+        for key in model:
+            model[key].sum()
+        total_s = time.perf_counter() - start
+    finally:
+        for name, value in saved.items():
+            setattr(unet_loader_gguf, name, value)
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    return {"load": size_mb / max(load_s, 1e-9), "load+read": size_mb / max(total_s, 1e-9)}
+
+
+def run(quick: bool = False, mb: float = None) -> dict:
+    """Resultados para el runner de la suite (``python -m benchmarks``)."""
+    mb = mb or (QUICK_MB if quick else DEFAULT_MB)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for case, (path, options, settings) in make_files(tmp, mb).items():
+            for phase, mb_s in bench(path, options, settings).items():
+                results[f"{case}/{phase}"] = mb_s
+    return {"unit": "MB/s", "higher_is_better": True, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--mb", type=float, default=DEFAULT_MB)
+    args = parser.parse_args()
+    print(f"{'case':>28} {'MB/s':>12}")
+    for name, mb_s in run(mb=args.mb)["results"].items():
+        print(f"{name:>28} {mb_s:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: get_unet_files sobre árboles de modelos sintéticos.
+
+Crea árboles con N archivos vacíos repartidos en subcarpetas de ``unet/`` y
+mide (en ms):
+
+- os.walk: recorrido completo, como hacía get_unet_files antes del índice
+- cold: primera llamada sobre un árbol nuevo (lista todo)
+- cached: llamada dentro de ``min_interval`` (no toca disco)
+- refresh: refresco forzado sin cambios (un stat por directorio)
+- refresh_one_dir: refresco forzado tras añadir un archivo en una carpeta
+
+Uso:
+    python -m benchmarks.bench_model_scan
+"""
+
+import os
+import tempfile
+import time
+
+from benchmarks import folder_paths_stub
+
+stub = folder_paths_stub.install()
+
+from ComfyUI_WJSetGetPlus.model_index import MODEL_EXTENSIONS, get_model_index  # noqa: E402
+from ComfyUI_WJSetGetPlus.unet_loader_gguf import get_unet_files  # noqa: E402
+
+SIZES = (100, 1000, 10000)
+QUICK_SIZES = (100, 1000)
+FILES_PER_DIR = 50
+
+
+def make_tree(root: str, n_files: int) -> list:
+    """Árbol ``unet/gNN/dNNN/model_N.safetensors``; devuelve las carpetas hoja."""
+    dirs = []
+    for i in range(n_files):
+        if i % FILES_PER_DIR == 0:
+            leaf = os.path.join(root, "unet", f"g{i // (FILES_PER_DIR * 20):02d}", f"d{i // FILES_PER_DIR:04d}")
+            os.makedirs(leaf)
+            dirs.append(leaf)
+        open(os.path.join(dirs[-1], f"model_{i}.safetensors"), "w").close()
+    return dirs
+
+
+def os_walk_files(root: str) -> list:
+    base = os.path.join(root, "unet")
+    files = []
+    for dirpath, _, filenames in os.walk(base):
+        for name in filenames:
+            if name.lower().endswith(MODEL_EXTENSIONS):
+                files.append(os.path.relpath(os.path.join(dirpath, name), base))
+    return sorted(files)
+
+
+def _ms(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench(n_files: int) -> dict:
+    index = get_model_index()
+    with tempfile.TemporaryDirectory() as root:
+        dirs = make_tree(root, n_files)
+        stub.models_dir = root
+        results = {"os.walk": _ms(lambda: os_walk_files(root))}
+        # Carpeta base nueva: el índice tiene que listarla entera
+        results["cold"] = _ms(lambda: (index.refresh(force=True), get_unet_files()))
+        assert len(get_unet_files()) == n_files
+        results["cached"] = _ms(get_unet_files)
+        results["refresh"] = _ms(lambda: index.refresh(force=True))
+        time.sleep(0.01)
+        open(os.path.join(dirs[len(dirs) // 2], "new.safetensors"), "w").close()
+        results["refresh_one_dir"] = _ms(lambda: index.refresh(force=True))
+        assert len(get_unet_files()) == n_files + 1
+    return results
+
+
+def run(quick: bool = False) -> dict:
+    """Resultados para el runner de la suite (``python -m benchmarks``)."""
+    results = {}
+    for n in QUICK_SIZES if quick else SIZES:
+        for phase, ms in bench(n).items():
+            results[f"files={n}/{phase}"] = ms
+    return {"unit": "ms", "higher_is_better": False, "results": results}
+
+
+def main():
+    phases = ("os.walk", "cold", "cached", "refresh", "refresh_one_dir")
+    print(f"{'files':>8} " + " ".join(f"{p:>16}" for p in phases))
+    for n in SIZES:
+        r = bench(n)
+        print(f"{n:>8} " + " ".join(f"{r[p]:>16.2f}" for p in phases))
+
+
+if __name__ == "__main__":
+    main()
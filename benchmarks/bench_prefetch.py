@@ -0,0 +1,103 @@
+"""
+Benchmark: workflow con varios cargadores, con y sin prefetch.
+
+Genera K archivos .safetensors y simula un prompt con K nodos cargadores,
+cada uno seguido de un "sampler" que lee todos los tensores del modelo y
+tarda ``--compute`` segundos más. Sin prefetch cada carga (y la lectura de
+los tensores) bloquea la ejecución; con prefetch se lanzan al encolar el
+prompt y se solapan con el cómputo y entre sí.
+
+Usa la configuración por defecto del cargador y del prefetch (modelos
+completos cargados en CPU por el prefetch). Con ``--lazy`` los nodos son
+UnetLoaderGGUFAdvanced con ``lazy=True``: el prefetch solo trae las páginas
+de los archivos y la lectura real ocurre en el "sampler".
+
+Los modelos se pasan por ruta absoluta (sin folder_paths el cargador usa la
+ruta directa).
+
+Uso:
+    python -m benchmarks.bench_prefetch [--models 4] [--mb 256] [--compute 0.5] [--lazy]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from ComfyUI_WJSetGetPlus.model_store import get_model_store
+from ComfyUI_WJSetGetPlus.prefetch import get_prefetcher
+from ComfyUI_WJSetGetPlus.unet_loader_gguf import UnetLoaderGGUFAdvanced
+
+
+def make_files(tmp: str, models: int, mb: float) -> list:
+    import torch
+    from safetensors.torch import save_file
+
+    numel = int(mb * 1024 * 1024) // 4 // 8
+    paths = []
+    for m in range(models):
+        path = os.path.join(tmp, f"model_{m}.safetensors")
+        save_file({f"blocks.{i}.weight": torch.randn(numel) for i in range(8)}, path)
+        paths.append(path)
+    return paths
+
+
+def run_workflow(paths: list, compute: float, lazy: bool, prefetch: bool) -> float:
+    prompt = {
+        str(i): {"class_type": "UnetLoaderGGUFAdvanced", "inputs": {"unet_name": p, "lazy": lazy}}
+        for i, p in enumerate(paths)
+    }
+    get_model_store().clear()
+    start = time.perf_counter()
+    if prefetch:
+        get_prefetcher().on_prompt({"prompt": prompt})
+    loader = UnetLoaderGGUFAdvanced()
+    for node in prompt.values():
+        model, _ = loader.load_unet_advanced(**node["inputs"])
+        # sampler: usa todos los pesos
+        for key in model:
+            model[key].sum()
+        time.sleep(compute)
+    return time.perf_counter() - start
+
+
+def _drop_page_cache(paths: list) -> None:
+    # Sin root no se puede vaciar la caché del sistema; se pide por archivo
+    for path in paths:
+        if hasattr(os, "posix_fadvise"):
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--models", type=int, default=4)
+    parser.add_argument("--mb", type=float, default=256.0, help="MB por modelo")
+    parser.add_argument("--compute", type=float, default=0.5, help="segundos de 'sampler' por modelo")
+    parser.add_argument("--lazy", action="store_true", help="cargadores con lazy=True")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_files(tmp, args.models, args.mb)
+        results = {}
+        for mode in ("sequential", "prefetch"):
+            _drop_page_cache(paths)
+            results[mode] = run_workflow(paths, args.compute, args.lazy, mode == "prefetch")
+        prefetch_stats = get_prefetcher().stats()
+        get_prefetcher().shutdown()
+
+    floor = args.models * args.compute
+    print(f"{args.models} loaders x {args.mb:.0f} MB, {args.compute}s compute each (floor {floor:.2f}s)"
+          f"{', lazy' if args.lazy else ''}")
+    print(f"prefetch: {prefetch_stats['staged']} staged on CPU, {prefetch_stats['paged_in']} paged in, "
+          f"{prefetch_stats['skipped']} over budget")
+    for mode, elapsed in results.items():
+        print(f"{mode:>12} {elapsed:>8.2f}s")
+    print(f"{'speedup':>12} {results['sequential'] / results['prefetch']:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
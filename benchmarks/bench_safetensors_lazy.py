@@ -0,0 +1,100 @@
+"""
+Benchmark: safetensors eager (load_file) vs LazySafetensorsDict.
+
+Genera un archivo .safetensors sintético y, en un subproceso por modo (para
+que el pico de RSS de un modo no contamine al otro), mide:
+
+- tiempo hasta el primer tensor (cargar + leer una clave)
+- tiempo en leer todas las claves
+- pico de memoria (VmHWM, ver peak_memory.py) sobre el RSS antes de cargar
+
+El archivo se lee una vez antes de medir para que ambos modos partan con la
+caché de páginas del sistema caliente.
+
+Uso:
+    python -m benchmarks.bench_safetensors_lazy [--tensors 64] [--mb 4]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import peak_memory
+
+MODES = ("eager", "lazy", "lazy-one")
+
+
+def make_file(path: str, tensors: int, mb: float) -> None:
+    import torch
+    from safetensors.torch import save_file
+
+    numel = int(mb * 1024 * 1024) // 2
+    state_dict = {f"blocks.{i}.weight": torch.randn(numel, dtype=torch.float32).half() for i in range(tensors)}
+    save_file(state_dict, path)
+
+
+def run_child(mode: str, path: str) -> dict:
+    # safetensors.torch importa torch fuera de la medición
+    from safetensors.torch import load_file
+    from ComfyUI_WJSetGetPlus.lazy_state_dict import LazySafetensorsDict
+
+    base_rss = peak_memory.reset()
+    start = time.perf_counter()
+    if mode == "eager":
+        state_dict = load_file(path, device="cpu")
+    else:
+        state_dict = LazySafetensorsDict(path, device="cpu")
+    keys = list(state_dict)
+    first = state_dict[keys[0]]
+    first_s = time.perf_counter() - start
+
+    if mode != "lazy-one":
+        for key in keys:
+            state_dict[key]
+    all_s = time.perf_counter() - start
+    del first
+    return {
+        "mode": mode,
+        "first_tensor_ms": first_s * 1000,
+        "all_tensors_ms": all_s * 1000,
+        "peak_rss_mb": peak_memory.peak_mb() - base_rss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--tensors", type=int, default=64)
+    parser.add_argument("--mb", type=float, default=4.0, help="MB por tensor")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(*args.child)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.safetensors")
+        make_file(path, args.tensors, args.mb)
+        with open(path, "rb") as f:
+            while f.read(1 << 24):
+                pass
+
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"file: {args.tensors} tensors, {size_mb:.0f} MB")
+        print(f"{'mode':>10} {'first ms':>10} {'all ms':>10} {'peak MB':>10}")
+        for mode in MODES:
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_safetensors_lazy", "--child", mode, path],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            all_ms = "-" if mode == "lazy-one" else f"{result['all_tensors_ms']:.1f}"
+            print(f"{mode:>10} {result['first_tensor_ms']:>10.1f} {all_ms:>10} {result['peak_rss_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
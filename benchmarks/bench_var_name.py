@@ -0,0 +1,71 @@
+"""
+Benchmark: resolución de nombres de SetNode/GetNode.
+
+Genera workflows sintéticos de distinto tamaño y mide el coste por nodo de
+resolver el nombre de todos sus Set/Get. Con el índice por workflow el coste
+por nodo debe mantenerse plano al crecer el workflow.
+
+Uso:
+    python -m benchmarks.bench_var_name
+"""
+
+import time
+
+from ComfyUI_WJSetGetPlus.setget_nodes import SetNode, GetNode
+
+SIZES = (10, 100, 1000, 1500, 10000)
+QUICK_SIZES = (10, 100, 1000)
+
+
+def make_workflow(n_nodes: int):
+    """Workflow con ``n_nodes`` nodos alternando SetNode y GetNode."""
+    nodes = []
+    prompt = {}
+    for i in range(n_nodes):
+        kind = "Set" if i % 2 == 0 else "Get"
+        var = f"VAR_{i // 2}"
+        nodes.append({
+            "id": i,
+            "type": f"{kind}Node",
+            "title": f"{kind}_{var}",
+            "widgets_values": [var],
+        })
+        prompt[str(i)] = {"class_type": f"{kind}Node", "inputs": {}}
+    return prompt, {"workflow": {"nodes": nodes}}
+
+
+def bench(n_nodes: int, repeats: int = 3) -> float:
+    """Segundos por nodo (mejor de ``repeats``), incluyendo construir el índice."""
+    setter, getter = SetNode(), GetNode()
+    best = float("inf")
+    for _ in range(repeats):
+        # Un extra_pnginfo nuevo por repetición, como en un prompt nuevo
+        prompt, extra = make_workflow(n_nodes)
+        start = time.perf_counter()
+        for node_id in prompt:
+            if int(node_id) % 2 == 0:
+                setter._get_var_name(node_id, prompt, extra, "*")
+            else:
+                getter._get_var_name("my_variable", node_id, prompt, extra)
+        best = min(best, (time.perf_counter() - start) / n_nodes)
+    return best
+
+
+def run(quick: bool = False) -> dict:
+    """Resultados para el runner de la suite (``python -m benchmarks``)."""
+    sizes = QUICK_SIZES if quick else SIZES
+    return {
+        "unit": "us/node",
+        "higher_is_better": False,
+        "results": {f"nodes={n}": bench(n) * 1e6 for n in sizes},
+    }
+
+
+def main():
+    print(f"{'nodes':>8} {'us/node':>10}")
+    for n in SIZES:
+        print(f"{n:>8} {bench(n) * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
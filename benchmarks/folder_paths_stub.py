@@ -0,0 +1,41 @@
+"""
+``folder_paths`` mínimo para correr los benchmarks fuera de ComfyUI.
+
+Debe instalarse antes de importar ComfyUI_WJSetGetPlus (model_index y el
+cargador comprueban ``folder_paths`` al importarse). Las carpetas de modelos
+cuelgan de ``models_dir``, que cada benchmark apunta a su árbol sintético.
+"""
+
+import os
+import sys
+import tempfile
+import types
+
+
+def install(models_dir: str = None) -> types.ModuleType:
+    """
+    Registra el stub en ``sys.modules`` (si ya hay un folder_paths real de
+    ComfyUI, se respeta y se devuelve tal cual) y fuerza la CPU.
+    """
+    os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+    existing = sys.modules.get("folder_paths")
+    if existing is not None:
+        if models_dir and getattr(existing, "WJ_BENCH_STUB", False):
+            existing.models_dir = models_dir
+        return existing
+
+    module = types.ModuleType("folder_paths")
+    module.WJ_BENCH_STUB = True
+    module.models_dir = models_dir or os.path.join(tempfile.gettempdir(), "wj_bench_models")
+    module.user_dir = tempfile.mkdtemp(prefix="wj_bench_user_")
+
+    def get_folder_paths(folder_name: str) -> list:
+        return [os.path.join(module.models_dir, folder_name)]
+
+    def get_user_directory() -> str:
+        return module.user_dir
+
+    module.get_folder_paths = get_folder_paths
+    module.get_user_directory = get_user_directory
+    sys.modules["folder_paths"] = module
+    return module
@@ -0,0 +1,62 @@
+"""
+Pico de memoria de un subproceso de benchmark.
+
+``ru_maxrss`` se hereda a través de fork+exec: un hijo lanzado por un padre
+que ya creó un fixture grande empieza con el pico del padre y cualquier
+"delta" sale ~0. En Linux se usa ``VmHWM`` de /proc/self/status, que es del
+proceso actual (exec lo reinicia), y ``reset()`` lo vuelve a poner al RSS
+actual escribiendo en /proc/self/clear_refs. Fuera de Linux se cae a
+``ru_maxrss`` (y ``reset()`` no puede reiniciarlo).
+
+Uso en el hijo, después de los imports y antes de la parte medida:
+
+    base = peak_memory.reset()
+    ...
+    peak_mb = peak_memory.peak_mb() - base
+"""
+
+import resource
+import sys
+
+_STATUS = "/proc/self/status"
+
+
+def _status_mb(field: str):
+    try:
+        with open(_STATUS, "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024  # kB
+    except OSError:
+        pass
+    return None
+
+
+def current_mb() -> float:
+    """RSS actual (MB); con ``ru_maxrss`` como aproximación fuera de Linux."""
+    rss = _status_mb("VmRSS")
+    return rss if rss is not None else peak_mb()
+
+
+def peak_mb() -> float:
+    """Pico de RSS del proceso actual (MB)."""
+    hwm = _status_mb("VmHWM")
+    if hwm is not None:
+        return hwm
+    # ru_maxrss: KB en Linux, bytes en macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+def reset() -> float:
+    """
+    Reinicia el pico al RSS actual si el sistema lo permite y devuelve la
+    base sobre la que medir (RSS actual, o el pico actual si no se pudo
+    reiniciar).
+    """
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+    except OSError:
+        return peak_mb()
+    return current_mb()
@@ -1,4 +1,37 @@
-from .get_last_frame import NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS
+# Nodos de selección de frames (IMAGE, FRAME_SEQUENCE, LATENT y buffer circular)
+# Las clases se importan al primer uso: importar el paquete no carga torch.
 
-__all__ = ["NODE_CLASS_MAPPINGS", "NODE_DISPLAY_NAME_MAPPINGS"]
-print("[ComfyDeploy] ✅ get_last_frame importado correctamente")
+import importlib
+
+# nodo -> (submódulo, nombre para mostrar)
+NODES = {
+    "GetLastFrame": ("get_last_frame", "Get Last Frame"),
+    "GetFrameByIndex": ("get_last_frame", "Get Frame by Index"),
+    "GetFramesByIndices": ("get_last_frame", "Get Frames by Indices"),
+    "GetLastLatentFrame": ("get_last_frame", "Get Last Latent Frame"),
+    "GetLatentFrameByIndex": ("get_last_frame", "Get Latent Frame by Index"),
+    "ImageToFrameSequence": ("frame_sequence", "Image to Frame Sequence"),
+    "LoadFrameSequence": ("frame_sequence", "Load Frame Sequence"),
+    "FrameSequenceToImage": ("frame_sequence", "Frame Sequence to Image"),
+    "FrameRingBufferPush": ("frame_ring_buffer", "Frame Ring Buffer (Push)"),
+    "FrameRingBufferGet": ("frame_ring_buffer", "Frame Ring Buffer (Get)"),
+}
+
+
+def __getattr__(name):
+    # NODE_CLASS_MAPPINGS / NODE_DISPLAY_NAME_MAPPINGS con las clases reales,
+    # para quien importe el paquete suelto (el paquete raíz usa proxies)
+    if name == "NODE_CLASS_MAPPINGS":
+        value = {
+            node: getattr(importlib.import_module(f".{module}", __name__), node)
+            for node, (module, _) in NODES.items()
+        }
+    elif name == "NODE_DISPLAY_NAME_MAPPINGS":
+        value = {node: display for node, (_, display) in NODES.items()}
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+__all__ = ["NODES", "NODE_CLASS_MAPPINGS", "NODE_DISPLAY_NAME_MAPPINGS"]
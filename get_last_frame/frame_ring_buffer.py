@@ -0,0 +1,220 @@
+# frame_ring_buffer.py
+# Buffer circular de frames entre ejecuciones para ComfyUI
+# En pipelines de vídeo largo el mismo grafo se ejecuta una vez por tramo y los
+# últimos frames del tramo N alimentan el tramo N+1. El buffer guarda los
+# últimos K frames en un único tensor reservado una vez: cada ejecución escribe
+# en su sitio (copy_). Los nodos Push y Get entregan una copia de los ``take``
+# frames más recientes: una vista del buffer cambiaría con el siguiente Push.
+
+import threading
+
+import torch
+
+
+class FrameRingBuffer:
+    """
+    Últimos ``capacity`` frames [H, W, C] en un tensor de 2*capacity frames.
+
+    Cada frame se escribe en la posición ``p`` y en su espejo ``p + capacity``,
+    de modo que los ``n`` frames más recientes siempre forman un rango
+    contiguo del tensor y se pueden devolver como vista (sin copia ni
+    reordenación), en orden cronológico.
+
+    IMPORTANTE: las vistas apuntan al buffer. Son válidas hasta la siguiente
+    escritura; quien necesite conservarlas más allá debe hacer ``clone()``.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = max(1, int(capacity))
+        self.data = None
+        self.pos = 0        # siguiente posición de escritura en [0, capacity)
+        self.count = 0      # frames válidos (<= capacity)
+        self.version = 0    # escrituras realizadas (para IS_CHANGED)
+        self._lock = threading.Lock()
+
+    def _compatible(self, frames):
+        data = self.data
+        return (data is not None and data.shape[1:] == frames.shape[1:]
+                and data.dtype == frames.dtype and data.device == frames.device)
+
+    def reset(self, capacity=None):
+        """Vacía el buffer (y libera el tensor si cambia la capacidad)."""
+        with self._lock:
+            if capacity is not None and max(1, int(capacity)) != self.capacity:
+                self.capacity = max(1, int(capacity))
+                self.data = None
+            self.pos = 0
+            self.count = 0
+            self.version += 1
+
+    def push(self, frames):
+        """Añade los frames [N, H, W, C] escribiendo en el tensor reservado."""
+        capacity = self.capacity
+        with self._lock:
+            if not self._compatible(frames):
+                # Primera escritura o cambio de resolución/dtype/dispositivo
+                self.data = torch.empty((2 * capacity,) + tuple(frames.shape[1:]),
+                                        dtype=frames.dtype, device=frames.device)
+                self.pos = 0
+                self.count = 0
+
+            n = frames.shape[0]
+            if n > capacity:
+                frames = frames[-capacity:]
+                n = capacity
+            pos = self.pos
+            first = min(n, capacity - pos)
+            self.data[pos:pos + first].copy_(frames[:first])
+            self.data[pos + capacity:pos + capacity + first].copy_(frames[:first])
+            rest = n - first
+            if rest:
+                self.data[:rest].copy_(frames[first:])
+                self.data[capacity:capacity + rest].copy_(frames[first:])
+
+            self.pos = (pos + n) % capacity
+            self.count = min(capacity, self.count + n)
+            self.version += 1
+
+    def recent(self, n):
+        """Vista [min(n, count), H, W, C] de los frames más recientes (None si vacío)."""
+        with self._lock:
+            n = min(max(1, int(n)), self.count)
+            if n == 0:
+                return None
+            end = self.pos + self.capacity
+            return self.data[end - n:end]
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        shape = None if self.data is None else tuple(self.data.shape[1:])
+        return f"FrameRingBuffer(capacity={self.capacity}, count={self.count}, frame={shape})"
+
+
+# Buffers globales por nombre (persisten entre ejecuciones del grafo)
+_buffers = {}
+_buffers_lock = threading.Lock()
+
+
+def get_ring_buffer(name, capacity=None):
+    """
+    Obtiene el buffer ``name`` (se crea la primera vez). Si se pasa una
+    ``capacity`` distinta de la actual, el buffer se vacía y se redimensiona.
+    """
+    with _buffers_lock:
+        buffer = _buffers.get(name)
+        if buffer is None:
+            buffer = _buffers[name] = FrameRingBuffer(capacity or 1)
+            return buffer
+    if capacity is not None and max(1, int(capacity)) != buffer.capacity:
+        buffer.reset(capacity)
+    return buffer
+
+
+def clear_ring_buffers():
+    """Elimina todos los buffers (libera su memoria)."""
+    with _buffers_lock:
+        _buffers.clear()
+
+
+# ============================================================================
+# NODOS
+# ============================================================================
+
+class FrameRingBufferPush:
+    """
+    Escribe frames en un buffer circular con nombre que persiste entre
+    ejecuciones y devuelve una copia de los más recientes.
+
+    No es una vista: ComfyUI guarda las salidas de los nodos en su caché y
+    los consumidores pueden ejecutarse después de otro Push al mismo buffer
+    (en esta ejecución o en la siguiente), que sobrescribiría esos frames.
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "frames": ("IMAGE",),
+                "buffer_name": ("STRING", {"default": "video"}),
+                "capacity": ("INT", {"default": 8, "min": 1, "max": 4096}),
+                "take": ("INT", {
+                    "default": 1, "min": 1, "max": 4096,
+                    "tooltip": "Frames más recientes a devolver"
+                }),
+            },
+            "optional": {
+                "reset": ("BOOLEAN", {"default": False}),
+            }
+        }
+
+    RETURN_TYPES = ("IMAGE", "INT")
+    RETURN_NAMES = ("recent", "count")
+    FUNCTION = "push"
+    CATEGORY = "🧩 Utility"
+
+    def push(self, frames, buffer_name, capacity, take, reset=False):
+        if frames is None or len(frames) == 0:
+            raise ValueError("El input 'frames' está vacío.")
+        buffer = get_ring_buffer(buffer_name, capacity)
+        if reset:
+            buffer.reset()
+        buffer.push(frames)
+        return (buffer.recent(take).clone(), len(buffer))
+
+
+class FrameRingBufferGet:
+    """
+    Lee (copia) los frames más recientes de un buffer circular, p.ej. los
+    últimos frames del tramo anterior para continuar el vídeo. Si el buffer
+    está vacío devuelve ``fallback``.
+
+    Como la salida de Push, no es una vista: un Push posterior en la misma
+    ejecución sobrescribiría esos frames, y ComfyUI no ordena a los demás
+    consumidores de este nodo respecto a ese Push. Copiar ``take`` frames es
+    barato.
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "buffer_name": ("STRING", {"default": "video"}),
+                "take": ("INT", {"default": 1, "min": 1, "max": 4096}),
+            },
+            "optional": {
+                "fallback": ("IMAGE",),
+            }
+        }
+
+    RETURN_TYPES = ("IMAGE", "INT")
+    RETURN_NAMES = ("recent", "count")
+    FUNCTION = "get"
+    CATEGORY = "🧩 Utility"
+
+    @classmethod
+    def IS_CHANGED(cls, buffer_name, take, fallback=None):
+        # Reejecutar cuando el buffer ha recibido escrituras
+        buffer = _buffers.get(buffer_name)
+        return (buffer.version, buffer.count) if buffer is not None else None
+
+    def get(self, buffer_name, take, fallback=None):
+        buffer = _buffers.get(buffer_name)
+        recent = buffer.recent(take) if buffer is not None else None
+        if recent is None:
+            if fallback is None:
+                raise ValueError(f"El buffer '{buffer_name}' está vacío y no hay 'fallback'.")
+            return (fallback, 0)
+        return (recent.clone(), recent.shape[0])
+
+
+NODE_CLASS_MAPPINGS = {
+    "FrameRingBufferPush": FrameRingBufferPush,
+    "FrameRingBufferGet": FrameRingBufferGet,
+}
+
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "FrameRingBufferPush": "Frame Ring Buffer (Push)",
+    "FrameRingBufferGet": "Frame Ring Buffer (Get)",
+}
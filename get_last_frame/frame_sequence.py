@@ -0,0 +1,283 @@
+# frame_sequence.py
+# Secuencias de frames en disco (FRAME_SEQUENCE) para ComfyUI
+# Un vídeo largo no tiene que estar decodificado entero en RAM: los frames viven
+# en un .npy mapeado en memoria y solo se leen los que se piden.
+# Los .npy que se crean en la carpeta temporal (sin ruta explícita) se rotan:
+# solo se conservan los KEEP_TEMP_SEQUENCES más recientes.
+
+import glob
+import os
+import time
+import uuid
+
+import numpy as np
+import torch
+
+from .get_last_frame import parse_index_spec
+
+# Tipo de ComfyUI para conectar nodos
+FRAME_SEQUENCE = "FRAME_SEQUENCE"
+
+# dtypes de almacenamiento admitidos (uint8 se guarda como 0..255)
+STORAGE_DTYPES = ("float16", "uint8", "float32")
+DEFAULT_CHUNK = 64
+
+# Secuencias temporales que se conservan en disco (las más recientes)
+KEEP_TEMP_SEQUENCES = 8
+TEMP_PATTERN = "frames_*.npy"
+
+
+def _default_directory():
+    """Carpeta temporal de ComfyUI si existe, si no la del sistema."""
+    try:
+        import folder_paths
+        return os.path.join(folder_paths.get_temp_directory(), "frame_sequences")
+    except (ImportError, AttributeError):
+        import tempfile
+        return os.path.join(tempfile.gettempdir(), "frame_sequences")
+
+
+def _prune_directory(directory, keep):
+    """
+    Borra los .npy temporales más antiguos de ``directory`` dejando ``keep``.
+    Una secuencia ya abierta sigue leyendo su mapeo aunque se borre el
+    archivo; si el sistema no deja borrarlo (Windows con el archivo mapeado)
+    se salta y se reintenta en la próxima escritura.
+    """
+    paths = glob.glob(os.path.join(directory, TEMP_PATTERN))
+    if len(paths) <= keep:
+        return
+
+    def mtime(path):
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return 0.0
+    for path in sorted(paths, key=mtime)[:len(paths) - keep]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class FrameSequence:
+    """
+    Secuencia de frames [N, H, W, C] respaldada por un .npy en disco.
+
+    El archivo se abre con np.load(mmap_mode="r"): leer un frame solo trae
+    del disco las páginas de ese frame, así que el pico de memoria al elegir
+    unos pocos frames no depende de la longitud del clip.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._array = None
+        # Validar y leer el shape sin mapear los datos
+        array = self.array
+        if array.ndim != 4:
+            raise ValueError(f"FRAME_SEQUENCE espera [N, H, W, C], el archivo tiene shape {array.shape}")
+        if array.dtype.name not in STORAGE_DTYPES:
+            raise ValueError(f"dtype no soportado en {path}: {array.dtype}")
+
+    @property
+    def array(self):
+        if self._array is None:
+            self._array = np.load(self.path, mmap_mode="r")
+        return self._array
+
+    @property
+    def shape(self):
+        return tuple(self.array.shape)
+
+    def __len__(self):
+        return self.array.shape[0]
+
+    def __repr__(self):
+        return f"FrameSequence({self.path!r}, shape={self.shape}, dtype={self.array.dtype})"
+
+    def __getstate__(self):
+        # El memmap no se serializa; se reabre al usarlo
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.path = state["path"]
+        self._array = None
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+    def _to_image(self, data):
+        """Array numpy leído del disco -> tensor IMAGE float32 en [0, 1]."""
+        tensor = torch.from_numpy(np.ascontiguousarray(data))
+        if tensor.dtype == torch.uint8:
+            return tensor.float().div_(255.0)
+        return tensor.float()
+
+    def get_frames(self, indices):
+        """Lee solo los frames indicados (lista de enteros ya normalizados)."""
+        return self._to_image(self.array[np.asarray(indices, dtype=np.int64)])
+
+    def indices(self, spec):
+        """Índices (np.int64) de una especificación (ver parse_index_spec)."""
+        parts = parse_index_spec(spec, len(self))
+        pieces = [
+            np.arange(p.start, p.stop, p.step) if isinstance(p, slice) else np.array([p])
+            for p in parts
+        ]
+        indices = np.concatenate(pieces).astype(np.int64) if pieces else np.empty(0, dtype=np.int64)
+        if indices.size == 0:
+            raise ValueError(f"La selección '{spec}' no contiene ningún frame (total: {len(self)}).")
+        return indices
+
+    def select(self, spec):
+        """Lee solo los frames de una especificación de índices."""
+        return self.get_frames(self.indices(spec))
+
+    def to_image(self, spec=":", chunk_size=DEFAULT_CHUNK):
+        """
+        Convierte (parte de) la secuencia en un IMAGE normal, leyendo por
+        bloques de ``chunk_size`` frames sobre un tensor ya reservado.
+        """
+        indices = self.indices(spec)
+        out = torch.empty((indices.size,) + self.shape[1:], dtype=torch.float32)
+        chunk_size = max(1, int(chunk_size))
+        for start in range(0, indices.size, chunk_size):
+            chunk = indices[start:start + chunk_size]
+            out[start:start + chunk.size] = self.get_frames(chunk)
+        return out
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_image(cls, images, path=None, storage_dtype="float16", chunk_size=DEFAULT_CHUNK):
+        """
+        Escribe un IMAGE [N, H, W, C] a un .npy por bloques y lo abre mapeado.
+        Sin ``path`` se usa la carpeta temporal y se borran las secuencias
+        temporales más antiguas (ver KEEP_TEMP_SEQUENCES).
+        """
+        if storage_dtype not in STORAGE_DTYPES:
+            raise ValueError(f"storage_dtype debe ser uno de {STORAGE_DTYPES}")
+        if path is None:
+            directory = _default_directory()
+            os.makedirs(directory, exist_ok=True)
+            # Se deja sitio para la nueva antes de escribirla
+            _prune_directory(directory, max(0, KEEP_TEMP_SEQUENCES - 1))
+            path = os.path.join(directory, f"frames_{int(time.time())}_{uuid.uuid4().hex[:8]}.npy")
+
+        array = np.lib.format.open_memmap(path, mode="w+", dtype=storage_dtype, shape=tuple(images.shape))
+        chunk_size = max(1, int(chunk_size))
+        for start in range(0, images.shape[0], chunk_size):
+            chunk = images[start:start + chunk_size].detach().cpu()
+            if storage_dtype == "uint8":
+                chunk = chunk.clamp(0, 1).mul(255.0).round_().to(torch.uint8)
+            else:
+                chunk = chunk.to(getattr(torch, storage_dtype))
+            array[start:start + chunk.shape[0]] = chunk.numpy()
+        array.flush()
+        del array
+        return cls(path)
+
+
+# ============================================================================
+# NODOS
+# ============================================================================
+
+class ImageToFrameSequence:
+    """
+    Guarda un IMAGE como FRAME_SEQUENCE en disco (por bloques) para que los
+    nodos siguientes lean solo los frames que necesiten.
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "frames": ("IMAGE",),
+                "storage_dtype": (list(STORAGE_DTYPES), {"default": "float16"}),
+                "chunk_size": ("INT", {"default": DEFAULT_CHUNK, "min": 1, "max": 4096}),
+            },
+            "optional": {
+                "path": ("STRING", {
+                    "default": "",
+                    "tooltip": "Archivo .npy de destino (vacío = carpeta temporal de ComfyUI)"
+                }),
+            }
+        }
+
+    RETURN_TYPES = (FRAME_SEQUENCE,)
+    RETURN_NAMES = ("sequence",)
+    FUNCTION = "convert"
+    CATEGORY = "🧩 Utility"
+
+    def convert(self, frames, storage_dtype="float16", chunk_size=DEFAULT_CHUNK, path=""):
+        if frames is None or len(frames) == 0:
+            raise ValueError("El input 'frames' está vacío.")
+        return (FrameSequence.from_image(frames, path or None, storage_dtype, chunk_size),)
+
+
+class LoadFrameSequence:
+    """
+    Abre un .npy [N, H, W, C] (escrito por otro nodo o script) como
+    FRAME_SEQUENCE, sin leer los frames.
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "path": ("STRING", {"default": ""}),
+            }
+        }
+
+    RETURN_TYPES = (FRAME_SEQUENCE, "INT")
+    RETURN_NAMES = ("sequence", "frame_count")
+    FUNCTION = "load"
+    CATEGORY = "🧩 Utility"
+
+    def load(self, path):
+        if not path or not os.path.isfile(path):
+            raise ValueError(f"No existe el archivo de frames: '{path}'")
+        sequence = FrameSequence(path)
+        return (sequence, len(sequence))
+
+
+class FrameSequenceToImage:
+    """
+    Convierte una FRAME_SEQUENCE (o los frames seleccionados) en un IMAGE
+    normal, leyendo por bloques.
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "sequence": (FRAME_SEQUENCE,),
+                "indices": ("STRING", {
+                    "default": ":",
+                    "tooltip": "Frames a convertir (mismo formato que Get Frames by Indices)"
+                }),
+                "chunk_size": ("INT", {"default": DEFAULT_CHUNK, "min": 1, "max": 4096}),
+            }
+        }
+
+    RETURN_TYPES = ("IMAGE",)
+    RETURN_NAMES = ("images",)
+    FUNCTION = "convert"
+    CATEGORY = "🧩 Utility"
+
+    def convert(self, sequence, indices=":", chunk_size=DEFAULT_CHUNK):
+        return (sequence.to_image(indices, chunk_size),)
+
+
+NODE_CLASS_MAPPINGS = {
+    "ImageToFrameSequence": ImageToFrameSequence,
+    "LoadFrameSequence": LoadFrameSequence,
+    "FrameSequenceToImage": FrameSequenceToImage,
+}
+
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "ImageToFrameSequence": "Image to Frame Sequence",
+    "LoadFrameSequence": "Load Frame Sequence",
+    "FrameSequenceToImage": "Frame Sequence to Image",
+}
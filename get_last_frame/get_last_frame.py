@@ -1,6 +1,162 @@
 # get_last_frame.py
 # Nodo personalizado para ComfyUI
-# Extrae el último frame (o cualquier frame por índice) de una secuencia de imágenes
+# Extrae el último frame (o cualquier frame por índice) de una secuencia de imágenes o de latents
+
+import re
+
+import torch
+
+
+# ============================================================================
+# ESPECIFICACIÓN DE ÍNDICES
+# ============================================================================
+# Lista separada por comas de:
+#   5, -1         índices sueltos (negativos desde el final, fuera de rango se recortan)
+#   10:20, ::-1   slices estilo Python start:stop[:step]
+#   every 4       cada N frames (= ::4)
+#   first 8       los primeros K (= :8)
+#   last 8        los últimos K (= -8:)
+
+_WORD_SPEC = re.compile(r"^(every|first|last)\s+(-?\d+)$")
+
+
+def parse_index_spec(spec, total):
+    """
+    Convierte una especificación de índices en partes: int (ya recortado a
+    [0, total-1]) o slice (ya normalizado con slice.indices(total)).
+    """
+    parts = []
+    for raw in str(spec).replace(";", ",").split(","):
+        item = raw.strip().lower()
+        if not item:
+            continue
+        word = _WORD_SPEC.match(item)
+        if word:
+            kind, n = word.group(1), int(word.group(2))
+            if n <= 0:
+                raise ValueError(f"'{raw.strip()}': N debe ser mayor que 0")
+            if kind == "every":
+                part = slice(None, None, n)
+            elif kind == "first":
+                part = slice(None, n)
+            else:
+                part = slice(-n, None)
+            parts.append(slice(*part.indices(total)))
+        elif ":" in item:
+            fields = item.split(":")
+            if len(fields) > 3:
+                raise ValueError(f"Slice no válido: '{raw.strip()}'")
+            try:
+                values = [int(f) if f.strip() else None for f in fields]
+            except ValueError:
+                raise ValueError(f"Slice no válido: '{raw.strip()}'") from None
+            if len(values) == 3 and values[2] == 0:
+                raise ValueError(f"'{raw.strip()}': el paso no puede ser 0")
+            parts.append(slice(*slice(*values).indices(total)))
+        else:
+            try:
+                index = int(item)
+            except ValueError:
+                raise ValueError(f"Índice no válido: '{raw.strip()}'") from None
+            if index < 0:
+                index += total
+            parts.append(min(max(index, 0), total - 1))
+    return parts
+
+
+def select_frames(frames, spec):
+    """
+    Selecciona los frames de ``spec`` con un único index_select. Si la
+    selección es un rango contiguo ascendente devuelve una vista (sin copia).
+    """
+    total = frames.shape[0]
+    parts = parse_index_spec(spec, total)
+    device = frames.device
+
+    # Vista directa para un único slice contiguo
+    if len(parts) == 1 and isinstance(parts[0], slice) and parts[0].step == 1:
+        start, stop = parts[0].start, parts[0].stop
+        if stop > start:
+            return frames[start:stop]
+
+    pieces = []
+    for part in parts:
+        if isinstance(part, slice):
+            pieces.append(torch.arange(part.start, part.stop, part.step, device=device))
+        else:
+            pieces.append(torch.tensor([part], device=device))
+    indices = torch.cat(pieces) if pieces else torch.empty(0, dtype=torch.long, device=device)
+    if indices.numel() == 0:
+        raise ValueError(f"La selección '{spec}' no contiene ningún frame (total: {total}).")
+
+    # Índices sueltos que forman un rango contiguo: también vista
+    first = int(indices[0])
+    if bool((indices == torch.arange(first, first + indices.numel(), device=device)).all()):
+        return frames[first:first + indices.numel()]
+    return frames.index_select(0, indices)
+
+
+# ============================================================================
+# RETENCIÓN DEL BATCH ORIGINAL
+# ============================================================================
+# Un slice es una vista: mientras el frame siga referenciado aguas abajo
+# (p.ej. guardado por SetNode en QwenCache) mantiene viva la memoria de todo
+# el vídeo. Política de retención de los nodos:
+#   view      devolver siempre la vista (sin copia)
+#   compact   copiar siempre los frames seleccionados a un tensor propio
+#   auto      copiar solo si el batch original es grande frente a la selección
+
+RETENTION_MODES = ("auto", "view", "compact")
+# auto: copiar si el almacenamiento original es al menos N veces la selección...
+AUTO_COMPACT_RATIO = 4
+# ...y retenerlo desperdiciaría al menos estos bytes (copias baratas no compensan)
+AUTO_COMPACT_MIN_BYTES = 8 * 1024 * 1024
+
+
+def retain_frames(selected, mode="auto"):
+    """
+    Aplica la política de retención a ``selected`` (resultado de seleccionar
+    frames). Si no comparte almacenamiento con un tensor mayor no hace nada.
+    """
+    if mode not in RETENTION_MODES:
+        raise ValueError(f"retention debe ser uno de {RETENTION_MODES}")
+    if mode == "view":
+        return selected
+
+    selected_bytes = selected.numel() * selected.element_size()
+    storage_bytes = selected.untyped_storage().nbytes()
+    if storage_bytes <= selected_bytes:
+        return selected  # ya es compacto (p.ej. resultado de index_select)
+    if mode == "auto" and (storage_bytes < AUTO_COMPACT_RATIO * selected_bytes
+                           or storage_bytes - selected_bytes < AUTO_COMPACT_MIN_BYTES):
+        return selected
+    return selected.clone(memory_format=torch.contiguous_format)
+
+
+_RETENTION_INPUT = (list(RETENTION_MODES), {
+    "default": "auto",
+    "tooltip": "view: vista sin copia (retiene todo el batch); compact: copia solo "
+               "los frames elegidos; auto: copia si el batch es grande"
+})
+
+
+# Origen alternativo de los nodos de frames: ``frames`` sigue siendo obligatorio
+_SEQUENCE_INPUT = ("FRAME_SEQUENCE", {
+    "tooltip": "Frames en disco (Image to Frame Sequence). Si se conecta, se leen "
+               "de aquí solo los frames elegidos y 'frames' se ignora"
+})
+
+
+def _frame_source(frames, sequence):
+    """
+    Origen de frames de un nodo: ``sequence`` (FRAME_SEQUENCE en disco, ver
+    frame_sequence.py) tiene prioridad sobre ``frames`` (IMAGE).
+    """
+    source = sequence if sequence is not None else frames
+    if source is None or len(source) == 0:
+        raise ValueError("El input 'frames' está vacío.")
+    return source
+
 
 class GetLastFrame:
     """
@@ -13,6 +169,10 @@ class GetLastFrame:
         return {
             "required": {
                 "frames": ("IMAGE",),
+            },
+            "optional": {
+                "sequence": _SEQUENCE_INPUT,
+                "retention": _RETENTION_INPUT,
             }
         }
 
@@ -21,14 +181,18 @@ class GetLastFrame:
     FUNCTION = "get_last_frame"
     CATEGORY = "🧩 Utility"
 
-    def get_last_frame(self, frames):
+    def get_last_frame(self, frames, sequence=None, retention="auto"):
+        if sequence is not None:
+            # Solo se lee del disco el último frame
+            sequence = _frame_source(frames, sequence)
+            return (sequence.get_frames([len(sequence) - 1]),)
         if frames is None or len(frames) == 0:
             raise ValueError("El input 'frames' está vacío. No se puede seleccionar el último elemento.")
         
         # frames es un tensor de shape [batch, height, width, channels]
         # Seleccionamos el último frame y mantenemos las dimensiones
         last_frame = frames[-1:, :, :, :]
-        return (last_frame,)
+        return (retain_frames(last_frame, retention),)
 
 
 class GetFrameByIndex:
@@ -49,6 +213,10 @@ class GetFrameByIndex:
                     "step": 1,
                     "display": "number"
                 }),
+            },
+            "optional": {
+                "sequence": _SEQUENCE_INPUT,
+                "retention": _RETENTION_INPUT,
             }
         }
 
@@ -57,9 +225,8 @@ class GetFrameByIndex:
     FUNCTION = "get_frame_by_index"
     CATEGORY = "🧩 Utility"
 
-    def get_frame_by_index(self, frames, index):
-        if frames is None or len(frames) == 0:
-            raise ValueError("El input 'frames' está vacío.")
+    def get_frame_by_index(self, frames, index, sequence=None, retention="auto"):
+        frames = _frame_source(frames, sequence)
         
         total_frames = len(frames)
         
@@ -69,18 +236,171 @@ class GetFrameByIndex:
         elif index < -total_frames:
             index = 0  # primer frame
         
+        if sequence is not None:
+            # Solo se lee del disco el frame pedido
+            return (frames.get_frames([index % total_frames]),)
+
         # Seleccionar frame manteniendo dimensiones [1, H, W, C]
         selected_frame = frames[index:index+1, :, :, :] if index >= 0 else frames[index:, :, :, :][:1]
-        return (selected_frame,)
+        return (retain_frames(selected_frame, retention),)
+
+
+class GetFramesByIndices:
+    """
+    Selecciona varios frames en un solo nodo: lista de índices, slices,
+    negativos, "every N", "first K", "last K" (ver parse_index_spec).
+    Un único index_select; si la selección es contigua, vista sin copia
+    (sujeta a la política ``retention``).
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "frames": ("IMAGE",),
+                "indices": ("STRING", {
+                    "default": "-1",
+                    "multiline": False,
+                    "tooltip": "Ej: 0, 10:20, ::-1, every 4, first 8, last 8, -1"
+                }),
+            },
+            "optional": {
+                "sequence": _SEQUENCE_INPUT,
+                "retention": _RETENTION_INPUT,
+            }
+        }
+
+    RETURN_TYPES = ("IMAGE", "INT")
+    RETURN_NAMES = ("images", "count")
+    FUNCTION = "get_frames"
+    CATEGORY = "🧩 Utility"
+
+    def get_frames(self, frames, indices, sequence=None, retention="auto"):
+        source = _frame_source(frames, sequence)
+        if sequence is not None:
+            selected = source.select(indices)
+        else:
+            selected = retain_frames(select_frames(source, indices), retention)
+        return (selected, selected.shape[0])
+
+
+# ============================================================================
+# LATENTS
+# ============================================================================
+# Elegir un frame en el LATENT evita decodificar con el VAE el vídeo entero
+# para quedarse con un frame: solo se decodifica el elegido.
+#   4D [B, C, H, W]      los frames son el batch (AnimateDiff y similares)
+#   5D [B, C, T, H, W]   vídeo con eje temporal (T), el batch se conserva
+# En VAEs con compresión temporal (Wan, Hunyuan...) un frame latente equivale
+# a varios frames de imagen (salvo el primero).
+
+def latent_frame_axis(samples):
+    """Eje de frames de un tensor de latents: T en 5D, batch en 4D."""
+    return 2 if samples.dim() == 5 else 0
+
+
+def select_latent_frame(latent, index, retention="auto"):
+    """
+    Devuelve un LATENT con solo el frame ``index`` (negativos desde el final,
+    fuera de rango se recortan). ``noise_mask`` y ``batch_index`` se recortan
+    igual cuando recorren el mismo eje; el resto de claves se conservan.
+    """
+    samples = latent["samples"]
+    axis = latent_frame_axis(samples)
+    total = samples.shape[axis]
+    if total == 0:
+        raise ValueError("El LATENT no contiene ningún frame.")
+    if index < 0:
+        index += total
+    index = min(max(index, 0), total - 1)
+
+    out = dict(latent)
+    out["samples"] = retain_frames(samples.narrow(axis, index, 1), retention)
+
+    # noise_mask: solo si tiene un frame por frame latente (si no, es broadcast)
+    mask = latent.get("noise_mask")
+    if mask is not None and total > 1 and mask.dim() > axis and mask.shape[axis] == total:
+        if axis == 0 or mask.dim() == samples.dim():
+            out["noise_mask"] = retain_frames(mask.narrow(axis, index, 1), retention)
+
+    # batch_index: una entrada por elemento del batch (solo en 4D el batch cambia)
+    batch_index = latent.get("batch_index")
+    if axis == 0 and batch_index is not None and len(batch_index) == total:
+        out["batch_index"] = [batch_index[index]]
+    return out
+
+
+class GetLastLatentFrame:
+    """
+    Versión LATENT de GetLastFrame: devuelve el último frame sin decodificar
+    el vídeo (4D: último del batch; 5D: último en el eje temporal).
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "latent": ("LATENT",),
+            },
+            "optional": {
+                "retention": _RETENTION_INPUT,
+            }
+        }
+
+    RETURN_TYPES = ("LATENT",)
+    RETURN_NAMES = ("latent",)
+    FUNCTION = "get_last_frame"
+    CATEGORY = "🧩 Utility"
+
+    def get_last_frame(self, latent, retention="auto"):
+        return (select_latent_frame(latent, -1, retention),)
+
+
+class GetLatentFrameByIndex:
+    """
+    Versión LATENT de GetFrameByIndex. Índice -1 = último frame, 0 = primero.
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "latent": ("LATENT",),
+                "index": ("INT", {
+                    "default": -1,
+                    "min": -9999,
+                    "max": 9999,
+                    "step": 1,
+                    "display": "number"
+                }),
+            },
+            "optional": {
+                "retention": _RETENTION_INPUT,
+            }
+        }
+
+    RETURN_TYPES = ("LATENT",)
+    RETURN_NAMES = ("latent",)
+    FUNCTION = "get_frame_by_index"
+    CATEGORY = "🧩 Utility"
+
+    def get_frame_by_index(self, latent, index, retention="auto"):
+        return (select_latent_frame(latent, index, retention),)
 
 
 # Registro de nodos para ComfyUI
 NODE_CLASS_MAPPINGS = {
     "GetLastFrame": GetLastFrame,
     "GetFrameByIndex": GetFrameByIndex,
+    "GetFramesByIndices": GetFramesByIndices,
+    "GetLastLatentFrame": GetLastLatentFrame,
+    "GetLatentFrameByIndex": GetLatentFrameByIndex,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
     "GetLastFrame": "Get Last Frame",
     "GetFrameByIndex": "Get Frame by Index",
+    "GetFramesByIndices": "Get Frames by Indices",
+    "GetLastLatentFrame": "Get Last Latent Frame",
+    "GetLatentFrameByIndex": "Get Latent Frame by Index",
 }
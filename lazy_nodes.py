@@ -0,0 +1,51 @@
+# Lazy node registration for COMFYUI_PROMPTMODELS
+# ComfyUI only needs NODE_CLASS_MAPPINGS at startup. Each node is registered as
+# a proxy class that imports its real module on first attribute access
+# (INPUT_TYPES, RETURN_TYPES, ...) or instantiation and delegates from then on,
+# so importing this package does not pull in torch or the prompt-model stack.
+#
+# The implementation lives in ComfyUI_WJSetGetPlus/lazy_nodes.py (that pack is
+# also installed on its own, so it must carry it). This module loads that file
+# directly, without importing the ComfyUI_WJSetGetPlus package (which would
+# register its nodes and prefetch hooks a second time). If the pack was
+# removed from the tree, nodes are registered eagerly instead.
+
+import importlib
+import importlib.util
+import os
+import sys
+
+_IMPL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ComfyUI_WJSetGetPlus", "lazy_nodes.py")
+
+
+def _load_impl():
+    name = f"{__name__}_impl"
+    module = sys.modules.get(name)
+    if module is None and os.path.exists(_IMPL_PATH):
+        spec = importlib.util.spec_from_file_location(name, _IMPL_PATH)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+_impl = _load_impl()
+
+if _impl is not None:
+    LazyNodeMeta = _impl.LazyNodeMeta
+    lazy_node = _impl.lazy_node
+    is_loaded = _impl.is_loaded
+    module_available = _impl.module_available
+    register_lazy_nodes = _impl.register_lazy_nodes
+else:
+    def register_lazy_nodes(nodes, class_mappings, display_mappings, package=None):
+        """Eager fallback: import each node's module now. Returns nodes that failed."""
+        missing = []
+        for node_name, (module, class_name, display_name) in nodes.items():
+            try:
+                class_mappings[node_name] = getattr(importlib.import_module(module, package), class_name)
+            except (ImportError, AttributeError):
+                missing.append(node_name)
+                continue
+            display_mappings[node_name] = display_name
+        return missing
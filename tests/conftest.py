@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+# Los paquetes de nodos se importan desde la raíz del repositorio
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def cache():
+    """QwenCache (singleton) vacío y con la configuración por defecto."""
+    from ComfyUI_WJSetGetPlus.qwen_cache import QwenCache
+
+    def reset(cache):
+        for scope in list(cache._generations):
+            cache.end_generation(scope)
+        for name in list(cache._pinned):
+            cache.unpin(name)
+        cache.clear()
+        cache.configure(max_bytes=0, policy="lru", spill_dir="", max_generations=1,
+                        global_ttl=0, release_on_last_read=True, set_node_scope="global")
+
+    cache = QwenCache()
+    reset(cache)
+    yield cache
+    reset(cache)
@@ -0,0 +1,88 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from get_last_frame.get_last_frame import parse_index_spec, select_frames  # noqa: E402
+
+
+def _clip(n=10):
+    # Frame i lleno del valor i: el contenido identifica el índice
+    return torch.arange(n, dtype=torch.float32).view(n, 1, 1, 1).expand(n, 2, 2, 3).contiguous()
+
+
+def _indices(frames):
+    return [int(f[0, 0, 0]) for f in frames]
+
+
+# ----------------------------------------------------------------------
+# parse_index_spec
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize("spec, expected", [
+    ("0", [0]),
+    ("-1", [9]),
+    ("99", [9]),
+    ("-99", [0]),
+    ("1, 3 ,5", [1, 3, 5]),
+    ("1;3", [1, 3]),
+])
+def test_single_indices_are_clamped(spec, expected):
+    assert parse_index_spec(spec, 10) == expected
+
+
+@pytest.mark.parametrize("spec, expected", [
+    ("2:5", slice(2, 5, 1)),
+    ("::-1", slice(9, -1, -1)),
+    ("every 3", slice(0, 10, 3)),
+    ("first 4", slice(0, 4, 1)),
+    ("last 4", slice(6, 10, 1)),
+    ("FIRST 20", slice(0, 10, 1)),
+])
+def test_slices_and_words(spec, expected):
+    assert parse_index_spec(spec, 10) == [expected]
+
+
+def test_empty_items_are_ignored():
+    assert parse_index_spec(" , 2,, ", 10) == [2]
+
+
+@pytest.mark.parametrize("spec", ["abc", "1:2:3:4", "::0", "every 0", "last -2", "1:x"])
+def test_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        parse_index_spec(spec, 10)
+
+
+# ----------------------------------------------------------------------
+# select_frames
+# ----------------------------------------------------------------------
+def test_select_mixed_spec():
+    assert _indices(select_frames(_clip(), "0, -1, 2:4, every 5")) == [0, 9, 2, 3, 0, 5]
+
+
+def test_select_reversed():
+    assert _indices(select_frames(_clip(), "::-1")) == list(range(9, -1, -1))
+
+
+def test_contiguous_slice_is_a_view():
+    frames = _clip()
+    selected = select_frames(frames, "2:6")
+    assert _indices(selected) == [2, 3, 4, 5]
+    assert selected.data_ptr() == frames[2].data_ptr()
+
+
+def test_consecutive_indices_are_a_view():
+    frames = _clip()
+    selected = select_frames(frames, "3, 4, 5")
+    assert _indices(selected) == [3, 4, 5]
+    assert selected.data_ptr() == frames[3].data_ptr()
+
+
+def test_non_contiguous_selection_is_a_copy():
+    frames = _clip()
+    selected = select_frames(frames, "1, 5")
+    assert _indices(selected) == [1, 5]
+    assert selected.untyped_storage().data_ptr() != frames.untyped_storage().data_ptr()
+
+
+def test_empty_selection_raises():
+    with pytest.raises(ValueError):
+        select_frames(_clip(), "5:2")
@@ -0,0 +1,124 @@
+import json
+import struct
+
+import pytest
+
+from ComfyUI_WJSetGetPlus.lazy_state_dict import read_safetensors_header
+
+
+def _write_raw(path, tensors, metadata=None):
+    """safetensors escrito a mano: {nombre: (dtype, shape, bytes)}."""
+    header, data, offset = {}, b"", 0
+    for name, (dtype, shape, raw) in tensors.items():
+        header[name] = {"dtype": dtype, "shape": shape, "data_offsets": [offset, offset + len(raw)]}
+        data += raw
+        offset += len(raw)
+    if metadata:
+        header["__metadata__"] = metadata
+    encoded = json.dumps(header).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(struct.pack("<Q", len(encoded)) + encoded + data)
+
+
+def test_header_without_reading_data(tmp_path):
+    path = tmp_path / "model.safetensors"
+    _write_raw(path, {"w": ("F32", [2], b"\0" * 8), "b": ("U8", [3], b"\1\2\3")},
+               metadata={"format": "pt"})
+    header, metadata = read_safetensors_header(str(path))
+    assert metadata == {"format": "pt"}
+    assert set(header) == {"w", "b"}
+    assert header["b"]["data_offsets"] == [8, 11]
+
+
+def test_header_rejects_other_files(tmp_path):
+    path = tmp_path / "empty.safetensors"
+    path.write_bytes(b"abc")
+    with pytest.raises(ValueError):
+        read_safetensors_header(str(path))
+
+
+# ----------------------------------------------------------------------
+# Lectura (torch + safetensors)
+# ----------------------------------------------------------------------
+@pytest.fixture
+def model_file(tmp_path):
+    torch = pytest.importorskip("torch")
+    save_file = pytest.importorskip("safetensors.torch").save_file
+    tensors = {
+        "a.weight": torch.arange(12, dtype=torch.float32).reshape(3, 4),
+        "b.weight": torch.arange(6, dtype=torch.float16),
+        "c.bias": torch.tensor([1, 2, 3], dtype=torch.int64),
+    }
+    path = tmp_path / "model.safetensors"
+    save_file(tensors, str(path))
+    return str(path), tensors
+
+
+def test_lazy_dict_reads_on_access(model_file):
+    from ComfyUI_WJSetGetPlus.lazy_state_dict import LazySafetensorsDict
+
+    path, tensors = model_file
+    sd = LazySafetensorsDict(path)
+    assert list(sd) == list(tensors)
+    assert sd.reads == 0
+    assert sd.shape("a.weight") == (3, 4)
+    assert sd.dtype("b.weight") == "F16"
+    assert sd.nbytes() == sum(t.numel() * t.element_size() for t in tensors.values())
+    assert sd.reads == 0
+    assert sd["a.weight"].equal(tensors["a.weight"])
+    assert sd.reads == 1
+    assert "missing" not in sd
+    with pytest.raises(KeyError):
+        sd["missing"]
+
+
+def test_lazy_dict_lru(model_file):
+    from ComfyUI_WJSetGetPlus.lazy_state_dict import LazySafetensorsDict
+
+    path, tensors = model_file
+    sd = LazySafetensorsDict(path, cache_size=1)
+    sd["a.weight"]
+    sd["a.weight"]
+    assert sd.reads == 1
+    sd["b.weight"]
+    assert len(sd.loaded_tensors()) == 1
+    assert sd.cached_bytes() == tensors["b.weight"].numel() * 2
+    sd["a.weight"]
+    assert sd.reads == 3
+    sd.clear_cache()
+    assert sd.loaded_tensors() == []
+
+
+def test_lazy_dict_transform_and_materialize(model_file):
+    import torch
+    from ComfyUI_WJSetGetPlus.lazy_state_dict import LazySafetensorsDict
+
+    path, tensors = model_file
+    sd = LazySafetensorsDict(path, transform=lambda t: t.to(torch.float64))
+    full = sd.materialize()
+    assert set(full) == set(tensors)
+    assert all(t.dtype == torch.float64 for t in full.values())
+    assert full["c.bias"].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_read_safetensors_matches_source(model_file):
+    from ComfyUI_WJSetGetPlus.lazy_state_dict import read_safetensors
+
+    path, tensors = model_file
+    loaded = read_safetensors(path)
+    assert list(loaded) == list(tensors)
+    for name, tensor in tensors.items():
+        assert loaded[name].dtype == tensor.dtype
+        assert loaded[name].equal(tensor)
+
+
+def test_read_safetensors_identity_transform_does_not_alias(model_file):
+    # Con transform se lee en un búfer reutilizado: cada tensor debe ser propio
+    from ComfyUI_WJSetGetPlus.lazy_state_dict import read_safetensors
+
+    path, tensors = model_file
+    loaded = read_safetensors(path, transform=lambda t: t)
+    ptrs = {t.untyped_storage().data_ptr() for t in loaded.values()}
+    assert len(ptrs) == len(tensors)
+    for name, tensor in tensors.items():
+        assert loaded[name].equal(tensor)
@@ -0,0 +1,147 @@
+from ComfyUI_WJSetGetPlus.qwen_cache import GLOBAL_SCOPE
+
+
+# ----------------------------------------------------------------------
+# Ámbitos
+# ----------------------------------------------------------------------
+def test_same_prompt_object_is_one_generation(cache):
+    prompt = {"1": {"class_type": "SetNode"}}
+    scope = cache.begin_generation(prompt)
+    assert scope != GLOBAL_SCOPE
+    assert cache.begin_generation(prompt) == scope
+
+
+def test_identical_prompts_get_distinct_generations(cache):
+    cache.configure(max_generations=2)
+    first = cache.begin_generation({"1": {"class_type": "SetNode"}})
+    second = cache.begin_generation({"1": {"class_type": "SetNode"}})
+    assert first != second
+
+
+def test_no_prompt_is_global(cache):
+    assert cache.begin_generation(None) == GLOBAL_SCOPE
+
+
+def test_lookup_prefers_prompt_scope_then_global(cache):
+    scope = cache.begin_generation({"a": {}})
+    cache.set("x", "global value")
+    assert cache.get("x", scope) == "global value"
+    cache.set("x", "local value", scope=scope)
+    assert cache.get("x", scope) == "local value"
+    assert cache.get("x") == "global value"
+
+
+def test_new_generation_releases_the_previous_one(cache):
+    first = cache.begin_generation({"a": {}})
+    cache.set("x", 1, scope=first)
+    cache.set("kept", 2)
+    cache.begin_generation({"b": {}})
+    assert not cache.exists("x", first)
+    assert cache.get("kept") == 2
+
+
+def test_set_node_scope(cache):
+    prompt = {"a": {}}
+    assert cache.set_node_scope(prompt) == GLOBAL_SCOPE
+    cache.configure(set_node_scope="prompt")
+    assert cache.set_node_scope(prompt) == cache.begin_generation(prompt)
+
+
+# ----------------------------------------------------------------------
+# Liberación tras el último lector
+# ----------------------------------------------------------------------
+def test_consume_releases_prompt_entry_after_last_reader(cache):
+    scope = cache.begin_generation({"a": {}})
+    cache.track_readers(scope, {"x": 2})
+    cache.set("x", [1, 2, 3], scope=scope)
+    assert cache.consume("x", scope) is False
+    assert cache.exists("x", scope)
+    assert cache.consume("x", scope) is True
+    assert not cache.exists("x", scope)
+
+
+def test_consume_releases_global_entry_written_by_same_generation(cache):
+    scope = cache.begin_generation({"a": {}})
+    cache.track_readers(scope, {"x": 1})
+    cache.set("x", [1], scope=GLOBAL_SCOPE, generation=scope)
+    assert cache.consume("x", scope) is True
+    assert not cache.exists("x")
+
+
+def test_consume_keeps_globals_from_earlier_runs(cache):
+    cache.set("x", [1])
+    scope = cache.begin_generation({"a": {}})
+    cache.track_readers(scope, {"x": 1})
+    assert cache.consume("x", scope) is False
+    assert cache.exists("x")
+
+
+def test_consume_keeps_pinned_entries(cache):
+    scope = cache.begin_generation({"a": {}})
+    cache.track_readers(scope, {"x": 1})
+    cache.set("x", [1], scope=scope)
+    cache.pin("x")
+    assert cache.consume("x", scope) is False
+    assert cache.exists("x", scope)
+
+
+def test_consume_disabled(cache):
+    cache.configure(release_on_last_read=False)
+    scope = cache.begin_generation({"a": {}})
+    cache.track_readers(scope, {"x": 1})
+    cache.set("x", [1], scope=scope)
+    assert cache.consume("x", scope) is False
+    assert cache.exists("x", scope)
+
+
+# ----------------------------------------------------------------------
+# Presupuesto y expulsión
+# ----------------------------------------------------------------------
+def test_lru_evicts_least_recently_used(cache):
+    cache.set("old", b"o" * 4000)
+    cache.set("new", b"n" * 4000)
+    cache.get("old")
+    cache.configure(max_bytes=6000)
+    assert cache.exists("old")
+    assert not cache.exists("new")
+    assert cache.stats()["counters"]["evictions"] == 1
+
+
+def test_pinned_entries_are_never_evicted(cache):
+    cache.set("pinned", b"p" * 4000)
+    cache.pin("pinned")
+    cache.set("other", b"o" * 4000)
+    cache.configure(max_bytes=6000)
+    assert cache.exists("pinned")
+    assert not cache.exists("other")
+
+
+def test_shared_storage_is_counted_once(cache):
+    data = b"s" * 10000
+    cache.set("a", data)
+    size_one = cache.usage()["bytes"]
+    cache.set("b", [data])
+    assert cache.usage()["bytes"] < size_one * 2
+
+
+def test_evict_skips_entries_that_free_nothing(cache):
+    data = b"s" * 10000
+    cache.set("a", data)
+    cache.set("b", [data])
+    cache.set("own", b"o" * 10000)
+    cache.configure(max_bytes=15000)
+    # "a" es la más antigua, pero comparte todo con "b": soltarla no libera nada
+    assert cache.exists("a")
+    assert cache.exists("b")
+    assert not cache.exists("own")
+
+
+def test_read_counters(cache):
+    # Los contadores son acumulados desde que se creó el singleton
+    before = cache.stats()["counters"]
+    cache.set("x", 1)
+    cache.get("x")
+    cache.get("missing")
+    after = cache.stats()["counters"]
+    assert after["gets"] - before["gets"] == 1
+    assert after["misses"] - before["misses"] == 1